@@ -0,0 +1,356 @@
+"""
+Watch rules evaluated against every ingested message.
+
+A rule has watch terms (plain words or phrases, case-insensitive) and/or
+regular expressions, optionally limited to some channels. New posts and
+edited texts are checked once, against the original and the translated
+text, and every rule that matches produces one entry in the match log,
+which `/alerts/matches` and `/alerts/stream` read from.
+
+- Terms of all rules are compiled into Aho-Corasick automata, so a message
+  is scanned once however many terms there are. Adding a rule only rebuilds
+  a small "delta" automaton of the terms added since the last merge; the
+  main automaton is rebuilt when the delta grows past a fraction of it.
+- Regular expressions of all rules are combined into one alternation that
+  is searched first: most messages match nothing and cost a single search.
+  Only when it hits are the rules' own patterns run to find which matched.
+
+History is not rescanned when rules change; `rescan` checks the messages
+the caller still has on request.
+"""
+import asyncio
+import json
+import os
+import re
+import threading
+import time
+import uuid
+from collections import deque
+from itertools import islice
+from typing import Dict, Iterable, Iterator, List, NamedTuple, Optional, Sequence, Set, Tuple
+
+# Delta automata are merged into the main one past max(_MERGE_MIN, main / _MERGE_RATIO) terms
+_MERGE_MIN = 256
+_MERGE_RATIO = 4
+# Matched terms/patterns reported per rule and message
+_MAX_MATCHED = 10
+# Characters of the message text included in a match
+_PREVIEW_CHARS = 300
+# Stand-in for a combined regex that can't be built: every message goes to the per-rule check
+_ALWAYS = re.compile("")
+
+
+class Rule(NamedTuple):
+    id: str
+    name: str
+    terms: Tuple[str, ...] = ()
+    patterns: Tuple[str, ...] = ()
+    channels: Tuple[int, ...] = ()  # empty = all channels
+    whole_word: bool = True  # terms only match whole words
+    case_sensitive: bool = False  # for patterns; terms are always case-insensitive
+
+    @classmethod
+    def create(cls, name: Optional[str] = None, **fields) -> "Rule":
+        rule_id = uuid.uuid4().hex[:12]
+        terms = tuple(dict.fromkeys(t.strip() for t in fields.pop("terms", ()) if t.strip()))
+        patterns = tuple(dict.fromkeys(p for p in fields.pop("patterns", ()) if p))
+        channels = tuple(fields.pop("channels", None) or ())
+        if not terms and not patterns:
+            raise ValueError("A rule needs at least one term or pattern")
+        rule = cls(rule_id, name or rule_id, terms, patterns, channels, **fields)
+        rule.compile()  # Reject invalid patterns up front
+        return rule
+
+    def compile(self) -> List["re.Pattern"]:
+        flags = 0 if self.case_sensitive else re.IGNORECASE
+        try:
+            return [re.compile(pattern, flags) for pattern in self.patterns]
+        except re.error as e:
+            raise ValueError(f"Invalid pattern: {e}") from e
+
+    def to_dict(self) -> dict:
+        data = self._asdict()
+        data["terms"], data["patterns"], data["channels"] = list(self.terms), list(self.patterns), list(self.channels)
+        return data
+
+
+class Automaton:
+    """Aho-Corasick automaton over lowercased terms"""
+
+    def __init__(self, terms: Iterable[str]):
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._out: List[Tuple[str, ...]] = [()]
+        self.size = 0
+        for term in terms:
+            state = 0
+            for char in term:
+                target = self._goto[state].get(char)
+                if target is None:
+                    target = len(self._goto)
+                    self._goto[state][char] = target
+                    self._goto.append({})
+                    self._fail.append(0)
+                    self._out.append(())
+                state = target
+            self._out[state] = (term,)
+            self.size += 1
+        # Breadth-first, so the failure state of every shallower node is already final
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for char, target in self._goto[state].items():
+                queue.append(target)
+                fail = self._fail[state]
+                while fail and char not in self._goto[fail]:
+                    fail = self._fail[fail]
+                self._fail[target] = self._goto[fail].get(char, 0)
+                self._out[target] += self._out[self._fail[target]]
+
+    def find(self, text: str) -> Iterator[Tuple[int, str]]:
+        """(end offset, term) of every occurrence in an already lowercased text"""
+        if not self.size:
+            return
+        goto, fail, out = self._goto, self._fail, self._out
+        state = 0
+        for index, char in enumerate(text):
+            while state and char not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(char, 0)
+            for term in out[state]:
+                yield index + 1, term
+
+
+def _is_word_char(char: str) -> bool:
+    return char.isalnum() or char == "_"
+
+
+def _whole_word(text: str, start: int, end: int) -> bool:
+    return (start == 0 or not _is_word_char(text[start - 1])) and (end == len(text) or not _is_word_char(text[end]))
+
+
+class AlertItem(NamedTuple):
+    channel_id: int
+    message_id: int
+    date: float  # Unix timestamp
+    text: str
+    translation: Optional[str] = None  # None when not translated
+
+
+class MatchLog:
+    """Bounded log of matches with contiguous sequence numbers, readable and awaitable"""
+
+    def __init__(self, max_matches: int = 10000):
+        self.epoch = uuid.uuid4().hex[:12]
+        self._matches: deque = deque(maxlen=max_matches)
+        self._head_seq = 0
+        self._changed = asyncio.Event()
+
+    @property
+    def head_seq(self) -> int:
+        return self._head_seq
+
+    def append(self, match: dict) -> int:
+        self._head_seq += 1
+        self._matches.append({"seq": self._head_seq, **match})
+        # Wake the streams waiting for new matches
+        self._changed.set()
+        self._changed = asyncio.Event()
+        return self._head_seq
+
+    def read(self, after_seq: int, limit: int, rule_id: Optional[str] = None) -> List[dict]:
+        oldest = self._head_seq - len(self._matches) + 1
+        start = max(after_seq + 1 - oldest, 0)
+        matches = []
+        for match in islice(self._matches, start, None):
+            if rule_id is None or match["rule_id"] == rule_id:
+                matches.append(match)
+                if len(matches) == limit:
+                    break
+        return matches
+
+    async def wait(self, after_seq: int, timeout: float) -> bool:
+        """Wait until there are matches after `after_seq`; False on timeout"""
+        if self._head_seq > after_seq:
+            return True
+        try:
+            await asyncio.wait_for(self._changed.wait(), timeout)
+        except asyncio.TimeoutError:
+            return False
+        return True
+
+
+class AlertEngine:
+    """
+    Rule set with incrementally built term automata and a combined regex.
+    `evaluate` is CPU-bound and meant to run in a worker thread; rule
+    changes and evaluation are serialized by a lock.
+    """
+
+    def __init__(self, max_matches: int = 10000):
+        self.log = MatchLog(max_matches)
+        self._lock = threading.Lock()
+        self._rules: Dict[str, Rule] = {}
+        self._term_rules: Dict[str, Set[str]] = {}  # lowercased term -> rule ids
+        self._main = Automaton(())
+        self._main_terms: Set[str] = set()
+        self._delta = Automaton(())
+        self._delta_terms: Set[str] = set()
+        self._patterns: Dict[str, List["re.Pattern"]] = {}  # rule id -> compiled patterns
+        self._combined: Optional["re.Pattern"] = None
+
+    def __len__(self) -> int:
+        return len(self._rules)
+
+    def rules(self) -> List[Rule]:
+        return list(self._rules.values())
+
+    def get(self, rule_id: str) -> Optional[Rule]:
+        return self._rules.get(rule_id)
+
+    def add(self, rule: Rule):
+        with self._lock:
+            if rule.id in self._rules:
+                self._remove(rule.id)
+            self._rules[rule.id] = rule
+            added = False
+            for term in rule.terms:
+                term = term.lower()
+                self._term_rules.setdefault(term, set()).add(rule.id)
+                if term not in self._main_terms and term not in self._delta_terms:
+                    self._delta_terms.add(term)
+                    added = True
+            if added:
+                if len(self._delta_terms) > max(_MERGE_MIN, len(self._main_terms) // _MERGE_RATIO):
+                    self._merge()
+                else:
+                    self._delta = Automaton(self._delta_terms)
+            if rule.patterns:
+                self._patterns[rule.id] = rule.compile()
+                self._combine()
+
+    def remove(self, rule_id: str) -> Optional[Rule]:
+        with self._lock:
+            return self._remove(rule_id)
+
+    def _remove(self, rule_id: str) -> Optional[Rule]:
+        rule = self._rules.pop(rule_id, None)
+        if rule is None:
+            return None
+        for term in rule.terms:
+            term = term.lower()
+            rule_ids = self._term_rules.get(term)
+            if rule_ids is None:
+                continue
+            rule_ids.discard(rule_id)
+            if not rule_ids:
+                # A stale term left in the main automaton is ignored until the next merge
+                del self._term_rules[term]
+                if term in self._delta_terms:
+                    self._delta_terms.discard(term)
+                    self._delta = Automaton(self._delta_terms)
+        if self._patterns.pop(rule_id, None) is not None:
+            self._combine()
+        return rule
+
+    def _merge(self):
+        self._main_terms = set(self._term_rules)
+        self._main = Automaton(self._main_terms)
+        self._delta_terms = set()
+        self._delta = Automaton(())
+
+    def _combine(self):
+        parts = []
+        for rule_id, patterns in self._patterns.items():
+            flags = "" if self._rules[rule_id].case_sensitive else "i"
+            parts.extend(f"(?{flags}:{pattern.pattern})" for pattern in patterns)
+        try:
+            self._combined = re.compile("|".join(parts)) if parts else None
+        except re.error:
+            # Patterns that can't be combined (e.g. numbered backreferences)
+            self._combined = _ALWAYS
+
+    def _match_terms(self, text: str) -> Dict[str, Set[str]]:
+        """Rule id -> matched terms"""
+        matched: Dict[str, Set[str]] = {}
+        lowered = text.lower()
+        for automaton in (self._main, self._delta):
+            for end, term in automaton.find(lowered):
+                for rule_id in self._term_rules.get(term, ()):
+                    if self._rules[rule_id].whole_word and not _whole_word(lowered, end - len(term), end):
+                        continue
+                    matched.setdefault(rule_id, set()).add(term)
+        return matched
+
+    def _match_patterns(self, text: str) -> Dict[str, Set[str]]:
+        matched: Dict[str, Set[str]] = {}
+        if self._combined is None or not self._combined.search(text):
+            return matched
+        for rule_id, patterns in self._patterns.items():
+            for pattern in patterns:
+                found = pattern.search(text)
+                if found:
+                    matched.setdefault(rule_id, set()).add(found.group(0))
+        return matched
+
+    def _match(self, item: AlertItem, rule_ids: Optional[Set[str]] = None) -> List[dict]:
+        hits: Dict[str, Dict[str, Set[str]]] = {}  # rule id -> field -> matched
+        for field, text in (("text", item.text), ("translation", item.translation)):
+            if not text or (field == "translation" and text == item.text):
+                continue
+            for matched in (self._match_terms(text), self._match_patterns(text)):
+                for rule_id, found in matched.items():
+                    hits.setdefault(rule_id, {}).setdefault(field, set()).update(found)
+        matches = []
+        for rule_id, fields in hits.items():
+            rule = self._rules[rule_id]
+            if rule_ids is not None and rule_id not in rule_ids:
+                continue
+            if rule.channels and item.channel_id not in rule.channels:
+                continue
+            matched = sorted(set().union(*fields.values()))
+            matches.append({
+                "rule_id": rule_id,
+                "rule_name": rule.name,
+                "channel_id": item.channel_id,
+                "message_id": item.message_id,
+                "date": item.date,
+                "fields": sorted(fields),
+                "matched": matched[:_MAX_MATCHED],
+                "text": item.text[:_PREVIEW_CHARS],
+            })
+        return matches
+
+    def evaluate(self, items: Sequence[AlertItem], rule_ids: Optional[Set[str]] = None) -> List[dict]:
+        """Matches of the given messages (against `rule_ids` only, if given)"""
+        with self._lock:
+            if not self._rules:
+                return []
+            return [match for item in items for match in self._match(item, rule_ids)]
+
+    def publish(self, matches: Iterable[dict], **extra) -> int:
+        """Append matches to the log (on the event loop); returns how many"""
+        count = 0
+        for match in matches:
+            self.log.append({**match, "time": time.time(), **extra})
+            count += 1
+        return count
+
+    def save(self, path: str):
+        with self._lock:
+            data = [rule.to_dict() for rule in self._rules.values()]
+        with open(path + ".tmp", "w", encoding="utf-8") as f:
+            json.dump(data, f, ensure_ascii=False, indent=1)
+        # Atomic replace, so a crash never leaves a truncated rules file
+        os.replace(path + ".tmp", path)
+
+    def load(self, path: str) -> int:
+        with open(path, encoding="utf-8") as f:
+            data = json.load(f)
+        for fields in data:
+            for key in ("terms", "patterns", "channels"):
+                fields[key] = tuple(fields.get(key) or ())
+            self.add(Rule(**fields))
+        with self._lock:
+            self._merge()
+        return len(data)
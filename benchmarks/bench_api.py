@@ -0,0 +1,160 @@
+"""
+Throughput and latency benchmark for the API endpoints.
+
+By default the app is driven in-process (httpx ASGI transport) with the local
+stand-ins from fake_telegram.py, so results are reproducible offline:
+
+    python benchmarks/bench_api.py
+    python benchmarks/bench_api.py --concurrency 1,50 --requests 500 --endpoints messages
+    python benchmarks/bench_api.py --url http://localhost:8000 --channel-id 123456789
+
+Against a running server (--url) the backends are whatever that server uses;
+start it with TELEGRAM_BACKEND=fake TRANSLATOR_BACKEND=fake to benchmark
+offline over real sockets. Use --json to save results for comparing runs.
+"""
+import argparse
+import asyncio
+import json
+import os
+import sys
+import time
+from typing import Dict, List
+
+import httpx
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Synthetic channel ids start here (see FakeTelegramClient)
+FAKE_CHANNEL_ID = 1_000_000_000
+FAKE_CHANNEL_USERNAME = "synthetic_0"
+
+TRANSLATE_TEXT = "Сегодня в городе прошла большая встреча жителей. Власти сообщили о новых ограничениях."
+
+
+def endpoint_requests(channel_id: int, username: str) -> Dict[str, Dict]:
+    """Request description per benchmarked endpoint"""
+    return {
+        "channels": {"method": "GET", "url": "/channels"},
+        "messages": {"method": "GET", "url": f"/channels/{channel_id}/messages?limit=50&translate=false"},
+        "messages_translated": {"method": "GET", "url": f"/channels/{channel_id}/messages?limit=50&translate=true"},
+        "messages_by_username": {"method": "GET", "url": f"/channels/by-username/{username}/messages?limit=50&translate=false"},
+        "translate": {"method": "POST", "url": "/translate", "json": {"text": TRANSLATE_TEXT, "source_lang": "ru", "target_lang": "en"}},
+        # One viewport's worth of messages, as the viewer requests them
+        "translate_batch": {"method": "POST", "url": "/translate/batch", "json": {"texts": [TRANSLATE_TEXT] * 20}},
+    }
+
+
+def percentile(ordered: List[float], pct: float) -> float:
+    if not ordered:
+        return 0.0
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))]
+
+
+async def run_level(http: httpx.AsyncClient, spec: Dict, concurrency: int, total: int) -> Dict:
+    """Issue `total` requests with `concurrency` workers and summarize"""
+    latencies: List[float] = []
+    errors = 0
+    remaining = total
+
+    async def worker():
+        nonlocal remaining, errors
+        while remaining > 0:
+            remaining -= 1
+            start = time.perf_counter()
+            try:
+                response = await http.request(spec["method"], spec["url"], json=spec.get("json"))
+                if response.status_code >= 400:
+                    errors += 1
+            except httpx.HTTPError:
+                errors += 1
+            latencies.append(time.perf_counter() - start)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+    ordered = sorted(latencies)
+    return {
+        "concurrency": concurrency,
+        "requests": len(latencies),
+        "errors": errors,
+        "seconds": round(elapsed, 3),
+        "rps": round(len(latencies) / elapsed, 1) if elapsed else 0.0,
+        "p50_ms": round(percentile(ordered, 50) * 1000, 1),
+        "p99_ms": round(percentile(ordered, 99) * 1000, 1),
+    }
+
+
+async def build_http_client(args) -> httpx.AsyncClient:
+    max_concurrency = max(args.concurrency)
+    timeout = httpx.Timeout(args.timeout)
+    if args.url:
+        limits = httpx.Limits(max_connections=max_concurrency, max_keepalive_connections=max_concurrency)
+        return httpx.AsyncClient(base_url=args.url, limits=limits, timeout=timeout)
+
+    # In-process: force the local stand-ins before main.py is imported
+    os.environ.setdefault("TELEGRAM_BACKEND", "fake")
+    os.environ.setdefault("TRANSLATOR_BACKEND", "fake")
+    sys.path.insert(0, ROOT)
+    import main
+    await main.startup_event()
+    transport = httpx.ASGITransport(app=main.app)
+    return httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=timeout)
+
+
+async def run(args) -> List[Dict]:
+    specs = endpoint_requests(args.channel_id, args.username)
+    http = await build_http_client(args)
+    results = []
+    async with http:
+        for name in args.endpoints:
+            spec = specs[name]
+            # Warm-up so connection setup and first-use generation aren't measured
+            await run_level(http, spec, 1, args.warmup)
+            for concurrency in args.concurrency:
+                total = max(args.requests, concurrency)
+                result = await run_level(http, spec, concurrency, total)
+                result["endpoint"] = name
+                results.append(result)
+                print(
+                    f"{name:<22} c={concurrency:<4} n={result['requests']:<5} err={result['errors']:<4} "
+                    f"{result['rps']:>8.1f} req/s  p50={result['p50_ms']:>8.1f}ms  p99={result['p99_ms']:>8.1f}ms",
+                    flush=True,
+                )
+    return results
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--url", help="Benchmark a running server instead of the in-process app")
+    parser.add_argument("--concurrency", default="1,50,500", help="Comma-separated concurrent client counts")
+    parser.add_argument("--requests", type=int, default=200, help="Requests per concurrency level")
+    parser.add_argument("--warmup", type=int, default=5, help="Warm-up requests per endpoint")
+    parser.add_argument(
+        "--endpoints",
+        default="channels,messages,messages_translated,messages_by_username,translate,translate_batch",
+        help="Comma-separated endpoints to benchmark",
+    )
+    parser.add_argument("--channel-id", type=int, default=FAKE_CHANNEL_ID)
+    parser.add_argument("--username", default=FAKE_CHANNEL_USERNAME)
+    parser.add_argument("--timeout", type=float, default=120.0)
+    parser.add_argument("--json", help="Write results to this file")
+    args = parser.parse_args(argv)
+    args.concurrency = [int(c) for c in args.concurrency.split(",") if c]
+    args.endpoints = [e for e in args.endpoints.split(",") if e]
+    unknown = set(args.endpoints) - set(endpoint_requests(0, "").keys())
+    if unknown:
+        parser.error(f"Unknown endpoints: {', '.join(sorted(unknown))}")
+    return args
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    results = asyncio.run(run(args))
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+        print(f"Results written to {args.json}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,134 @@
+"""
+Cold-start benchmark for the API process.
+
+1. Import cost of main.py broken down per top-level package, from
+   `python -X importtime -c "import main"`.
+2. Wall-clock time from process launch until /health answers (liveness) and
+   until /ready answers 200 (Telegram connected), using uvicorn.
+
+    python benchmarks/bench_startup.py
+    python benchmarks/bench_startup.py --runs 5 --top 15
+    python benchmarks/bench_startup.py --real      # real Telegram/translator backends
+
+By default the local stand-ins (TELEGRAM_BACKEND=fake) are used so the
+numbers don't depend on the network.
+"""
+import argparse
+import os
+import socket
+import subprocess
+import sys
+import time
+import urllib.error
+import urllib.request
+from collections import defaultdict
+from typing import Dict, List, Optional, Tuple
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def bench_env(real: bool) -> Dict[str, str]:
+    env = dict(os.environ)
+    if not real:
+        env.setdefault("TELEGRAM_BACKEND", "fake")
+        env.setdefault("TRANSLATOR_BACKEND", "fake")
+    return env
+
+
+def import_breakdown(env: Dict[str, str]) -> Tuple[float, List[Tuple[str, float]]]:
+    """Total import time of main and cumulative time per top-level package (seconds)"""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import main"],
+        cwd=ROOT, env=env, capture_output=True, text=True, check=True,
+    )
+    per_package: Dict[str, float] = defaultdict(float)
+    total = 0.0
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        # importtime indents nested imports by two spaces per level, after one separator space
+        depth = (len(name) - len(name.lstrip()) - 1) // 2
+        name = name.strip()
+        cumulative_us = cumulative_us.strip()
+        if name == "main":
+            total = int(cumulative_us) / 1e6
+        # Depth 1 = imported directly by main
+        if depth == 1:
+            per_package[name.split(".")[0]] += int(cumulative_us) / 1e6
+    return total, sorted(per_package.items(), key=lambda item: item[1], reverse=True)
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def _poll(url: str, deadline: float) -> Optional[float]:
+    while time.perf_counter() < deadline:
+        try:
+            with urllib.request.urlopen(url, timeout=1) as response:
+                if response.status == 200:
+                    return time.perf_counter()
+        except (urllib.error.URLError, ConnectionError, socket.timeout):
+            # Not listening yet, or 503 while Telegram is still connecting
+            pass
+        time.sleep(0.02)
+    return None
+
+
+def time_to_ready(env: Dict[str, str], timeout: float) -> Tuple[Optional[float], Optional[float]]:
+    """Seconds from launch until /health and /ready answer 200"""
+    port = _free_port()
+    start = time.perf_counter()
+    process = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "main:app", "--port", str(port), "--log-level", "warning"],
+        cwd=ROOT, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    try:
+        deadline = start + timeout
+        healthy = _poll(f"http://127.0.0.1:{port}/health", deadline)
+        ready = _poll(f"http://127.0.0.1:{port}/ready", deadline)
+    finally:
+        process.terminate()
+        process.wait(timeout=10)
+    return (
+        healthy - start if healthy else None,
+        ready - start if ready else None,
+    )
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=3, help="Launches to average over")
+    parser.add_argument("--top", type=int, default=10, help="Packages to list in the import breakdown")
+    parser.add_argument("--timeout", type=float, default=60.0)
+    parser.add_argument("--real", action="store_true", help="Use the real Telegram and translator backends")
+    args = parser.parse_args(argv)
+    env = bench_env(args.real)
+
+    total, packages = import_breakdown(env)
+    print(f"import main: {total * 1000:.0f} ms")
+    for name, seconds in packages[:args.top]:
+        print(f"  {name:<30} {seconds * 1000:>8.0f} ms")
+
+    health_times, ready_times = [], []
+    for _ in range(args.runs):
+        healthy, ready = time_to_ready(env, args.timeout)
+        if healthy is not None:
+            health_times.append(healthy)
+        if ready is not None:
+            ready_times.append(ready)
+
+    def summary(times: List[float]) -> str:
+        if not times:
+            return "timed out"
+        return f"mean {sum(times) / len(times) * 1000:.0f} ms, min {min(times) * 1000:.0f} ms ({len(times)}/{args.runs} runs)"
+
+    print(f"launch -> /health: {summary(health_times)}")
+    print(f"launch -> /ready:  {summary(ready_times)}")
+
+
+if __name__ == "__main__":
+    main()
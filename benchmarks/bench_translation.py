@@ -0,0 +1,139 @@
+"""
+Throughput and latency benchmark for the translation engines (translation.py).
+
+Every engine translates the same fixed corpus of channel-like posts (short
+posts and a few long ones, Russian and Ukrainian) and reports:
+
+- latency: one text at a time, p50/p99 per text
+- throughput: the whole corpus through `translate_batch`, in chars/s
+
+    python benchmarks/bench_translation.py                      # local stand-in + Argos if installed
+    python benchmarks/bench_translation.py --engines google,argos --texts 50
+    python benchmarks/bench_translation.py --pairs ru-en --json results.json
+
+Engines that can't translate a pair (e.g. Argos without the language pack)
+are skipped with the reason. The google engine calls the real service, or
+the stand-in from fake_translate_server.py with GOOGLE_TRANSLATE_URL set.
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import sys
+import time
+from typing import Dict, List
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from fake_telegram import RUSSIAN_SENTENCES, UKRAINIAN_SENTENCES  # noqa: E402
+from translation import ENGINE_FACTORIES, TranslationEngine  # noqa: E402
+
+SENTENCES = {"ru": RUSSIAN_SENTENCES, "uk": UKRAINIAN_SENTENCES}
+
+
+def build_corpus(language: str, count: int, seed: int = 7) -> List[str]:
+    """`count` posts: mostly 1-4 sentences, every tenth a long multi-paragraph post"""
+    rng = random.Random(seed)
+    sentences = SENTENCES[language]
+    corpus = []
+    for index in range(count):
+        if index % 10 == 9:
+            paragraphs = [" ".join(rng.choice(sentences) for _ in range(rng.randint(4, 8))) for _ in range(3)]
+            corpus.append("\n\n".join(paragraphs))
+        else:
+            corpus.append(" ".join(rng.choice(sentences) for _ in range(rng.randint(1, 4))))
+    return corpus
+
+
+def percentile(ordered: List[float], pct: float) -> float:
+    if not ordered:
+        return 0.0
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))]
+
+
+async def bench_engine(engine: TranslationEngine, corpus: List[str], source: str, target: str, latency_samples: int) -> Dict:
+    # Warm-up: imports, model loading, connection setup
+    await engine.translate(corpus[0], source, target)
+
+    latencies = []
+    for text in corpus[:latency_samples]:
+        start = time.perf_counter()
+        await engine.translate(text, source, target)
+        latencies.append(time.perf_counter() - start)
+    latencies.sort()
+
+    chars = sum(len(text) for text in corpus)
+    start = time.perf_counter()
+    await engine.translate_batch(corpus, source, target)
+    elapsed = time.perf_counter() - start
+    return {
+        "engine": engine.name,
+        "pair": f"{source}-{target}",
+        "texts": len(corpus),
+        "chars": chars,
+        "concurrency": engine.concurrency,
+        "p50_ms": percentile(latencies, 50) * 1000,
+        "p99_ms": percentile(latencies, 99) * 1000,
+        "batch_seconds": elapsed,
+        "chars_per_second": chars / elapsed if elapsed else 0.0,
+        "texts_per_second": len(corpus) / elapsed if elapsed else 0.0,
+    }
+
+
+async def run(args) -> List[Dict]:
+    results = []
+    for name in args.engines:
+        engine = ENGINE_FACTORIES[name](args.concurrency)
+        await asyncio.to_thread(engine.load)
+        for pair in args.pairs:
+            source, target = pair.split("-")
+            reason = engine.unsupported_reason(source, target)
+            if reason is not None:
+                print(f"{name:<8} {pair:<6} skipped: {reason}", flush=True)
+                continue
+            corpus = build_corpus(source, args.texts)
+            result = await bench_engine(engine, corpus, source, target, args.latency_samples)
+            results.append(result)
+            print(
+                f"{name:<8} {pair:<6} n={result['texts']:<4} c={result['concurrency']:<3} "
+                f"p50={result['p50_ms']:>8.1f}ms  p99={result['p99_ms']:>8.1f}ms  "
+                f"{result['chars_per_second']:>9.0f} chars/s  {result['texts_per_second']:>7.1f} texts/s",
+                flush=True,
+            )
+        await engine.aclose()
+    return results
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--engines", default="local,argos", help="Comma-separated engines: " + ", ".join(sorted(ENGINE_FACTORIES)))
+    parser.add_argument("--pairs", default="ru-en,uk-en", help="Comma-separated source-target pairs")
+    parser.add_argument("--texts", type=int, default=100, help="Corpus size per pair")
+    parser.add_argument("--latency-samples", type=int, default=20, help="Texts translated one at a time for latency")
+    parser.add_argument("--concurrency", type=int, default=8, help="Parallel requests for online engines")
+    parser.add_argument("--json", help="Write results to this file")
+    args = parser.parse_args(argv)
+    args.engines = [e for e in args.engines.split(",") if e]
+    args.pairs = [p for p in args.pairs.split(",") if p]
+    unknown = set(args.engines) - set(ENGINE_FACTORIES)
+    if unknown:
+        parser.error(f"Unknown engines: {', '.join(sorted(unknown))}")
+    unsupported = {p.split("-")[0] for p in args.pairs} - set(SENTENCES)
+    if unsupported:
+        parser.error(f"No corpus for source languages: {', '.join(sorted(unsupported))}")
+    return args
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    results = asyncio.run(run(args))
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+        print(f"Results written to {args.json}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,43 @@
+"""
+Locust load profile for a running API server.
+
+    TELEGRAM_BACKEND=fake TRANSLATOR_BACKEND=fake uvicorn main:app --port 8000
+    locust -f benchmarks/locustfile.py --host http://localhost:8000 --users 500 --spawn-rate 50
+
+BENCH_CHANNEL_ID / BENCH_USERNAME select the channel (defaults match the
+first synthetic channel of FakeTelegramClient).
+"""
+import os
+
+from locust import HttpUser, between, task
+
+CHANNEL_ID = int(os.getenv("BENCH_CHANNEL_ID", "1000000000"))
+USERNAME = os.getenv("BENCH_USERNAME", "synthetic_0")
+
+
+class ApiUser(HttpUser):
+    wait_time = between(0.5, 2)
+
+    @task(2)
+    def channels(self):
+        self.client.get("/channels")
+
+    @task(5)
+    def messages(self):
+        self.client.get(f"/channels/{CHANNEL_ID}/messages?limit=50&translate=false", name="/channels/{id}/messages")
+
+    @task(2)
+    def messages_translated(self):
+        self.client.get(f"/channels/{CHANNEL_ID}/messages?limit=50&translate=true", name="/channels/{id}/messages?translate")
+
+    @task(1)
+    def messages_by_username(self):
+        self.client.get(f"/channels/by-username/{USERNAME}/messages?limit=50&translate=false", name="/channels/by-username/{username}/messages")
+
+    @task(1)
+    def translate(self):
+        self.client.post("/translate", json={
+            "text": "Сегодня в городе прошла большая встреча жителей.",
+            "source_lang": "ru",
+            "target_lang": "en",
+        })
@@ -1,31 +1,42 @@
 """
 Build script to create executables for Telegram Channel API and Frontend
 Run this script to build both executables at once.
+
+    python build_executables.py                         # --onefile executables (default)
+    python build_executables.py --mode onedir           # fast-starting folder bundles
+    python build_executables.py --mode onedir --no-offline --startup-budget 1.0
+
+--onefile unpacks the whole runtime into a temp directory on every launch;
+--onedir bundles start directly from disk. --no-offline leaves out the Argos
+Translate stack (torch/ctranslate2/stanza). Argos models are never bundled:
+put them in a `models` folder next to the executable (or point
+ARGOS_PACKAGES_DIR at them) and they are loaded from there.
+
+After building, each artifact is launched and the time until it answers HTTP
+is written to dist/startup_report.json.
 """
+import argparse
+import json
+import os
+import socket
 import subprocess
 import sys
-import os
+import time
+import urllib.error
+import urllib.request
 
-def build_executable(script_name, exe_name, console=True):
-    """Build an executable using PyInstaller"""
-    print(f"\n{'='*60}")
-    print(f"Building {exe_name}...")
-    print(f"{'='*60}\n")
-    
-    # PyInstaller command
-    cmd = [
-        "pyinstaller",
-        "--name", exe_name,
-        "--onefile",  # Single executable file
-        "--clean",    # Clean PyInstaller cache
-    ]
-    
-    if console:
-        cmd.append("--console")  # Show console window
-    else:
-        cmd.append("--noconsole")  # Hide console window (GUI mode)
-    
-    # Add hidden imports that might be needed
+# Modules pulled in by argostranslate that dominate bundle size and unpack time
+OFFLINE_TRANSLATION_MODULES = [
+    "argostranslate",
+    "ctranslate2",
+    "sentencepiece",
+    "stanza",
+    "torch",
+    "spacy",
+]
+
+def hidden_imports_for(include_offline):
+    """Hidden imports that PyInstaller's analysis might miss"""
     hidden_imports = [
         "uvicorn.lifespan.on",
         "uvicorn.lifespan.off",
@@ -43,25 +54,81 @@ def build_executable(script_name, exe_name, console=True):
         "telethon.tl",
         "telethon.tl.types",
         "telethon.errors",
-        "deep_translator",
+        "httpx",
         "langdetect",
         "dotenv",
-        "argostranslate",
-        "argostranslate.package",
-        "argostranslate.translate",
+        "prometheus_client",
+        "metrics",
+        "diagnostics",
+        "ipc",
+        "cache",
+        "alerts",
+        "changelog",
+        "dedup",
+        "live",
+        "message_store",
+        "session_store",
+        "segmentation",
+        "translation",
+        "translation_memory",
+        "frontend",
+        # Imported lazily; fake_telegram is also used for the startup report
+        "fake_telegram",
+    ]
+    if include_offline:
+        hidden_imports += [
+            "argostranslate",
+            "argostranslate.package",
+            "argostranslate.translate",
+        ]
+    return hidden_imports
+
+def artifact_path(exe_name, mode):
+    """Path of the built executable"""
+    suffix = ".exe" if os.name == "nt" else ""
+    if mode == "onedir":
+        return os.path.join("dist", exe_name, exe_name + suffix)
+    return os.path.join("dist", exe_name + suffix)
+
+def build_executable(script_name, exe_name, console=True, mode="onefile", include_offline=True, optimize=1):
+    """Build an executable using PyInstaller"""
+    print(f"\n{'='*60}")
+    print(f"Building {exe_name} ({mode})...")
+    print(f"{'='*60}\n")
+
+    # PyInstaller command
+    cmd = [
+        "pyinstaller",
+        "--name", exe_name,
+        f"--{mode}",  # --onefile: single file, --onedir: folder that starts without unpacking
+        "--clean",    # Clean PyInstaller cache
+        "--noconfirm",
+        "--optimize", str(optimize),  # Bundle bytecode compiled at this optimization level
     ]
-    
-    for imp in hidden_imports:
+
+    if console:
+        cmd.append("--console")  # Show console window
+    else:
+        cmd.append("--noconsole")  # Hide console window (GUI mode)
+
+    # The web UI's static files (used by the frontend, and by the API with SERVE_FRONTEND=1)
+    cmd.extend(["--add-data", f"static{os.pathsep}static"])
+
+    for imp in hidden_imports_for(include_offline):
         cmd.extend(["--hidden-import", imp])
-    
+
+    if not include_offline:
+        for module in OFFLINE_TRANSLATION_MODULES:
+            cmd.extend(["--exclude-module", module])
+
     # Add the script
     cmd.append(script_name)
-    
+
     # Run PyInstaller
     try:
         result = subprocess.run(cmd, check=True)
-        print(f"\n✓ Successfully built {exe_name}.exe")
-        print(f"  Location: dist/{exe_name}.exe\n")
+        print(f"\n✓ Successfully built {exe_name}")
+        print(f"  Location: {artifact_path(exe_name, mode)}\n")
         return True
     except subprocess.CalledProcessError as e:
         print(f"\n✗ Error building {exe_name}: {e}\n")
@@ -71,11 +138,95 @@ def build_executable(script_name, exe_name, console=True):
         print(f"  pip install pyinstaller\n")
         return False
 
-def main():
+def _free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+def measure_startup(exe_path, url_path, env_overrides, timeout=60, runs=3):
+    """Launch an artifact `runs` times; seconds until it answers `url_path` (None on timeout)"""
+    timings = []
+    for _ in range(runs):
+        port = _free_port()
+        env = dict(os.environ, PORT=str(port), **env_overrides)
+        start = time.perf_counter()
+        process = subprocess.Popen([exe_path], env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        elapsed = None
+        try:
+            while time.perf_counter() - start < timeout:
+                try:
+                    with urllib.request.urlopen(f"http://127.0.0.1:{port}{url_path}", timeout=1):
+                        elapsed = time.perf_counter() - start
+                        break
+                except (urllib.error.URLError, ConnectionError, socket.timeout):
+                    time.sleep(0.02)
+        finally:
+            process.terminate()
+            try:
+                process.wait(timeout=10)
+            except subprocess.TimeoutExpired:
+                process.kill()
+        timings.append(elapsed)
+    return timings
+
+def startup_report(artifacts, mode, budget):
+    """Measure every artifact and write dist/startup_report.json"""
+    print("\n" + "="*60)
+    print("Startup report")
+    print("="*60)
+    report = {"mode": mode, "budget_seconds": budget, "artifacts": []}
+    within_budget = True
+    for exe_name, url_path, env_overrides in artifacts:
+        path = artifact_path(exe_name, mode)
+        if not os.path.exists(path):
+            continue
+        timings = measure_startup(path, url_path, env_overrides)
+        answered = [t for t in timings if t is not None]
+        size = _artifact_size(exe_name, mode)
+        entry = {
+            "name": exe_name,
+            "path": path,
+            "size_mb": round(size / 1e6, 1),
+            "startup_seconds": timings,
+            "best_seconds": round(min(answered), 3) if answered else None,
+        }
+        report["artifacts"].append(entry)
+        best = f"{entry['best_seconds']:.2f}s" if answered else "timed out"
+        ok = bool(answered) and (budget is None or min(answered) <= budget)
+        within_budget &= ok
+        print(f"  {'✓' if ok else '✗'} {exe_name:<24} {best:>10}  ({entry['size_mb']} MB)")
+    with open(os.path.join("dist", "startup_report.json"), "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+    print("  Written to dist/startup_report.json")
+    return within_budget
+
+def _artifact_size(exe_name, mode):
+    if mode == "onefile":
+        return os.path.getsize(artifact_path(exe_name, mode))
+    total = 0
+    for root, _, files in os.walk(os.path.join("dist", exe_name)):
+        total += sum(os.path.getsize(os.path.join(root, name)) for name in files)
+    return total
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--mode", choices=["onefile", "onedir"], default="onefile",
+                        help="onefile: single executable; onedir: folder bundle with much faster startup")
+    parser.add_argument("--no-offline", action="store_true",
+                        help="Exclude the Argos Translate offline stack (torch, ctranslate2, stanza)")
+    parser.add_argument("--optimize", type=int, choices=[0, 1, 2], default=1,
+                        help="Bytecode optimization level for bundled modules")
+    parser.add_argument("--startup-budget", type=float, default=None,
+                        help="Fail if an artifact takes longer than this many seconds to answer HTTP")
+    parser.add_argument("--skip-report", action="store_true", help="Don't launch the artifacts after building")
+    return parser.parse_args(argv)
+
+def main(argv=None):
+    args = parse_args(argv)
     print("="*60)
     print("Telegram Channel API - Executable Builder")
     print("="*60)
-    
+
     # Check if PyInstaller is installed
     try:
         import PyInstaller
@@ -85,29 +236,42 @@ def main():
         print("\nInstalling PyInstaller...")
         subprocess.run([sys.executable, "-m", "pip", "install", "pyinstaller"], check=True)
         print("✓ PyInstaller installed\n")
-    
+
     # Build both executables
     success = True
-    
+    options = {"mode": args.mode, "include_offline": not args.no_offline, "optimize": args.optimize}
+
     # Build API server (with console)
-    success &= build_executable("main.py", "TelegramAPI_Server", console=True)
-    
+    success &= build_executable("main.py", "TelegramAPI_Server", console=True, **options)
+
     # Build Frontend server (with console)
-    success &= build_executable("frontend.py", "TelegramAPI_Frontend", console=True)
-    
+    success &= build_executable("frontend.py", "TelegramAPI_Frontend", console=True, **options)
+
+    if success and not args.skip_report:
+        # The API is measured against the local Telegram stand-in, so no credentials are needed
+        success &= startup_report(
+            [
+                ("TelegramAPI_Server", "/health", {"TELEGRAM_BACKEND": "fake", "TRANSLATOR_BACKEND": "fake"}),
+                ("TelegramAPI_Frontend", "/", {}),
+            ],
+            args.mode,
+            args.startup_budget,
+        )
+
     print("\n" + "="*60)
     if success:
         print("✓ All executables built successfully!")
         print("\nExecutables are in the 'dist' folder:")
-        print("  - TelegramAPI_Server.exe (API on port 8000)")
-        print("  - TelegramAPI_Frontend.exe (Frontend on port 8001)")
+        print(f"  - {artifact_path('TelegramAPI_Server', args.mode)} (API on port 8000)")
+        print(f"  - {artifact_path('TelegramAPI_Frontend', args.mode)} (Frontend on port 8001)")
         print("\nNote: Make sure to create a .env file with your credentials")
         print("      before running the executables.")
+        if not args.no_offline:
+            print("      Offline translation models go in a 'models' folder next to the API executable.")
     else:
-        print("✗ Some builds failed. Check the errors above.")
+        print("✗ Some builds failed or exceeded the startup budget. Check the errors above.")
     print("="*60)
+    return 0 if success else 1
 
 if __name__ == "__main__":
-    main()
-
-
+    sys.exit(main())
@@ -0,0 +1,120 @@
+"""
+In-process caches shared by all requests (and, via the owner process, by all
+HTTP workers).
+"""
+import asyncio
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional
+
+
+class TTLCache:
+    """
+    LRU cache whose entries expire after `ttl` seconds.
+
+    `get_or_create` also coalesces concurrent misses for the same key, so a
+    burst of identical requests results in a single fetch. Invalidating a key
+    while it is being fetched bumps its generation, and the fetched value is
+    then returned to the waiting callers but not cached.
+    """
+
+    def __init__(self, ttl: float, max_entries: int = 1000, on_hit=None, on_miss=None):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.on_hit = on_hit
+        self.on_miss = on_miss
+        self._entries: "OrderedDict[Hashable, tuple]" = OrderedDict()
+        self._inflight: Dict[Hashable, asyncio.Future] = {}
+        # Generation of each in-flight key, bumped by invalidations
+        self._generations: Dict[Hashable, int] = {}
+
+    @property
+    def enabled(self) -> bool:
+        return self.ttl > 0
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        expires, value = entry
+        if expires < time.monotonic():
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return value
+
+    def set(self, key: Hashable, value: Any):
+        if not self.enabled:
+            return
+        self._entries[key] = (time.monotonic() + self.ttl, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def _bump(self, keys):
+        for key in keys:
+            if key in self._generations:
+                self._generations[key] += 1
+
+    def pop(self, key: Hashable):
+        """Drop the entry for `key`, if any"""
+        self._entries.pop(key, None)
+        self._bump([key])
+
+    def invalidate(self, predicate: Callable[[Hashable], bool]) -> int:
+        """Drop every entry whose key matches `predicate`; returns the count"""
+        keys = [key for key in self._entries if predicate(key)]
+        for key in keys:
+            del self._entries[key]
+        self._bump([key for key in self._generations if predicate(key)])
+        return len(keys)
+
+    def invalidate_values(self, predicate: Callable[[Hashable, Any], bool]) -> int:
+        """Drop every entry for which `predicate(key, value)` is true; returns the count"""
+        keys = [key for key, (_, value) in self._entries.items() if predicate(key, value)]
+        for key in keys:
+            del self._entries[key]
+        # In-flight values aren't known yet and might match: don't cache any of them
+        self._bump(list(self._generations))
+        return len(keys)
+
+    def clear(self):
+        self._entries.clear()
+        self._bump(list(self._generations))
+
+    async def get_or_create(self, key: Hashable, factory: Callable[[], Awaitable[Any]]) -> Any:
+        if not self.enabled:
+            return await factory()
+        value = self.get(key)
+        if value is not None:
+            if self.on_hit:
+                self.on_hit()
+            return value
+        inflight = self._inflight.get(key)
+        if inflight is not None:
+            if self.on_hit:
+                self.on_hit()
+            return await asyncio.shield(inflight)
+        if self.on_miss:
+            self.on_miss()
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        self._generations[key] = generation = 0
+        try:
+            value = await factory()
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as e:
+            future.set_exception(e)
+            # Waiters re-raise it; mark it retrieved so it isn't logged as unhandled
+            future.exception()
+            raise
+        else:
+            future.set_result(value)
+            if self._generations[key] == generation:
+                self.set(key, value)
+            return value
+        finally:
+            self._inflight.pop(key, None)
+            self._generations.pop(key, None)
@@ -0,0 +1,92 @@
+"""
+Global change log of channel messages with monotonically increasing
+sequence numbers.
+
+Every new, edited or deleted message and every counter update (views,
+forwards, reactions) the owner notices is appended as one entry. Sequence
+numbers are contiguous, so the entry for a sequence number is found by
+offset, and a channel's first entry after a checkpoint by bisecting that
+channel's list of sequence numbers: a consumer resuming from `after_seq`
+costs O(log n + limit), however long the log is.
+
+The log is in memory and keeps the newest `max_entries`. `epoch` changes on
+every restart; a consumer whose epoch differs, or whose checkpoint fell off
+the end of the log (`truncated`), has to resync from the message endpoints.
+"""
+import time
+import uuid
+from bisect import bisect_right
+from typing import Dict, List, Optional
+
+NEW = "new"
+EDITED = "edited"
+DELETED = "deleted"
+COUNTERS = "counters"
+
+
+class ChangeLog:
+    """Bounded append-only log; entries are dicts with a `seq` key"""
+
+    def __init__(self, max_entries: int = 100000):
+        self.max_entries = max_entries
+        self.epoch = uuid.uuid4().hex[:12]
+        self._entries: List[dict] = []
+        self._first_seq = 1  # seq of self._entries[0]
+        self._by_channel: Dict[int, List[int]] = {}
+
+    @property
+    def head_seq(self) -> int:
+        """Sequence number of the newest entry (0 when empty)"""
+        return self._first_seq + len(self._entries) - 1
+
+    @property
+    def oldest_seq(self) -> int:
+        return self._first_seq
+
+    def append(self, kind: str, channel_id: int, message_id: int, **data) -> int:
+        seq = self.head_seq + 1
+        self._entries.append({
+            "seq": seq,
+            "kind": kind,
+            "channel_id": channel_id,
+            "message_id": message_id,
+            "time": time.time(),
+            **data,
+        })
+        self._by_channel.setdefault(channel_id, []).append(seq)
+        # Trim in chunks, so appends stay amortized O(1)
+        if len(self._entries) > self.max_entries * 1.1:
+            self._trim(len(self._entries) - self.max_entries)
+        return seq
+
+    def _trim(self, count: int):
+        del self._entries[:count]
+        self._first_seq += count
+        for channel_id in list(self._by_channel):
+            seqs = self._by_channel[channel_id]
+            cut = bisect_right(seqs, self._first_seq - 1)
+            if cut == len(seqs):
+                del self._by_channel[channel_id]
+            elif cut:
+                del seqs[:cut]
+
+    def read(self, after_seq: int, limit: int, channel_id: Optional[int] = None) -> dict:
+        """Up to `limit` entries with seq > after_seq (optionally of one channel), oldest first"""
+        start_seq = max(after_seq + 1, self._first_seq)
+        if channel_id is None:
+            start = start_seq - self._first_seq
+            entries = self._entries[start:start + limit]
+        else:
+            seqs = self._by_channel.get(channel_id, [])
+            index = bisect_right(seqs, start_seq - 1)
+            entries = [self._entries[seq - self._first_seq] for seq in seqs[index:index + limit]]
+        return {
+            "epoch": self.epoch,
+            "changes": entries,
+            # Checkpoint for the next call: everything up to head was read if the page isn't full
+            "last_seq": entries[-1]["seq"] if len(entries) == limit else max(after_seq, self.head_seq),
+            "head_seq": self.head_seq,
+            "oldest_seq": self.oldest_seq,
+            # Entries after `after_seq` were already dropped from the log
+            "truncated": after_seq + 1 < self._first_seq,
+        }
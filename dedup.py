@@ -0,0 +1,240 @@
+"""
+Cross-channel duplicate and near-duplicate detection.
+
+Every message text that is fetched is assigned to a cluster:
+
+- exact duplicates (same text after normalizing case, whitespace and
+  punctuation) share a cluster via a hash of the normalized text
+- near-duplicates (light edits, added signatures or links) are found with
+  MinHash signatures over word shingles and an LSH index: signatures are cut
+  into bands, texts sharing a band become candidates, and a candidate joins
+  the cluster when the estimated Jaccard similarity reaches `threshold`
+
+A cluster remembers its earliest known message, so feeds can show only one
+copy (`?dedupe=true`) and translate it once. Everything is in memory and
+bounded by `max_messages`; the oldest indexed messages are forgotten first.
+
+Exact copies are found by their hash alone and never shingled. Shingles are
+hashed to 32 bits (CRC32) and the MinHash permutations run vectorized in
+numpy: a*x + b of 32-bit values stays below 2**64, so the products don't
+overflow before the reduction modulo the prime.
+"""
+import hashlib
+import re
+import threading
+import zlib
+from collections import OrderedDict
+from typing import Dict, List, NamedTuple, Optional, Sequence, Set, Tuple
+
+import numpy as np
+
+# Mersenne prime for the universal hash family used by MinHash
+_PRIME = np.uint64((1 << 61) - 1)
+_MAX_HASH = np.uint64((1 << 32) - 1)
+
+_WORD = re.compile(r"\w+", re.UNICODE)
+_URL = re.compile(r"https?://\S+|t\.me/\S+")
+
+MessageKey = Tuple[int, int]  # (channel id, message id)
+
+
+class DedupItem(NamedTuple):
+    channel_id: int
+    message_id: int
+    date: float  # Unix timestamp
+    text: str
+
+
+class _Cluster:
+    __slots__ = ("signature", "members", "text_hashes", "band_keys")
+
+    def __init__(self, signature: Optional[Tuple[int, ...]]):
+        self.signature = signature
+        self.members: Dict[MessageKey, float] = {}  # message -> date
+        # Index entries pointing at this cluster, removed with it
+        self.text_hashes: Set[str] = set()
+        self.band_keys: Set[Tuple[int, int]] = set()
+
+    def first(self) -> MessageKey:
+        """The earliest member (by date, then channel and message id)"""
+        return min(self.members, key=lambda key: (self.members[key], key))
+
+
+def _digest(text: str) -> str:
+    return hashlib.blake2b(text.encode("utf-8"), digest_size=8).hexdigest()
+
+
+def normalize(text: str) -> List[str]:
+    """Lowercased words without links or punctuation"""
+    return _WORD.findall(_URL.sub(" ", text.lower()))
+
+
+class DedupIndex:
+    """
+    Thread-safe cluster index; `assign` is CPU-bound and meant to run in a
+    worker thread.
+    """
+
+    def __init__(
+        self,
+        threshold: float = 0.6,
+        num_perm: int = 64,
+        bands: int = 16,
+        shingle_size: int = 3,
+        min_shingles: int = 4,
+        max_messages: int = 100000,
+    ):
+        if num_perm % bands:
+            raise ValueError("num_perm must be divisible by bands")
+        self.threshold = threshold
+        self.num_perm = num_perm
+        self.bands = bands
+        self.rows = num_perm // bands
+        self.shingle_size = shingle_size
+        self.min_shingles = min_shingles
+        self.max_messages = max_messages
+        # Fixed 32-bit coefficients, so signatures are comparable across restarts
+        seed = hashlib.sha256(b"dedup-minhash").digest()
+        coefficients = [hashlib.sha256(seed + i.to_bytes(4, "big")).digest() for i in range(num_perm)]
+        self._a = np.array([int.from_bytes(c[:4], "big") | 1 for c in coefficients], dtype=np.uint64)[:, None]
+        self._b = np.array([int.from_bytes(c[4:8], "big") for c in coefficients], dtype=np.uint64)[:, None]
+        self._lock = threading.Lock()
+        self._clusters: Dict[str, _Cluster] = {}
+        self._exact: Dict[str, str] = {}  # normalized text hash -> cluster id
+        self._bands: Dict[Tuple[int, int], Set[str]] = {}  # (band, band hash) -> cluster ids
+        # message -> (text hash, cluster id), oldest first
+        self._messages: "OrderedDict[MessageKey, Tuple[str, str]]" = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._messages)
+
+    def _shingles(self, words: List[str]) -> Set[int]:
+        """32-bit hashes of the word shingles"""
+        size = self.shingle_size if len(words) >= self.shingle_size else 1
+        return {
+            zlib.crc32(" ".join(words[i:i + size]).encode("utf-8"))
+            for i in range(len(words) - size + 1)
+        }
+
+    def signature(self, shingles: Set[int]) -> Tuple[int, ...]:
+        x = np.fromiter(shingles, dtype=np.uint64, count=len(shingles))[None, :]
+        return tuple(((self._a * x + self._b) % _PRIME & _MAX_HASH).min(axis=1).tolist())
+
+    @staticmethod
+    def similarity(first: Sequence[int], second: Sequence[int]) -> float:
+        """Estimated Jaccard similarity of two signatures"""
+        return sum(x == y for x, y in zip(first, second)) / len(first)
+
+    def _band_keys(self, signature: Tuple[int, ...]) -> Tuple[Tuple[int, int], ...]:
+        return tuple(
+            (band, hash(signature[band * self.rows:(band + 1) * self.rows]))
+            for band in range(self.bands)
+        )
+
+    def assign(self, items: Sequence[DedupItem]) -> List[Optional[str]]:
+        """Cluster id per item (None for texts without words)"""
+        with self._lock:
+            return [self._assign(item) for item in items]
+
+    def _assign(self, item: DedupItem) -> Optional[str]:
+        words = normalize(item.text)
+        if not words:
+            return None
+        text_hash = _digest(" ".join(words))
+        key = (item.channel_id, item.message_id)
+        known = self._messages.get(key)
+        if known is not None:
+            if known[0] == text_hash:
+                self._messages.move_to_end(key)
+                return known[1]
+            # Edited since it was indexed
+            self._forget(key)
+
+        cluster_id = self._exact.get(text_hash)
+        if cluster_id in self._clusters:
+            # Exact copy: the cluster already holds this text's bands
+            self._clusters[cluster_id].members[key] = item.date
+            self._remember(key, text_hash, cluster_id)
+            return cluster_id
+
+        signature = None
+        band_keys: Tuple = ()
+        shingles = self._shingles(words)
+        if len(shingles) >= self.min_shingles:
+            signature = self.signature(shingles)
+            band_keys = self._band_keys(signature)
+            cluster_id = self._nearest(signature, band_keys)
+
+        if cluster_id is None or cluster_id not in self._clusters:
+            cluster_id = text_hash
+            self._clusters[cluster_id] = _Cluster(signature)
+        cluster = self._clusters[cluster_id]
+        cluster.members[key] = item.date
+        if cluster.signature is None:
+            cluster.signature = signature
+
+        if text_hash not in self._exact:
+            self._exact[text_hash] = cluster_id
+            cluster.text_hashes.add(text_hash)
+        for band_key in band_keys:
+            self._bands.setdefault(band_key, set()).add(cluster_id)
+        cluster.band_keys.update(band_keys)
+        self._remember(key, text_hash, cluster_id)
+        return cluster_id
+
+    def _remember(self, key: MessageKey, text_hash: str, cluster_id: str):
+        self._messages[key] = (text_hash, cluster_id)
+        while len(self._messages) > self.max_messages:
+            self._forget(next(iter(self._messages)))
+
+    def _nearest(self, signature: Tuple[int, ...], band_keys) -> Optional[str]:
+        candidates: Set[str] = set()
+        for band_key in band_keys:
+            candidates |= self._bands.get(band_key, set())
+        best, best_score = None, self.threshold
+        for cluster_id in candidates:
+            cluster = self._clusters.get(cluster_id)
+            if cluster is None or cluster.signature is None:
+                continue
+            score = self.similarity(signature, cluster.signature)
+            if score >= best_score:
+                best, best_score = cluster_id, score
+        return best
+
+    def _forget(self, key: MessageKey):
+        _, cluster_id = self._messages.pop(key)
+        cluster = self._clusters.get(cluster_id)
+        if cluster is None:
+            return
+        cluster.members.pop(key, None)
+        if cluster.members:
+            return
+        del self._clusters[cluster_id]
+        for text_hash in cluster.text_hashes:
+            self._exact.pop(text_hash, None)
+        for band_key in cluster.band_keys:
+            members = self._bands.get(band_key)
+            if members is not None:
+                members.discard(cluster_id)
+                if not members:
+                    del self._bands[band_key]
+
+    def remove(self, channel_id: int, message_id: int):
+        """Forget a deleted message; the next earliest copy becomes the first"""
+        with self._lock:
+            if (channel_id, message_id) in self._messages:
+                self._forget((channel_id, message_id))
+
+    def is_first(self, cluster_id: Optional[str], channel_id: int, message_id: int) -> bool:
+        """True if the message is the earliest known copy of its cluster"""
+        with self._lock:
+            cluster = self._clusters.get(cluster_id) if cluster_id is not None else None
+            return cluster is None or cluster.first() == (channel_id, message_id)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "messages": len(self._messages),
+                "clusters": len(self._clusters),
+                "duplicate_clusters": sum(1 for c in self._clusters.values() if len(c.members) > 1),
+            }
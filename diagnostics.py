@@ -0,0 +1,218 @@
+"""
+On-demand diagnostics for the running API process.
+
+- `StackSampler`: py-spy-style sampling profiler implemented with
+  `sys._current_frames()`; produces collapsed stacks ("a;b;c 42") that can be
+  fed straight into flamegraph.pl / speedscope / inferno.
+- `dump_tasks()`: snapshot of every asyncio task and where it is suspended.
+- `measure_loop_lag()`: how late the event loop wakes up from short sleeps;
+  a large lag means something is blocking the loop.
+- `LoopWatchdog`: the same measurement running continuously, logging the
+  stack of whatever blocks the loop past a threshold.
+"""
+import asyncio
+import logging
+import os
+import sys
+import threading
+import time
+import traceback
+from collections import Counter, deque
+from typing import Dict, List, Optional
+
+# Frames from these files are dropped so the profiler doesn't profile itself
+_SELF_FILES = {os.path.abspath(__file__)}
+
+
+def _format_frame(frame) -> str:
+    code = frame.f_code
+    return f"{code.co_name} ({os.path.basename(code.co_filename)}:{frame.f_lineno})"
+
+
+def _collapse(frame) -> Optional[str]:
+    """Root-first, semicolon-joined stack for a frame"""
+    stack = []
+    while frame is not None:
+        if os.path.abspath(frame.f_code.co_filename) in _SELF_FILES:
+            return None
+        stack.append(_format_frame(frame))
+        frame = frame.f_back
+    stack.reverse()
+    return ";".join(stack)
+
+
+class StackSampler:
+    """Samples the stacks of all threads at a fixed interval from a helper thread"""
+
+    def __init__(self, interval: float = 0.005):
+        self.interval = interval
+        self.samples: Counter = Counter()
+        self.sample_count = 0
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def _run(self):
+        own_id = threading.get_ident()
+        while not self._stop.is_set():
+            names = {t.ident: t.name for t in threading.enumerate()}
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id == own_id:
+                    continue
+                stack = _collapse(frame)
+                if stack:
+                    self.samples[f"{names.get(thread_id, thread_id)};{stack}"] += 1
+            self.sample_count += 1
+            self._stop.wait(self.interval)
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run, name="stack-sampler", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread:
+            self._thread.join()
+
+    def collapsed(self) -> str:
+        """Samples in the collapsed-stack format, heaviest first"""
+        return "\n".join(f"{stack} {count}" for stack, count in self.samples.most_common())
+
+
+def dump_tasks(stack_limit: int = 20) -> List[Dict]:
+    """Describe every pending asyncio task and its suspended stack"""
+    tasks = []
+    for task in asyncio.all_tasks():
+        coro = task.get_coro()
+        tasks.append({
+            "name": task.get_name(),
+            "coro": getattr(coro, "__qualname__", repr(coro)),
+            "done": task.done(),
+            "stack": [_format_frame(frame) for frame in task.get_stack(limit=stack_limit)],
+        })
+    return tasks
+
+
+async def measure_loop_lag(duration: float, interval: float = 0.01) -> Dict:
+    """Sleep `interval` repeatedly for `duration` seconds and report wake-up delays"""
+    lags = []
+    deadline = time.perf_counter() + duration
+    while time.perf_counter() < deadline:
+        start = time.perf_counter()
+        await asyncio.sleep(interval)
+        lags.append(max(0.0, time.perf_counter() - start - interval))
+    if not lags:
+        return {"samples": 0, "mean_ms": 0.0, "p99_ms": 0.0, "max_ms": 0.0}
+    ordered = sorted(lags)
+    return {
+        "samples": len(lags),
+        "mean_ms": round(sum(lags) / len(lags) * 1000, 3),
+        "p99_ms": round(ordered[min(len(ordered) - 1, int(len(ordered) * 0.99))] * 1000, 3),
+        "max_ms": round(ordered[-1] * 1000, 3),
+    }
+
+
+async def profile(seconds: float, interval: float = 0.005) -> Dict:
+    """Run the sampler and the loop-lag probe together for `seconds`"""
+    sampler = StackSampler(interval=interval)
+    sampler.start()
+    try:
+        loop_lag = await measure_loop_lag(seconds)
+    finally:
+        sampler.stop()
+    return {
+        "seconds": seconds,
+        "interval_ms": interval * 1000,
+        "samples": sampler.sample_count,
+        "collapsed": sampler.collapsed(),
+        "loop_lag": loop_lag,
+        "tasks": dump_tasks(),
+    }
+
+
+class LoopWatchdog:
+    """
+    Continuously measures event-loop lag.
+
+    A heartbeat coroutine sleeps `interval` seconds and records how late it
+    wakes up. A helper thread checks that heartbeat; when the loop has been
+    stuck for longer than `threshold` it grabs the loop thread's stack, so the
+    blocking call is named in the log (only when `debug` is set, since
+    capturing stacks has a cost).
+    """
+
+    def __init__(self, interval: float = 0.1, threshold: float = 0.1, debug: bool = False, logger=None, observer=None):
+        self.interval = interval
+        self.observer = observer
+        self.threshold = threshold
+        self.debug = debug
+        self.logger = logger or logging.getLogger("loop_watchdog")
+        self.lag = 0.0
+        self.max_lag = 0.0
+        self.blocked_count = 0
+        self.last_blocking_stack: Optional[List[str]] = None
+        self._recent: deque = deque(maxlen=600)
+        self._last_beat = time.monotonic()
+        self._loop_thread_id: Optional[int] = None
+        self._task: Optional[asyncio.Task] = None
+        self._thread: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+
+    async def _heartbeat(self):
+        while True:
+            start = time.monotonic()
+            self._last_beat = start
+            await asyncio.sleep(self.interval)
+            now = time.monotonic()
+            self._last_beat = now
+            lag = max(0.0, now - start - self.interval)
+            self.lag = lag
+            self.max_lag = max(self.max_lag, lag)
+            self._recent.append(lag)
+            if self.observer:
+                self.observer(lag)
+            if lag > self.threshold:
+                self.blocked_count += 1
+                self.logger.warning("Event loop blocked for %.0f ms", lag * 1000)
+
+    def _watch(self):
+        reported_beat = None
+        while not self._stop.wait(self.threshold / 2):
+            beat = self._last_beat
+            stalled = time.monotonic() - beat - self.interval
+            if stalled <= self.threshold or beat == reported_beat:
+                continue
+            # Report each stall once, while it is still in progress
+            reported_beat = beat
+            frame = sys._current_frames().get(self._loop_thread_id)
+            if frame is None:
+                continue
+            stack = traceback.format_stack(frame)
+            self.last_blocking_stack = [line.rstrip() for line in stack[-15:]]
+            self.logger.warning(
+                "Event loop blocked for more than %.0f ms in:\n%s",
+                stalled * 1000,
+                "".join(stack[-15:]),
+            )
+
+    def start(self):
+        self._loop_thread_id = threading.get_ident()
+        self._task = asyncio.get_running_loop().create_task(self._heartbeat(), name="loop-watchdog")
+        if self.debug:
+            self._thread = threading.Thread(target=self._watch, name="loop-watchdog", daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        if self._task:
+            self._task.cancel()
+        self._stop.set()
+
+    def stats(self) -> Dict:
+        recent = sorted(self._recent)
+        return {
+            "lag_ms": round(self.lag * 1000, 3),
+            "p99_ms": round(recent[min(len(recent) - 1, int(len(recent) * 0.99))] * 1000, 3) if recent else 0.0,
+            "max_ms": round(self.max_lag * 1000, 3),
+            "blocked_count": self.blocked_count,
+            "threshold_ms": self.threshold * 1000,
+            "last_blocking_stack": self.last_blocking_stack,
+        }
@@ -0,0 +1,422 @@
+"""
+Local stand-in for Telegram.
+
+`FakeTelegramClient` implements the subset of the TelegramClient API used by
+main.py and returns real Telethon objects (Channel, Message, MessageReactions,
+MessageMediaPhoto), so the whole pipeline runs unchanged without network
+access. Latency and flood waits are configurable, which makes performance work
+reproducible offline.
+
+Enable it with TELEGRAM_BACKEND=fake (TRANSLATOR_BACKEND=fake swaps Google for
+the local translation engine in translation.py). Settings are read from the
+environment:
+
+- FAKE_TELEGRAM_CHANNELS        number of synthetic channels (default 20)
+- FAKE_TELEGRAM_MESSAGES        messages per channel (default 5000)
+- FAKE_TELEGRAM_LATENCY_MS      latency per RPC, e.g. per history page (default 50)
+- FAKE_TELEGRAM_FLOOD_RATE      probability that an RPC raises FloodWaitError (default 0)
+- FAKE_TELEGRAM_FLOOD_SECONDS   seconds reported by those flood waits (default 5)
+- FAKE_TELEGRAM_SEED            random seed (default 42)
+- FAKE_TELEGRAM_POST_INTERVAL   seconds between new posts in a random channel,
+                                delivered to NewMessage handlers (default 0: off)
+- FAKE_TELEGRAM_EDIT_RATE       probability that a tick edits a recent post
+                                instead (MessageEdited; default 0)
+- FAKE_TELEGRAM_DELETE_RATE     probability that a tick deletes a recent post
+                                instead (MessageDeleted; default 0)
+- FAKE_TRANSLATOR_LATENCY_MS    blocking latency per translation of the local
+                                translation engine (default 150)
+"""
+import asyncio
+import os
+import random
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List, Optional
+
+from telethon import events
+from telethon.errors import FloodWaitError
+from telethon.tl.functions.channels import GetFullChannelRequest
+from telethon.tl.types import (
+    Channel,
+    ChannelFull,
+    UpdateDeleteChannelMessages,
+    ChatPhotoEmpty,
+    Message,
+    MessageMediaPhoto,
+    MessageReactions,
+    PeerChannel,
+    PeerNotifySettings,
+    PhotoEmpty,
+    ReactionCount,
+    ReactionCustomEmoji,
+    ReactionEmoji,
+)
+from telethon.tl.types.messages import ChatFull
+
+# Telegram returns history in pages of at most 100 messages
+HISTORY_PAGE_SIZE = 100
+DIALOGS_PAGE_SIZE = 100
+
+RUSSIAN_SENTENCES = [
+    "Сегодня в городе прошла большая встреча жителей.",
+    "Власти сообщили о новых ограничениях на въезд.",
+    "Цены на топливо снова выросли за последнюю неделю.",
+    "Погода в выходные будет солнечной и тёплой.",
+    "В центре открылся новый музей современного искусства.",
+    "Эксперты обсуждают последствия принятого решения.",
+]
+UKRAINIAN_SENTENCES = [
+    "Сьогодні в місті відбулася велика зустріч мешканців.",
+    "Влада повідомила про нові обмеження на в'їзд.",
+    "Ціни на пальне знову зросли за останній тиждень.",
+    "Погода на вихідних буде сонячною і теплою.",
+]
+ENGLISH_SENTENCES = [
+    "The meeting has been postponed until next week.",
+    "New figures were published this morning.",
+    "Officials confirmed the report later in the day.",
+    "Traffic in the city centre is heavier than usual.",
+]
+EMOJIS = ["👍", "❤", "🔥", "😢", "👎", "😁", "🤔"]
+
+
+class FakeTelegramClient:
+    """In-memory TelegramClient stand-in with synthetic channels and messages"""
+
+    def __init__(
+        self,
+        channels: int = 20,
+        messages_per_channel: int = 5000,
+        latency: float = 0.05,
+        flood_rate: float = 0.0,
+        flood_seconds: int = 5,
+        seed: int = 42,
+        post_interval: float = 0.0,
+        edit_rate: float = 0.0,
+        delete_rate: float = 0.0,
+    ):
+        self.latency = latency
+        self.post_interval = post_interval
+        self.edit_rate = edit_rate
+        self.delete_rate = delete_rate
+        self.flood_rate = flood_rate
+        self.flood_seconds = flood_seconds
+        self.messages_per_channel = messages_per_channel
+        self.seed = seed
+        self.rpc_count = 0
+        self._connected = False
+        self._rng = random.Random(seed)
+        self._now = datetime.now(timezone.utc).replace(microsecond=0)
+        self._channels: Dict[int, Channel] = {}
+        # Like Telegram, dialogs don't carry member counts; GetFullChannel does
+        self._participants: Dict[int, int] = {}
+        self._messages: Dict[int, List[Message]] = {}
+        self._handlers: List[tuple] = []
+        self._poster: Optional[asyncio.Task] = None
+        for index in range(channels):
+            channel_id = 1_000_000_000 + index
+            self._channels[channel_id] = Channel(
+                id=channel_id,
+                title=f"Synthetic channel {index}",
+                photo=ChatPhotoEmpty(),
+                date=self._now - timedelta(days=365),
+                broadcast=True,
+                access_hash=self._rng.getrandbits(63),
+                username=f"synthetic_{index}",
+            )
+            self._participants[channel_id] = self._rng.randint(100, 500_000)
+
+    @classmethod
+    def from_env(cls) -> "FakeTelegramClient":
+        return cls(
+            channels=int(os.getenv("FAKE_TELEGRAM_CHANNELS", "20")),
+            messages_per_channel=int(os.getenv("FAKE_TELEGRAM_MESSAGES", "5000")),
+            latency=float(os.getenv("FAKE_TELEGRAM_LATENCY_MS", "50")) / 1000,
+            flood_rate=float(os.getenv("FAKE_TELEGRAM_FLOOD_RATE", "0")),
+            flood_seconds=int(os.getenv("FAKE_TELEGRAM_FLOOD_SECONDS", "5")),
+            seed=int(os.getenv("FAKE_TELEGRAM_SEED", "42")),
+            post_interval=float(os.getenv("FAKE_TELEGRAM_POST_INTERVAL", "0")),
+            edit_rate=float(os.getenv("FAKE_TELEGRAM_EDIT_RATE", "0")),
+            delete_rate=float(os.getenv("FAKE_TELEGRAM_DELETE_RATE", "0")),
+        )
+
+    # -- connection -------------------------------------------------------
+
+    async def start(self):
+        await self._rpc()
+        self._connected = True
+        if self.post_interval and self._poster is None:
+            self._poster = asyncio.create_task(self._post_periodically())
+        return self
+
+    async def connect(self):
+        self._connected = True
+
+    async def is_user_authorized(self) -> bool:
+        return True
+
+    def is_connected(self) -> bool:
+        return self._connected
+
+    async def disconnect(self):
+        self._connected = False
+        if self._poster is not None:
+            self._poster.cancel()
+            self._poster = None
+
+    # -- updates ----------------------------------------------------------
+
+    def on(self, event):
+        def decorator(handler):
+            self.add_event_handler(handler, event)
+            return handler
+        return decorator
+
+    def add_event_handler(self, handler, event=None):
+        """
+        NewMessage, MessageEdited and MessageDeleted handlers are fired by
+        post_message, edit_message and delete_messages
+        """
+        self._handlers.append((handler, event))
+
+    def _dispatch(self, event_type, event):
+        for handler, registered in self._handlers:
+            # Exact type: MessageEdited subclasses NewMessage
+            if (registered if isinstance(registered, type) else type(registered)) is event_type:
+                asyncio.get_running_loop().create_task(handler(event))
+
+    def post_message(self, channel_id: int, text: Optional[str] = None) -> Message:
+        """Append a new message to a channel and deliver it to NewMessage handlers"""
+        messages = self._channel_messages(channel_id)
+        channel = self._channels[channel_id]
+        message = Message(
+            id=messages[-1].id + 1 if messages else 1,
+            peer_id=PeerChannel(channel_id),
+            date=datetime.now(timezone.utc).replace(microsecond=0),
+            message=text if text is not None else self._generate_text(self._rng),
+            post=True,
+            views=1,
+            forwards=0,
+        )
+        message._client = self
+        message._sender = channel
+        message._chat = channel
+        messages.append(message)
+        self._dispatch(events.NewMessage, FakeNewMessageEvent(message))
+        return message
+
+    async def edit_message(self, entity, message, text: str) -> Message:
+        """Change a message's text and deliver it to MessageEdited handlers"""
+        await self._rpc()
+        channel = await self.get_entity(entity)
+        message_id = message if isinstance(message, int) else message.id
+        target = next((m for m in self._channel_messages(channel.id) if m.id == message_id), None)
+        if target is None:
+            raise ValueError(f"Message {message_id} not found")
+        target.message = text
+        target.edit_date = datetime.now(timezone.utc).replace(microsecond=0)
+        self._dispatch(events.MessageEdited, FakeNewMessageEvent(target))
+        return target
+
+    async def delete_messages(self, entity, message_ids) -> None:
+        """Remove messages and deliver their ids to MessageDeleted handlers"""
+        await self._rpc()
+        channel = await self.get_entity(entity)
+        ids = [message_ids] if isinstance(message_ids, int) else list(message_ids)
+        messages = self._channel_messages(channel.id)
+        messages[:] = [m for m in messages if m.id not in ids]
+        self._dispatch(events.MessageDeleted, FakeMessageDeletedEvent(channel.id, ids))
+
+    async def _post_periodically(self):
+        channel_ids = list(self._channels)
+        while True:
+            await asyncio.sleep(self.post_interval)
+            channel_id = self._rng.choice(channel_ids)
+            recent = self._channel_messages(channel_id)[-20:]
+            roll = self._rng.random()
+            if recent and roll < self.edit_rate:
+                message = self._rng.choice(recent)
+                await self.edit_message(channel_id, message, self._generate_text(self._rng))
+            elif recent and roll < self.edit_rate + self.delete_rate:
+                await self.delete_messages(channel_id, [self._rng.choice(recent).id])
+            else:
+                self.post_message(channel_id)
+
+    # -- RPC simulation ---------------------------------------------------
+
+    async def _rpc(self):
+        """Simulate one round-trip to Telegram"""
+        self.rpc_count += 1
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        if self.flood_rate and self._rng.random() < self.flood_rate:
+            raise FloodWaitError(request=None, capture=self.flood_seconds)
+
+    # -- synthetic data ---------------------------------------------------
+
+    def _generate_text(self, rng: random.Random) -> str:
+        corpus = rng.choices(
+            [RUSSIAN_SENTENCES, UKRAINIAN_SENTENCES, ENGLISH_SENTENCES],
+            weights=[5, 3, 2],
+        )[0]
+        return " ".join(rng.choice(corpus) for _ in range(rng.randint(1, 6)))
+
+    def _generate_reactions(self, rng: random.Random) -> Optional[MessageReactions]:
+        if rng.random() < 0.3:
+            return None
+        results = []
+        for emoji in rng.sample(EMOJIS, rng.randint(1, 4)):
+            results.append(ReactionCount(reaction=ReactionEmoji(emoticon=emoji), count=rng.randint(1, 5000)))
+        if rng.random() < 0.1:
+            results.append(ReactionCount(reaction=ReactionCustomEmoji(document_id=rng.getrandbits(40)), count=rng.randint(1, 50)))
+        return MessageReactions(results=results)
+
+    def _channel_messages(self, channel_id: int) -> List[Message]:
+        """Messages of a channel, oldest first (generated on first use)"""
+        messages = self._messages.get(channel_id)
+        if messages is not None:
+            return messages
+        channel = self._channels[channel_id]
+        rng = random.Random(self.seed * 1_000_003 + channel_id)
+        date = self._now - timedelta(minutes=15 * self.messages_per_channel)
+        messages = []
+        for message_id in range(1, self.messages_per_channel + 1):
+            date += timedelta(minutes=rng.randint(1, 29))
+            has_media = rng.random() < 0.15
+            message = Message(
+                id=message_id,
+                peer_id=PeerChannel(channel_id),
+                date=min(date, self._now),
+                message="" if has_media and rng.random() < 0.5 else self._generate_text(rng),
+                post=True,
+                media=MessageMediaPhoto() if has_media else None,
+                views=rng.randint(100, 200_000),
+                forwards=rng.randint(0, 2_000),
+                reactions=self._generate_reactions(rng),
+            )
+            message._client = self
+            message._sender = channel
+            message._chat = channel
+            messages.append(message)
+        self._messages[channel_id] = messages
+        return messages
+
+    # -- TelegramClient API -----------------------------------------------
+
+    async def get_entity(self, peer):
+        await self._rpc()
+        if isinstance(peer, Channel):
+            return peer
+        if isinstance(peer, int):
+            channel = self._channels.get(peer)
+        else:
+            username = str(peer).lstrip("@").lower()
+            channel = next((c for c in self._channels.values() if c.username == username), None)
+        if channel is None:
+            raise ValueError(f'Cannot find any entity corresponding to "{peer}"')
+        return channel
+
+    async def get_me(self):
+        return None
+
+    async def __call__(self, request, ordered: bool = False):
+        """Send a request, or a list of them in one container (one round-trip)"""
+        await self._rpc()
+        if isinstance(request, list):
+            return [self._handle(r) for r in request]
+        return self._handle(request)
+
+    def _handle(self, request):
+        if isinstance(request, GetFullChannelRequest):
+            channel_id = getattr(request.channel, "channel_id", None) or request.channel.id
+            channel = self._channels.get(channel_id)
+            if channel is None:
+                raise ValueError(f"Unknown channel {channel_id}")
+            messages = self._channel_messages(channel_id)
+            full = ChannelFull(
+                id=channel_id,
+                about="",
+                read_inbox_max_id=messages[-1].id if messages else 0,
+                read_outbox_max_id=0,
+                unread_count=0,
+                chat_photo=PhotoEmpty(id=0),
+                notify_settings=PeerNotifySettings(),
+                bot_info=[],
+                pts=0,
+                participants_count=self._participants[channel_id],
+            )
+            return ChatFull(full_chat=full, chats=[channel], users=[])
+        raise NotImplementedError(f"{type(request).__name__} is not supported by the fake client")
+
+    async def iter_dialogs(self, limit: Optional[int] = None):
+        channels = list(self._channels.values())
+        if limit is not None:
+            channels = channels[:limit]
+        for start in range(0, len(channels), DIALOGS_PAGE_SIZE):
+            await self._rpc()
+            for channel in channels[start:start + DIALOGS_PAGE_SIZE]:
+                last = self._channel_messages(channel.id)[-1] if self.messages_per_channel else None
+                yield FakeDialog(channel, last, unread_count=self._rng.randint(0, 200))
+
+    async def iter_messages(
+        self,
+        entity,
+        limit: Optional[int] = None,
+        offset_id: int = 0,
+        min_id: int = 0,
+        max_id: int = 0,
+        offset_date: Optional[datetime] = None,
+        reverse: bool = False,
+    ):
+        channel = await self.get_entity(entity)
+        messages = self._channel_messages(channel.id)
+        # Same semantics as GetHistoryRequest: newest first, ids strictly
+        # between min_id and max_id, older than offset_id / offset_date
+        selected = [
+            m for m in reversed(messages)
+            if (not offset_id or m.id < offset_id)
+            and (not max_id or m.id < max_id)
+            and (not min_id or m.id > min_id)
+            and (offset_date is None or m.date < offset_date)
+        ]
+        if reverse:
+            selected.reverse()
+        if limit is not None:
+            selected = selected[:limit]
+        for start in range(0, len(selected), HISTORY_PAGE_SIZE):
+            await self._rpc()
+            for message in selected[start:start + HISTORY_PAGE_SIZE]:
+                yield message
+
+    async def get_messages(self, entity, *args, **kwargs):
+        return [m async for m in self.iter_messages(entity, *args, **kwargs)]
+
+
+class FakeNewMessageEvent:
+    """The parts of events.NewMessage.Event (and MessageEdited.Event) used by main.py"""
+
+    def __init__(self, message: Message):
+        self.message = message
+        self.chat_id = message.chat_id
+
+
+class FakeMessageDeletedEvent:
+    """The parts of events.MessageDeleted.Event used by main.py"""
+
+    def __init__(self, channel_id: int, message_ids: List[int]):
+        self.deleted_ids = message_ids
+        self.deleted_id = message_ids[0] if message_ids else None
+        self.original_update = UpdateDeleteChannelMessages(channel_id=channel_id, messages=message_ids, pts=0, pts_count=len(message_ids))
+
+
+class FakeDialog:
+    """Mimics telethon.tl.custom.Dialog for synthetic channels"""
+
+    def __init__(self, entity: Channel, message: Optional[Message], unread_count: int = 0):
+        self.entity = entity
+        self.id = entity.id
+        self.name = entity.title
+        self.title = entity.title
+        self.message = message
+        self.date = message.date if message else None
+        self.unread_count = unread_count
+        self.is_channel = True
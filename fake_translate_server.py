@@ -0,0 +1,70 @@
+"""
+Local stand-in for the Google Translate endpoint used by `GoogleEngine`.
+
+Answers `/translate_a/single` in the same JSON shape as the real service with
+"[src->tgt] text" per line (lines without letters, like the delimiters of
+packed requests, are kept), after a configurable delay, and can fail a share of
+requests with HTTP 503 to exercise the engine's retries. `GET /stats` counts
+requests and distinct client connections, which shows whether the engine
+reuses its keep-alive connections.
+
+    python fake_translate_server.py --port 8090 --latency-ms 150
+    GOOGLE_TRANSLATE_URL=http://127.0.0.1:8090 python benchmarks/bench_translation.py --engines google
+"""
+import argparse
+import asyncio
+import random
+from urllib.parse import parse_qs
+
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse
+
+from translation import fake_translation
+
+
+def create_app(latency: float = 0.15, failure_rate: float = 0.0, seed: int = 42) -> FastAPI:
+    app = FastAPI(title="Fake translation service")
+    rng = random.Random(seed)
+    stats = {"requests": 0, "failures": 0, "connections": set()}
+
+    @app.api_route("/translate_a/single", methods=["GET", "POST"])
+    async def translate(request: Request, sl: str = "auto", tl: str = "en"):
+        stats["requests"] += 1
+        if request.client:
+            stats["connections"].add((request.client.host, request.client.port))
+        if latency:
+            await asyncio.sleep(latency)
+        if failure_rate and rng.random() < failure_rate:
+            stats["failures"] += 1
+            return JSONResponse({"error": "unavailable"}, status_code=503)
+        text = request.query_params.get("q")
+        if text is None:
+            text = parse_qs((await request.body()).decode()).get("q", [""])[0]
+        source = "ru" if sl == "auto" else sl
+        return [[[fake_translation(text, source, tl), text, None, None, 10]], None, source]
+
+    @app.get("/stats")
+    async def get_stats():
+        return {
+            "requests": stats["requests"],
+            "failures": stats["failures"],
+            "connections": len(stats["connections"]),
+        }
+
+    return app
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Local stand-in for the online translation service")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8090)
+    parser.add_argument("--latency-ms", type=float, default=150, help="Delay per translation")
+    parser.add_argument("--failure-rate", type=float, default=0.0, help="Share of requests answered with HTTP 503")
+    args = parser.parse_args(argv)
+
+    import uvicorn
+    uvicorn.run(create_app(args.latency_ms / 1000, args.failure_rate), host=args.host, port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,385 @@
+"""
+Local IPC between stateless HTTP workers and the single Telegram owner process.
+
+Only one process may open the Telethon session, so with
+`uvicorn main:app --workers N` the Telegram client, the translation engines
+and the caches live in the owner process (`python owner.py`), and every
+worker forwards pipeline calls to it:
+
+    TELEGRAM_OWNER_SOCKET=/tmp/telegram_owner.sock python owner.py
+    TELEGRAM_OWNER_SOCKET=/tmp/telegram_owner.sock uvicorn main:app --workers 4
+
+TELEGRAM_OWNER_SOCKET is a Unix socket path, or tcp://host:port where Unix
+sockets are not available (Windows). The Unix socket is only accessible to
+the owner's user (0600). Every connection starts with a handshake carrying
+TELEGRAM_OWNER_SECRET, which the owner checks before serving any call; it is
+required with tcp://, where any local user could otherwise connect:
+
+    -> {"auth": "<TELEGRAM_OWNER_SECRET>"}
+    <- {"auth": true}
+
+Pipeline functions in main.py are marked with `@owned`. In the owner (or
+when no socket is configured) they run locally; in a worker they are sent to
+the owner as newline-delimited JSON over one multiplexed connection:
+
+    -> {"id": 1, "method": "fetch_messages", "params": {...}}
+    <- {"id": 1, "result": [...], "timings": {"iter_messages": 0.08, ...}}
+    <- {"id": 1, "error": {"status": 404, "detail": "Channel not found: ..."}}
+
+Async generators marked with `@owned_stream` (live subscriptions) are
+forwarded the same way; the owner sends one line per item until the stream
+ends, and the worker cancels it when its consumer goes away:
+
+    -> {"id": 2, "method": "subscribe_messages", "params": {...}, "stream": true}
+    <- {"id": 2, "event": {...}}
+    <- {"id": 2, "end": true}
+    -> {"id": 2, "cancel": true}
+
+Arguments and results must be JSON-serializable, and owned functions are
+always called with keyword arguments.
+"""
+import asyncio
+import functools
+import hmac
+import itertools
+import json
+import logging
+import os
+import socket
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, Optional
+
+from fastapi import HTTPException
+
+import metrics
+
+OWNER_SOCKET = os.getenv("TELEGRAM_OWNER_SOCKET")
+# Largest single IPC message (a page of 1000 messages is well below this)
+MAX_MESSAGE_BYTES = 64 * 1024 * 1024
+CALL_TIMEOUT = float(os.getenv("TELEGRAM_OWNER_TIMEOUT", "120"))
+# Shared between the owner and its workers; mandatory for tcp:// sockets
+OWNER_SECRET = os.getenv("TELEGRAM_OWNER_SECRET", "")
+# How long either side waits for the other's handshake line
+HANDSHAKE_TIMEOUT = 5.0
+
+logger = logging.getLogger("ipc")
+
+_handlers: Dict[str, Callable[..., Awaitable[Any]]] = {}
+_stream_handlers: Dict[str, Callable[..., AsyncIterator[Any]]] = {}
+_is_owner = False
+
+
+def set_owner():
+    """Mark this process as the Telegram owner (call before importing main)"""
+    global _is_owner
+    _is_owner = True
+
+
+def is_worker() -> bool:
+    """True when this process must forward pipeline calls to the owner"""
+    return bool(OWNER_SOCKET) and not _is_owner
+
+
+def _parse_address(address: str):
+    if address.startswith("tcp://"):
+        host, _, port = address[len("tcp://"):].rpartition(":")
+        return host or "127.0.0.1", int(port)
+    return address
+
+
+async def _open_connection(address: str):
+    parsed = _parse_address(address)
+    if isinstance(parsed, tuple):
+        return await asyncio.open_connection(*parsed, limit=MAX_MESSAGE_BYTES)
+    return await asyncio.open_unix_connection(parsed, limit=MAX_MESSAGE_BYTES)
+
+
+class OwnerClient:
+    """Worker side: one multiplexed connection to the owner, reconnecting on demand"""
+
+    def __init__(self, address: str):
+        self.address = address
+        self._ids = itertools.count(1)
+        self._pending: Dict[int, asyncio.Future] = {}
+        self._streams: Dict[int, asyncio.Queue] = {}
+        self._writer: Optional[asyncio.StreamWriter] = None
+        self._reader_task: Optional[asyncio.Task] = None
+        self._connect_lock = asyncio.Lock()
+
+    @property
+    def connected(self) -> bool:
+        return self._writer is not None and not self._writer.is_closing()
+
+    async def _ensure_connected(self):
+        if self.connected:
+            return
+        async with self._connect_lock:
+            if self.connected:
+                return
+            reader, writer = await _open_connection(self.address)
+            try:
+                writer.write(json.dumps({"auth": OWNER_SECRET}).encode() + b"\n")
+                await writer.drain()
+                reply = await asyncio.wait_for(reader.readline(), HANDSHAKE_TIMEOUT)
+                accepted = bool(reply) and json.loads(reply).get("auth") is True
+            except (ConnectionError, asyncio.TimeoutError, ValueError):
+                accepted = False
+            if not accepted:
+                writer.close()
+                raise ConnectionError("Telegram owner rejected the connection (check TELEGRAM_OWNER_SECRET)")
+            self._writer = writer
+            self._reader_task = asyncio.create_task(self._read_loop(reader), name="ipc-reader")
+
+    async def _read_loop(self, reader: asyncio.StreamReader):
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                reply = json.loads(line)
+                stream = self._streams.get(reply.get("id"))
+                if stream is not None:
+                    stream.put_nowait(reply)
+                    continue
+                future = self._pending.pop(reply.get("id"), None)
+                if future is not None and not future.done():
+                    future.set_result(reply)
+        except (ConnectionError, asyncio.IncompleteReadError) as e:
+            logger.warning("Lost connection to Telegram owner: %s", e)
+        finally:
+            self._writer = None
+            for future in self._pending.values():
+                if not future.done():
+                    future.set_exception(ConnectionError("Connection to Telegram owner closed"))
+            self._pending.clear()
+            for stream in self._streams.values():
+                stream.put_nowait(None)
+
+    async def call(self, method: str, params: Dict[str, Any]) -> Any:
+        try:
+            await self._ensure_connected()
+        except OSError as e:
+            raise HTTPException(status_code=503, detail=f"Telegram owner unavailable: {e}")
+        request_id = next(self._ids)
+        future = asyncio.get_running_loop().create_future()
+        self._pending[request_id] = future
+        payload = json.dumps({"id": request_id, "method": method, "params": params}, default=str)
+        self._writer.write(payload.encode() + b"\n")
+        try:
+            await self._writer.drain()
+            reply = await asyncio.wait_for(future, CALL_TIMEOUT)
+        except (ConnectionError, asyncio.TimeoutError) as e:
+            raise HTTPException(status_code=503, detail=f"Telegram owner unavailable: {e}")
+        finally:
+            # Also when the caller gives up first (e.g. a health check timeout)
+            self._pending.pop(request_id, None)
+        # Stage timings measured in the owner show up in this worker's metrics
+        for stage, seconds in reply.get("timings", {}).items():
+            metrics.record_stage(stage, seconds)
+        if "error" in reply:
+            raise HTTPException(status_code=reply["error"]["status"], detail=reply["error"]["detail"])
+        return reply["result"]
+
+    async def stream(self, method: str, params: Dict[str, Any]) -> AsyncIterator[Any]:
+        """Items of an owner-side stream; closing the iterator cancels it in the owner"""
+        try:
+            await self._ensure_connected()
+        except OSError as e:
+            raise HTTPException(status_code=503, detail=f"Telegram owner unavailable: {e}")
+        request_id = next(self._ids)
+        queue: asyncio.Queue = asyncio.Queue()
+        self._streams[request_id] = queue
+        writer = self._writer
+        payload = json.dumps({"id": request_id, "method": method, "params": params, "stream": True}, default=str)
+        writer.write(payload.encode() + b"\n")
+        finished = False
+        try:
+            while True:
+                reply = await queue.get()
+                if reply is None:
+                    finished = True
+                    raise HTTPException(status_code=503, detail="Connection to Telegram owner closed")
+                if "event" in reply:
+                    yield reply["event"]
+                    continue
+                finished = True
+                if "error" in reply:
+                    raise HTTPException(status_code=reply["error"]["status"], detail=reply["error"]["detail"])
+                return
+        finally:
+            self._streams.pop(request_id, None)
+            if not finished and not writer.is_closing():
+                writer.write(json.dumps({"id": request_id, "cancel": True}).encode() + b"\n")
+
+    async def close(self):
+        if self._writer is not None:
+            self._writer.close()
+        if self._reader_task is not None:
+            self._reader_task.cancel()
+
+
+_owner_client: Optional[OwnerClient] = None
+
+
+def owner_client() -> OwnerClient:
+    global _owner_client
+    if _owner_client is None:
+        _owner_client = OwnerClient(OWNER_SOCKET)
+    return _owner_client
+
+
+def owned(func: Callable[..., Awaitable[Any]]):
+    """Run `func` in the Telegram owner process (locally when not a worker)"""
+    name = func.__name__
+    _handlers[name] = func
+
+    @functools.wraps(func)
+    async def wrapper(**kwargs):
+        if is_worker():
+            return await owner_client().call(name, kwargs)
+        return await func(**kwargs)
+
+    return wrapper
+
+
+def owned_stream(func: Callable[..., AsyncIterator[Any]]):
+    """Like `owned`, for async generators: items are streamed from the owner"""
+    name = func.__name__
+    _stream_handlers[name] = func
+
+    @functools.wraps(func)
+    async def wrapper(**kwargs):
+        if is_worker():
+            items = owner_client().stream(name, kwargs)
+        else:
+            items = func(**kwargs)
+        try:
+            async for item in items:
+                yield item
+        finally:
+            await items.aclose()
+
+    return wrapper
+
+
+async def _dispatch(message: Dict) -> Dict:
+    reply: Dict[str, Any] = {"id": message.get("id")}
+    handler = _handlers.get(message.get("method"))
+    if handler is None:
+        reply["error"] = {"status": 500, "detail": f"Unknown IPC method: {message.get('method')}"}
+        return reply
+    with metrics.collect_stages() as timings:
+        try:
+            reply["result"] = await handler(**message.get("params", {}))
+        except HTTPException as e:
+            reply["error"] = {"status": e.status_code, "detail": e.detail}
+        except Exception as e:
+            logger.exception("IPC method %s failed", message.get("method"))
+            reply["error"] = {"status": 500, "detail": str(e)}
+    reply["timings"] = timings
+    return reply
+
+
+async def _authenticate(reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> bool:
+    """Check the worker's handshake line against OWNER_SECRET and acknowledge it"""
+    try:
+        hello = json.loads(await asyncio.wait_for(reader.readline(), HANDSHAKE_TIMEOUT) or b"{}")
+        secret = hello.get("auth") if isinstance(hello, dict) else None
+        if not isinstance(secret, str) or not hmac.compare_digest(secret.encode(), OWNER_SECRET.encode()):
+            logger.warning("Rejected an IPC connection: wrong TELEGRAM_OWNER_SECRET")
+            return False
+        writer.write(json.dumps({"auth": True}).encode() + b"\n")
+        await writer.drain()
+        return True
+    except (ConnectionError, asyncio.IncompleteReadError, asyncio.TimeoutError, ValueError):
+        return False
+
+
+async def _serve_connection(reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+    if not await _authenticate(reader, writer):
+        writer.close()
+        return
+    write_lock = asyncio.Lock()
+
+    async def send(reply: Dict):
+        data = json.dumps(reply, default=str).encode() + b"\n"
+        async with write_lock:
+            writer.write(data)
+            await writer.drain()
+
+    async def handle(message: Dict):
+        await send(await _dispatch(message))
+
+    async def handle_stream(message: Dict):
+        request_id = message.get("id")
+        handler = _stream_handlers.get(message.get("method"))
+        if handler is None:
+            await send({"id": request_id, "error": {"status": 500, "detail": f"Unknown IPC stream: {message.get('method')}"}})
+            return
+        items = handler(**message.get("params", {}))
+        try:
+            async for item in items:
+                await send({"id": request_id, "event": item})
+            await send({"id": request_id, "end": True})
+        except HTTPException as e:
+            await send({"id": request_id, "error": {"status": e.status_code, "detail": e.detail}})
+        except Exception as e:
+            logger.exception("IPC stream %s failed", message.get("method"))
+            await send({"id": request_id, "error": {"status": 500, "detail": str(e)}})
+        finally:
+            await items.aclose()
+
+    tasks = set()
+    streams: Dict[Any, asyncio.Task] = {}
+    try:
+        while True:
+            line = await reader.readline()
+            if not line:
+                break
+            message = json.loads(line)
+            if message.get("cancel"):
+                stream = streams.pop(message.get("id"), None)
+                if stream is not None:
+                    stream.cancel()
+                continue
+            # Requests from one worker are handled concurrently
+            if message.get("stream"):
+                task = asyncio.create_task(handle_stream(message))
+                streams[message.get("id")] = task
+                task.add_done_callback(lambda _, request_id=message.get("id"): streams.pop(request_id, None))
+            else:
+                task = asyncio.create_task(handle(message))
+            tasks.add(task)
+            task.add_done_callback(tasks.discard)
+    except (ConnectionError, asyncio.IncompleteReadError):
+        pass
+    except asyncio.CancelledError:
+        # Owner shutting down: drop the connection quietly instead of a
+        # traceback per connected worker
+        pass
+    finally:
+        for task in tasks:
+            task.cancel()
+        writer.close()
+
+
+async def start_server(address: str) -> asyncio.AbstractServer:
+    """Owner side: accept worker connections on `address`"""
+    parsed = _parse_address(address)
+    if isinstance(parsed, tuple):
+        if not OWNER_SECRET:
+            raise RuntimeError("A tcp:// owner socket needs TELEGRAM_OWNER_SECRET")
+        return await asyncio.start_server(_serve_connection, *parsed, limit=MAX_MESSAGE_BYTES)
+    if os.path.exists(parsed):
+        os.unlink(parsed)
+    # Bind under a restrictive umask so the socket is never reachable by
+    # other users, not even between bind() and a chmod()
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    umask = os.umask(0o177)
+    try:
+        sock.bind(parsed)
+    except OSError:
+        sock.close()
+        raise
+    finally:
+        os.umask(umask)
+    return await asyncio.start_unix_server(_serve_connection, sock=sock, limit=MAX_MESSAGE_BYTES)
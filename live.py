@@ -0,0 +1,72 @@
+"""
+Live push of new channel messages to connected viewers.
+
+The Telegram owner feeds every new post into `MessageHub.publish`, and each
+open `/channels/{id}/stream` (Server-Sent Events) holds one subscription. A
+post is built (and translated) once per channel and mode, however many tabs
+are watching, and channels nobody watches cost nothing.
+"""
+import asyncio
+from typing import AsyncIterator, Dict, List, Optional, Set, Tuple
+
+import metrics
+
+# Sentinel telling a subscriber it fell too far behind and was dropped
+_DROPPED = object()
+
+
+class MessageHub:
+    """Per-channel fan-out of serialized messages to subscriber queues"""
+
+    def __init__(self, max_backlog: int = 256):
+        self.max_backlog = max_backlog
+        self._subscribers: Dict[Tuple[int, bool], Set[asyncio.Queue]] = {}
+
+    def modes(self, channel_id: int) -> List[bool]:
+        """Translate flags that have at least one subscriber for `channel_id`"""
+        return [translate for translate in (False, True) if self._subscribers.get((channel_id, translate))]
+
+    def publish(self, channel_id: int, translate: bool, message: dict):
+        delivered = 0
+        for queue in list(self._subscribers.get((channel_id, translate), ())):
+            if queue.qsize() >= self.max_backlog:
+                # A stalled client: drop it; it reconnects and catches up with a delta fetch
+                self._remove((channel_id, translate), queue)
+                queue.put_nowait(_DROPPED)
+                continue
+            queue.put_nowait(message)
+            delivered += 1
+        metrics.live_message_pushed(delivered)
+
+    async def subscribe(self, channel_id: int, translate: bool, heartbeat: float) -> AsyncIterator[Optional[dict]]:
+        """
+        Yield new messages for `channel_id`. None is yielded once as soon as
+        the subscription is registered and then every `heartbeat` seconds
+        without messages, so callers can keep the connection alive.
+        """
+        key = (channel_id, translate)
+        queue: asyncio.Queue = asyncio.Queue()
+        self._subscribers.setdefault(key, set()).add(queue)
+        metrics.live_subscribed()
+        try:
+            yield None
+            while True:
+                try:
+                    item = await asyncio.wait_for(queue.get(), heartbeat)
+                except asyncio.TimeoutError:
+                    yield None
+                    continue
+                if item is _DROPPED:
+                    return
+                yield item
+        finally:
+            self._remove(key, queue)
+            metrics.live_unsubscribed()
+
+    def _remove(self, key: Tuple[int, bool], queue: asyncio.Queue):
+        subscribers = self._subscribers.get(key)
+        if subscribers is None:
+            return
+        subscribers.discard(queue)
+        if not subscribers:
+            del self._subscribers[key]
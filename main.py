@@ -1,29 +1,112 @@
-from fastapi import FastAPI, HTTPException, Query
-from fastapi.responses import JSONResponse
+from fastapi import FastAPI, HTTPException, Query, Header, Request, Depends
+from fastapi.responses import JSONResponse, Response, PlainTextResponse, StreamingResponse
 from fastapi.middleware.cors import CORSMiddleware
-from typing import List, Optional
-from pydantic import BaseModel
-from datetime import datetime
+from typing import Annotated, Dict, List, Optional, Sequence, Set, Tuple, Type
+from pydantic import BaseModel, StringConstraints, create_model, model_validator
+from datetime import datetime, timezone
 import asyncio
-from telethon import TelegramClient
-from telethon.tl.types import Channel, Chat, User, MessageReactions
-from telethon.errors import SessionPasswordNeededError, FloodWaitError
+import functools
+import hashlib
+import json
+import logging
+from collections import OrderedDict
+from telethon import TelegramClient, events
+from telethon.tl.types import Channel, Chat, User, MessageReactions, PeerChannel
+from telethon.tl.functions.channels import GetFullChannelRequest
+from telethon.errors import SessionPasswordNeededError, FloodWaitError, MultiError
 import os
+import hmac
 from dotenv import load_dotenv
-from deep_translator import GoogleTranslator
-try:
-    import argostranslate.package as argos_package
-    import argostranslate.translate as argos_translate
-except ImportError:
-    argos_package = None
-    argos_translate = None
-from langdetect import detect, LangDetectException
+import metrics
+from metrics import timed
+import diagnostics
+import ipc
+from alerts import AlertEngine, AlertItem, Rule
+from cache import TTLCache
+from dedup import DedupIndex, DedupItem
+from live import MessageHub
+from message_store import DateIndex, MessageStore, diff, message_version
+from changelog import ChangeLog, NEW, EDITED, DELETED, COUNTERS
+from session_store import WriteBehindSession
+from segmentation import split_segments, batch_segments
+from translation_memory import TranslationMemory
+from translation import (
+    EngineUnavailable,
+    TranslationError,
+    UnsupportedLanguagePair,
+    build_router,
+    parse_routes,
+)
 
 load_dotenv()
 
 app = FastAPI(title="Telegram Channel API", version="1.0.0")
 
 TRANSLATE_CHAR_LIMIT = 5000
+# Max texts per /translate/batch request
+TRANSLATE_BATCH_LIMIT = 100
+# /translate/stream has no practical limit; this only guards against runaway uploads
+TRANSLATE_STREAM_CHAR_LIMIT = int(os.getenv("TRANSLATE_STREAM_CHAR_LIMIT", "1000000"))
+# Offline (Argos) streaming translates this many characters per call
+OFFLINE_BATCH_CHARS = int(os.getenv("OFFLINE_BATCH_CHARS", "3000"))
+TRANSLATION_CACHE_SIZE = int(os.getenv("TRANSLATION_CACHE_SIZE", "10000"))
+# Sentences kept in the translation memory (0 disables it)
+TRANSLATION_MEMORY_SIZE = int(os.getenv("TRANSLATION_MEMORY_SIZE", "50000"))
+# Max concurrent blocking translations per request (run in worker threads)
+TRANSLATE_CONCURRENCY = int(os.getenv("TRANSLATE_CONCURRENCY", "8"))
+# Event-loop watchdog: lag above the threshold counts as blocked; with
+# LOOP_WATCHDOG_DEBUG=1 the stack of the blocking code is logged as well
+LOOP_BLOCK_THRESHOLD_MS = float(os.getenv("LOOP_BLOCK_THRESHOLD_MS", "100"))
+LOOP_WATCHDOG_DEBUG = os.getenv("LOOP_WATCHDOG_DEBUG", "0").lower() in ("1", "true", "yes")
+# Message pages are cached briefly (in the owner process when running multiple workers);
+# identical concurrent requests are coalesced into one Telegram fetch. 0 disables.
+MESSAGE_CACHE_TTL = float(os.getenv("MESSAGE_CACHE_TTL", "10"))
+# Near-duplicate posts (estimated Jaccard similarity of their words) share a cluster
+DEDUP_THRESHOLD = float(os.getenv("DEDUP_THRESHOLD", "0.6"))
+DEDUP_MAX_MESSAGES = int(os.getenv("DEDUP_MAX_MESSAGES", "100000"))
+# Messages whose last seen text/version is remembered for edits and deletions
+MESSAGE_STORE_SIZE = int(os.getenv("MESSAGE_STORE_SIZE", "200000"))
+# Entries kept in the /changes log
+CHANGELOG_SIZE = int(os.getenv("CHANGELOG_SIZE", "100000"))
+# Message ids per channel in the id/date index behind `since`
+DATE_INDEX_SIZE = int(os.getenv("DATE_INDEX_SIZE", "100000"))
+# Alert rules are kept in this file; matches kept for /alerts/matches; ingested
+# messages waiting to be checked (more are dropped); ALERT_TRANSLATE=0 only checks the original text
+ALERT_RULES_FILE = os.getenv("ALERT_RULES_FILE", "alert_rules.json")
+ALERT_LOG_SIZE = int(os.getenv("ALERT_LOG_SIZE", "10000"))
+ALERT_QUEUE_SIZE = int(os.getenv("ALERT_QUEUE_SIZE", "10000"))
+ALERT_TRANSLATE = os.getenv("ALERT_TRANSLATE", "1").lower() in ("1", "true", "yes")
+# Limits on the alert rule set: rules, terms + patterns per rule, characters per term or pattern
+ALERT_MAX_RULES = int(os.getenv("ALERT_MAX_RULES", "1000"))
+ALERT_MAX_TERMS = int(os.getenv("ALERT_MAX_TERMS", "100"))
+ALERT_MAX_PATTERN_CHARS = int(os.getenv("ALERT_MAX_PATTERN_CHARS", "200"))
+# Exact member counts (GetFullChannel) are cached this long; they change slowly
+CHANNEL_INFO_TTL = float(os.getenv("CHANNEL_INFO_TTL", "3600"))
+# GetFullChannel requests sent together in one container
+FULL_CHANNEL_BATCH = int(os.getenv("FULL_CHANNEL_BATCH", "20"))
+# Characters of the last message shown in /channels
+CHANNEL_PREVIEW_CHARS = int(os.getenv("CHANNEL_PREVIEW_CHARS", "200"))
+# How long a request waits for the background Telegram connection before answering 503
+READY_TIMEOUT = float(os.getenv("READY_TIMEOUT", "10"))
+# How long /health and /ready in a worker wait for the owner's status
+HEALTH_OWNER_TIMEOUT = float(os.getenv("HEALTH_OWNER_TIMEOUT", "2"))
+# Load the translation engines in the background right after startup instead of on first use
+PRELOAD_TRANSLATORS = os.getenv("PRELOAD_TRANSLATORS", "0").lower() in ("1", "true", "yes")
+# Live message streams send a keep-alive comment after this many idle seconds
+LIVE_HEARTBEAT_SECONDS = float(os.getenv("LIVE_HEARTBEAT_SECONDS", "15"))
+# Entities Telethon learns are kept in memory and written to the session file every N seconds
+SESSION_FLUSH_INTERVAL = float(os.getenv("SESSION_FLUSH_INTERVAL", "30"))
+
+logger = logging.getLogger("telegram_api")
+
+# Per-request stage timings, Prometheus histograms and the optional Server-Timing header
+app.middleware("http")(metrics.timing_middleware)
+
+# SERVE_FRONTEND=1 serves the web UI from this app under /ui (same origin:
+# no second server process and no CORS preflights)
+if os.getenv("SERVE_FRONTEND", "0").lower() in ("1", "true", "yes"):
+    import frontend
+    frontend.mount_frontend(app, prefix="/ui")
 
 # Add CORS middleware to allow frontend requests
 app.add_middleware(
@@ -38,12 +121,112 @@ app.add_middleware(
 API_ID = os.getenv("TELEGRAM_API_ID")
 API_HASH = os.getenv("TELEGRAM_API_HASH")
 SESSION_NAME = os.getenv("TELEGRAM_SESSION_NAME", "telegram_session")
+# Token for /admin endpoints (sent as X-Admin-Token); admin endpoints are disabled when unset
+ADMIN_TOKEN = os.getenv("ADMIN_TOKEN")
+PROFILE_MAX_SECONDS = 120
+# "fake" swaps in the local stand-ins from fake_telegram.py (benchmarks, offline development)
+TELEGRAM_BACKEND = os.getenv("TELEGRAM_BACKEND", "telethon").lower()
+TRANSLATOR_BACKEND = os.getenv("TRANSLATOR_BACKEND", "google").lower()
+# Translation engines (see translation.py), routing policy (cost | latency) and
+# per-pair overrides such as "ru-en=argos,uk-en=google"
+TRANSLATION_ENGINES = [name.strip() for name in os.getenv("TRANSLATION_ENGINES", "google,argos").split(",") if name.strip()]
+TRANSLATION_ROUTING = os.getenv("TRANSLATION_ROUTING", "cost").lower()
+TRANSLATION_ROUTES = parse_routes(os.getenv("TRANSLATION_ROUTES", ""))
+# Auto-translation of messages: languages that are translated, into which
+# language, and with which engines (online | offline | any)
+AUTO_TRANSLATE_SOURCES = [code.strip() for code in os.getenv("AUTO_TRANSLATE_SOURCES", "ru,uk").split(",") if code.strip()]
+AUTO_TRANSLATE_TARGET = os.getenv("AUTO_TRANSLATE_TARGET", "en")
+AUTO_TRANSLATE_MODE = os.getenv("AUTO_TRANSLATE_MODE", "online").lower()
 
-if not API_ID or not API_HASH:
+if TELEGRAM_BACKEND != "fake" and (not API_ID or not API_HASH):
     raise ValueError("TELEGRAM_API_ID and TELEGRAM_API_HASH must be set in environment variables")
 
-# Initialize Telegram client
-client = TelegramClient(SESSION_NAME, int(API_ID), API_HASH)
+class _CountingSender:
+    """Wraps Telethon's MTProtoSender to count each request as it is sent"""
+
+    def __init__(self, sender):
+        self._sender = sender
+
+    def send(self, request, ordered=False):
+        metrics.count_rpc(request)
+        return self._sender.send(request, ordered=ordered)
+
+    def __getattr__(self, name):
+        return getattr(self._sender, name)
+
+class InstrumentedTelegramClient(TelegramClient):
+    """
+    TelegramClient that counts RPCs per request type and flood waits.
+
+    Telethon sleeps through flood waits below its flood_sleep_threshold, and
+    ahead of requests already known to be flood-waited, without raising. To
+    count those waits too, Telethon's own threshold is 0 so that every wait
+    raises, and `_call` records it and does the sleeping and retrying. RPCs
+    are counted by the sender, so requests Telethon holds back because of a
+    known flood wait (or retries itself) are counted as often as they are
+    actually sent.
+    """
+
+    def __init__(self, *args, flood_sleep_threshold: int = 60, **kwargs):
+        super().__init__(*args, flood_sleep_threshold=0, **kwargs)
+        self.sleep_threshold = flood_sleep_threshold
+
+    async def _call(self, sender, request, ordered=False, flood_sleep_threshold=None):
+        threshold = self.sleep_threshold if flood_sleep_threshold is None else flood_sleep_threshold
+        for attempt in range(self._request_retries + 1):
+            try:
+                return await super()._call(_CountingSender(sender), request, ordered=ordered, flood_sleep_threshold=0)
+            except FloodWaitError as e:
+                metrics.count_flood_wait(e.seconds)
+                if e.seconds > threshold or attempt == self._request_retries:
+                    raise
+                logger.info("Flood wait of %ds on %s; sleeping", e.seconds, type(e.request).__name__)
+                await asyncio.sleep(e.seconds)
+
+# Initialize Telegram client. HTTP workers behind a Telegram owner process
+# (see ipc.py / owner.py) never open the session themselves.
+if ipc.is_worker():
+    client = None
+elif TELEGRAM_BACKEND == "fake":
+    from fake_telegram import FakeTelegramClient
+    client = FakeTelegramClient.from_env()
+else:
+    # Imports the .session file from setup_telegram.py; see session_store.py
+    client = InstrumentedTelegramClient(WriteBehindSession(SESSION_NAME), int(API_ID), API_HASH)
+
+# TRANSLATOR_BACKEND=fake replaces Google with the local stand-in engine
+if TRANSLATOR_BACKEND == "fake":
+    TRANSLATION_ENGINES = ["local" if name == "google" else name for name in TRANSLATION_ENGINES]
+
+# Engines import their libraries on first use: argostranslate loads
+# torch/ctranslate2/stanza, which would otherwise add seconds to every cold
+# start. The online engine opens its pooled HTTP client on first use.
+translator = build_router(
+    TRANSLATION_ENGINES,
+    concurrency=TRANSLATE_CONCURRENCY,
+    routes=TRANSLATION_ROUTES,
+    policy=TRANSLATION_ROUTING,
+)
+
+def _auto_mode() -> Optional[str]:
+    return None if AUTO_TRANSLATE_MODE == "any" else AUTO_TRANSLATE_MODE
+
+def preload_translators():
+    """Import the translation engines and langdetect's language profiles"""
+    translator.load()
+    from langdetect import detect, LangDetectException
+    try:
+        detect("warm up")
+    except LangDetectException:
+        pass
+
+def translation_http_error(e: TranslationError, prefix: str = "Translation failed") -> HTTPException:
+    """Map a translation error to the HTTP error returned to the client"""
+    if isinstance(e, UnsupportedLanguagePair):
+        return HTTPException(status_code=400, detail=str(e))
+    if isinstance(e, EngineUnavailable):
+        return HTTPException(status_code=500, detail=str(e))
+    return HTTPException(status_code=500, detail=f"{prefix}: {str(e)}")
 
 # Response models
 class ReactionModel(BaseModel):
@@ -56,6 +239,12 @@ class TranslationRequest(BaseModel):
     target_lang: Optional[str] = "en"
     mode: Optional[str] = "online"  # online | offline
 
+class BatchTranslationRequest(BaseModel):
+    texts: List[str]
+    # Defaults: AUTO_TRANSLATE_TARGET / AUTO_TRANSLATE_SOURCES
+    target_lang: Optional[str] = None
+    source_langs: Optional[List[str]] = None
+
 class MessageModel(BaseModel):
     id: int
     date: datetime
@@ -65,12 +254,44 @@ class MessageModel(BaseModel):
     views: Optional[int] = None
     forwards: Optional[int] = None
     reactions: Optional[List[ReactionModel]] = None
+    # Shared by copies and near-copies of the same post across channels
+    cluster_id: Optional[str] = None
+    # None / 0 until the message is edited; version is the Unix time of the last edit
+    edit_date: Optional[datetime] = None
+    version: int = 0
+
+AlertPattern = Annotated[str, StringConstraints(max_length=ALERT_MAX_PATTERN_CHARS)]
+
+class AlertRuleModel(BaseModel):
+    name: Optional[str] = None
+    # Watch terms (case-insensitive) and regular expressions; a rule matches if any of them does
+    terms: List[AlertPattern] = []
+    patterns: List[AlertPattern] = []
+    # Channel ids the rule applies to (default: all)
+    channels: Optional[List[int]] = None
+    whole_word: bool = True
+    case_sensitive: bool = False
+
+    @model_validator(mode="after")
+    def check_size(self):
+        if len(self.terms) + len(self.patterns) > ALERT_MAX_TERMS:
+            raise ValueError(f"A rule can have at most {ALERT_MAX_TERMS} terms and patterns")
+        return self
+
+class MessagePreviewModel(BaseModel):
+    id: int
+    date: datetime
+    text: str
 
 class ChannelModel(BaseModel):
     id: int
     title: str
     username: Optional[str] = None
     participants_count: Optional[int] = None
+    unread_count: int = 0
+    # Date of the last message
+    last_activity: Optional[datetime] = None
+    last_message: Optional[MessagePreviewModel] = None
 
 # Helper function to extract reactions from a message
 def extract_reactions(message) -> Optional[List]:
@@ -97,10 +318,8 @@ def extract_reactions(message) -> Optional[List]:
                             emoji_str = str(reaction.reaction)
                     
                     if emoji_str and hasattr(reaction, 'count'):
-                        reactions_list.append(ReactionModel(
-                            emoji=emoji_str,
-                            count=reaction.count
-                        ))
+                        # Plain ReactionModel values, so they can be cached and sent over IPC
+                        reactions_list.append({"emoji": emoji_str, "count": reaction.count})
         
         return reactions_list if reactions_list else None
     except Exception as e:
@@ -118,98 +337,336 @@ async def translate_text(req: TranslationRequest):
         raise HTTPException(status_code=400, detail="Text is required")
     if len(req.text) > TRANSLATE_CHAR_LIMIT:
         raise HTTPException(status_code=400, detail=f"Text exceeds {TRANSLATE_CHAR_LIMIT} characters")
-    
-    mode = (req.mode or "online").lower()
-    source = req.source_lang or "auto"
-    target = req.target_lang or "en"
-
-    # Offline translation using Argos Translate
-    if mode == "offline":
-        if not argos_translate:
-            raise HTTPException(status_code=500, detail="Argos Translate not installed. Install argostranslate and language packs.")
-        if source == "auto":
-            raise HTTPException(status_code=400, detail="Offline translation requires an explicit source_lang (e.g., 'ru' or 'uk')")
+
+    return await run_translation(
+        text=req.text,
+        source=req.source_lang or "auto",
+        target=req.target_lang or "en",
+        mode=(req.mode or "online").lower(),
+    )
+
+@app.post("/translate/batch")
+async def translate_batch(req: BatchTranslationRequest):
+    """
+    Auto-translate many texts at once, like the message endpoints do with
+    translate=true: texts detected as one of the source languages are
+    translated to the target language, anything else is returned unchanged.
+    Translations are returned in request order.
+    """
+    if len(req.texts) > TRANSLATE_BATCH_LIMIT:
+        raise HTTPException(status_code=400, detail=f"At most {TRANSLATE_BATCH_LIMIT} texts per batch")
+    if any(len(text) > TRANSLATE_CHAR_LIMIT for text in req.texts):
+        raise HTTPException(status_code=400, detail=f"Texts may not exceed {TRANSLATE_CHAR_LIMIT} characters")
+    translations = await auto_translate(
+        texts=req.texts,
+        target=req.target_lang or AUTO_TRANSLATE_TARGET,
+        sources=req.source_langs or AUTO_TRANSLATE_SOURCES,
+    )
+    return {"translations": translations}
+
+@ipc.owned
+async def auto_translate(texts: List[str], target: str, sources: List[str]) -> List[str]:
+    """Auto-translation of a batch of texts; runs in the Telegram owner (shared cache)"""
+    # Repeated texts (forwards, reposts) are translated once
+    unique = list(dict.fromkeys(texts))
+    with timed("translate_all"):
+        translated = dict(zip(unique, await translate_texts(unique, target=target, sources=sources)))
+    return [translated[text] for text in texts]
+
+@ipc.owned
+async def run_translation(text: str, source: str, target: str, mode: str) -> dict:
+    """Translate with the engine routed for the pair and mode; runs in the Telegram owner"""
+    mode = "offline" if mode == "offline" else "online"
+    try:
+        with timed("translate"):
+            translated = await translator.translate(text, source, target, mode=mode)
+    except TranslationError as e:
+        raise translation_http_error(e, "Offline translation failed" if mode == "offline" else "Translation failed")
+    return {
+        "translated_text": translated,
+        "source_lang": source,
+        "target_lang": target,
+        "mode": mode
+    }
+
+@app.post("/translate/stream")
+async def translate_stream(req: TranslationRequest):
+    """
+    Translate a long text and stream the result as NDJSON, one line per
+    segment, in order:
+
+        {"segments": 12, "source_lang": "ru", "target_lang": "en", "mode": "online"}
+        {"index": 0, "translated_text": "...", "separator": "\\n\\n"}
+        ...
+        {"done": true}
+
+    The text is split on paragraph and sentence boundaries. Online segments
+    are translated concurrently; offline (Argos) segments are translated in
+    batches of about OFFLINE_BATCH_CHARS. A segment that fails keeps its
+    original text and carries an "error". Joining translated_text +
+    separator of all segments gives the full translation.
+    """
+    if not req.text or not req.text.strip():
+        raise HTTPException(status_code=400, detail="Text is required")
+    if len(req.text) > TRANSLATE_STREAM_CHAR_LIMIT:
+        raise HTTPException(status_code=400, detail=f"Text exceeds {TRANSLATE_STREAM_CHAR_LIMIT} characters")
+
+    stream = stream_translation(
+        text=req.text,
+        source=req.source_lang or "auto",
+        target=req.target_lang or "en",
+        mode=(req.mode or "online").lower(),
+    )
+    # The header line comes after validation, so errors are still plain HTTP errors
+    header = await stream.__anext__()
+
+    async def lines():
         try:
-            installed_langs = argos_translate.get_installed_languages()
-            installed_codes = [getattr(l, "code", None) for l in installed_langs]
-
-            src_lang = next((l for l in installed_langs if getattr(l, "code", "") == source), None)
-            tgt_lang = next((l for l in installed_langs if getattr(l, "code", "") == target), None)
-            if not src_lang or not tgt_lang:
-                raise HTTPException(
-                    status_code=400,
-                    detail=f"Offline language pair not installed ({source}->{target}). Installed codes: {installed_codes}"
-                )
-            translator = src_lang.get_translation(tgt_lang)
-            translated = translator.translate(req.text)
-            return {
-                "translated_text": translated,
-                "source_lang": source,
-                "target_lang": target,
-                "mode": "offline"
-            }
-        except HTTPException:
-            raise
-        except Exception as e:
-            raise HTTPException(status_code=500, detail=f"Offline translation failed: {str(e)}")
+            yield json.dumps(header) + "\n"
+            async for item in stream:
+                yield json.dumps(item, ensure_ascii=False) + "\n"
+        finally:
+            await stream.aclose()
 
-    # Default: online translation
+    return StreamingResponse(lines(), media_type="application/x-ndjson", headers={"X-Accel-Buffering": "no"})
+
+@ipc.owned_stream
+async def stream_translation(text: str, source: str, target: str, mode: str):
+    """Header, then translated segments in order, then {"done": true}; runs in the Telegram owner"""
+    mode = "offline" if mode == "offline" else "online"
+    await translator.prepare(mode)
     try:
-        translator = GoogleTranslator(source=source, target=target)
-        translated = translator.translate(req.text)
-        return {
-            "translated_text": translated,
-            "source_lang": source,
-            "target_lang": target,
-            "mode": "online"
-        }
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Translation failed: {str(e)}")
+        engine = translator.route(source, target, mode=mode)
+    except TranslationError as e:
+        raise translation_http_error(e)
 
-# Translation function
-def translate_russian_to_english(text: str) -> str:
+    segments = split_segments(text)
+    if engine.offline:
+        # Offline engines are CPU-bound: fewer, larger calls instead of parallel ones
+        segments = batch_segments(segments, OFFLINE_BATCH_CHARS)
+
+    yield {"segments": len(segments), "source_lang": source, "target_lang": target, "mode": mode, "engine": engine.name}
+
+    # Segment by segment (not packed), so the first one arrives as early as possible
+    results = engine.translate_iter([segment for segment, _ in segments], source, target, batch=False)
+    try:
+        index = 0
+        async for result in results:
+            segment, separator = segments[index]
+            item = {"index": index, "separator": separator}
+            if isinstance(result, Exception):
+                item["translated_text"] = segment
+                item["error"] = str(result)
+            else:
+                item["translated_text"] = result
+            yield item
+            index += 1
+        yield {"done": True}
+    finally:
+        await results.aclose()
+
+# Cache of auto-translations, keyed by (target language, original text), LRU,
+# holding (detected source language, translation). Only successful
+# translations are cached, so failures are retried.
+_translation_cache: "OrderedDict[tuple, Tuple[str, str]]" = OrderedDict()
+# Targets with entries in _translation_cache, so an edited text's entries are popped by key
+_translation_targets: Set[str] = set()
+
+def _cached_translation(text: str, target: str, sources) -> Optional[str]:
     """
-    Detects if text is in Russian and translates it to English.
-    Returns original text if not Russian or if translation fails.
+    Cached translation of `text` to `target`, if the language it was
+    translated from is one of `sources`. The cache is keyed by (target, text)
+    alone: a translation doesn't depend on the source policy, only whether it
+    applies does. The entry carries its own source language, so the check
+    holds even after detected_languages evicted the text.
     """
-    if not text or len(text.strip()) == 0:
-        return text
-    
+    key = (target, text)
+    cached = _translation_cache.get(key)
+    if cached is None or cached[0] not in sources:
+        return None
+    _translation_cache.move_to_end(key)
+    return cached[1]
+
+def _cache_translation(key: tuple, source: str, translated: str):
+    _translation_targets.add(key[0])
+    _translation_cache[key] = (source, translated)
+    if len(_translation_cache) > TRANSLATION_CACHE_SIZE:
+        _translation_cache.popitem(last=False)
+
+# Sentence translations, so reposted and edited posts only translate what is new
+translation_memory = TranslationMemory(TRANSLATION_MEMORY_SIZE)
+
+# Detected language per text ("" = unknown), so texts that need no
+# translation aren't run through langdetect again
+detected_languages = TTLCache(ttl=float("inf"), max_entries=TRANSLATION_CACHE_SIZE)
+
+# Letters only Ukrainian uses among the Cyrillic languages we auto-translate
+_UKRAINIAN_LETTERS = set("іїєґІЇЄҐ")
+
+def detect_language(text: str) -> Optional[str]:
+    """
+    Language code of `text`, or None if unknown (blocking: langdetect).
+    Undetectable Cyrillic text counts as Ukrainian if it has Ukrainian-only
+    letters, else as Russian.
+    """
+    from langdetect import detect, LangDetectException
     try:
-        # Detect language
-        detected_lang = detect(text)
-        
-        # If Russian detected, translate to English
-        if detected_lang == 'ru':
-            translator = GoogleTranslator(source='ru', target='en')
-            translated = translator.translate(text)
-            return translated
-        else:
-            return text
+        with timed("langdetect"):
+            return detect(text)
     except LangDetectException:
-        # If language detection fails, try to translate anyway if it looks like Russian
-        # (contains Cyrillic characters)
         if any('\u0400' <= char <= '\u04FF' for char in text):
-            try:
-                translator = GoogleTranslator(source='ru', target='en')
-                translated = translator.translate(text)
-                return translated
-            except Exception:
-                return text
-    except Exception:
-        # If translation fails, return original text
-        return text
+            return "uk" if _UKRAINIAN_LETTERS.intersection(text) else "ru"
+        return None
+
+async def translate_texts(
+    texts: List[str],
+    target: str = AUTO_TRANSLATE_TARGET,
+    sources: Optional[List[str]] = None,
+) -> List[str]:
+    """
+    Auto-translate many texts: those detected as one of `sources` (default
+    AUTO_TRANSLATE_SOURCES) are translated to `target`, anything else is
+    returned unchanged.
+
+    Cache hits (texts whose detected language is one of `sources`) are
+    answered directly. The misses are language-detected in a worker thread
+    (once per text) and grouped by language; each group goes through the
+    translation memory, which sends only unseen sentences to the engine
+    routed for its pair as one batch. Groups run concurrently,
+    so a mixed page costs one call per language. A group that fails keeps
+    its original texts.
+    """
+    sources = set(sources or AUTO_TRANSLATE_SOURCES) - {target}
+    results = list(texts)
+    misses: Dict[str, List[int]] = {}
+    for index, text in enumerate(texts):
+        if not text or not text.strip():
+            continue
+        cached = _cached_translation(text, target, sources)
+        if cached is not None:
+            metrics.translation_cache_hit()
+            results[index] = cached
+            continue
+        metrics.translation_cache_miss()
+        misses.setdefault(text, []).append(index)
+    if not misses:
+        return results
+
+    languages = {text: detected_languages.get(text) for text in misses}
+    undetected = [text for text, language in languages.items() if language is None]
+    if undetected:
+        detected = await asyncio.to_thread(lambda: [detect_language(text) or "" for text in undetected])
+        for text, language in zip(undetected, detected):
+            detected_languages.set(text, language)
+            languages[text] = language
+    groups: Dict[str, List[str]] = {}
+    for text, language in languages.items():
+        if language in sources:
+            groups.setdefault(language, []).append(text)
+
+    async def translate_group(source: str, group: List[str]):
+        try:
+            translated = await translation_memory.translate_batch(
+                group, source, target,
+                lambda sentences: translator.translate_batch(sentences, source, target, mode=_auto_mode()),
+            )
+        except Exception:
+            logger.warning("Auto-translation of %d %s texts failed", len(group), source, exc_info=True)
+            return
+        for text, translation in zip(group, translated):
+            if translation is None:
+                continue
+            _cache_translation((target, text), source, translation)
+            for index in misses[text]:
+                results[index] = translation
+
+    with timed("translate"):
+        await asyncio.gather(*(translate_group(source, group) for source, group in groups.items()))
+    return results
+
+loop_watchdog = diagnostics.LoopWatchdog(
+    threshold=LOOP_BLOCK_THRESHOLD_MS / 1000,
+    debug=LOOP_WATCHDOG_DEBUG,
+    observer=metrics.observe_loop_lag,
+)
+
+# Readiness of the Telegram connection (liveness is just "the process answers"):
+# connecting -> ready, or unauthorized / error
+telegram_state = "connecting"
+telegram_error: Optional[str] = None
+telegram_ready = asyncio.Event()
+_background_tasks = set()
+
+async def connect_telegram():
+    """Connect and authorize the Telegram client in the background"""
+    global telegram_state, telegram_error
+    started = datetime.now()
+    try:
+        await client.start()
+        if not await client.is_user_authorized():
+            telegram_state = "unauthorized"
+            telegram_error = "Telegram client is not authorized. Please run setup script first."
+            logger.error(telegram_error)
+            return
+    except Exception as e:
+        telegram_state = "error"
+        telegram_error = f"Could not connect to Telegram: {e}"
+        logger.exception("Could not connect to Telegram")
+        return
+    telegram_state = "ready"
+    telegram_ready.set()
+    logger.info("Telegram client ready after %.2fs", (datetime.now() - started).total_seconds())
+
+async def require_telegram():
+    """Wait briefly for the background connection; 503 if it isn't ready"""
+    if telegram_ready.is_set():
+        return
+    if telegram_state == "connecting":
+        try:
+            await asyncio.wait_for(telegram_ready.wait(), READY_TIMEOUT)
+            return
+        except asyncio.TimeoutError:
+            pass
+    raise HTTPException(
+        status_code=503,
+        detail=telegram_error or "Telegram client is still connecting",
+        headers={"Retry-After": "5"},
+    )
+
+def _spawn(coro):
+    task = asyncio.create_task(coro)
+    _background_tasks.add(task)
+    task.add_done_callback(_background_tasks.discard)
+    return task
 
 @app.on_event("startup")
 async def startup_event():
-    """Initialize Telegram client on startup"""
-    await client.start()
-    if not await client.is_user_authorized():
-        raise RuntimeError("Telegram client is not authorized. Please run setup script first.")
+    """Start the Telegram connection in the background so the server answers immediately"""
+    loop_watchdog.start()
+    if ipc.is_worker():
+        return
+    client.add_event_handler(on_new_message, events.NewMessage())
+    client.add_event_handler(on_message_edited, events.MessageEdited())
+    client.add_event_handler(on_message_deleted, events.MessageDeleted())
+    _spawn(connect_telegram())
+    if os.path.exists(ALERT_RULES_FILE):
+        logger.info("Loaded %d alert rules from %s", alert_engine.load(ALERT_RULES_FILE), ALERT_RULES_FILE)
+    _spawn(run_alerts())
+    if isinstance(getattr(client, "session", None), WriteBehindSession):
+        _spawn(client.session.run_flusher(SESSION_FLUSH_INTERVAL))
+    if PRELOAD_TRANSLATORS:
+        _spawn(asyncio.to_thread(preload_translators))
 
 @app.on_event("shutdown")
 async def shutdown_event():
-    """Disconnect Telegram client on shutdown"""
+    """Disconnect Telegram client on shutdown (this also flushes the session)"""
+    loop_watchdog.stop()
+    if ipc.is_worker():
+        await ipc.owner_client().close()
+        return
+    for task in list(_background_tasks):
+        task.cancel()
+    await translator.aclose()
     await client.disconnect()
 
 @app.get("/")
@@ -217,54 +674,456 @@ async def root():
     """Root endpoint"""
     return {"message": "Telegram Channel API", "version": "1.0.0"}
 
+@ipc.owned
+async def telegram_status() -> dict:
+    """Connection state of the process that owns the Telegram client"""
+    return {
+        "telegram": telegram_state,
+        "error": telegram_error,
+        "connected": client.is_connected(),
+        "event_loop": loop_watchdog.stats(),
+    }
+
+async def _status() -> dict:
+    if not ipc.is_worker():
+        return await telegram_status()
+    try:
+        # Probes must answer quickly, not after the owner call timeout
+        owner = await asyncio.wait_for(telegram_status(), HEALTH_OWNER_TIMEOUT)
+    except HTTPException as e:
+        owner = {"telegram": "owner_unavailable", "error": e.detail, "connected": False}
+    except asyncio.TimeoutError:
+        owner = {"telegram": "owner_unavailable", "error": f"No answer within {HEALTH_OWNER_TIMEOUT}s", "connected": False}
+    return {
+        "telegram": owner["telegram"],
+        "error": owner.get("error"),
+        "connected": owner["connected"],
+        "event_loop": loop_watchdog.stats(),
+        "owner": owner,
+    }
+
 @app.get("/health")
 async def health():
-    """Health check endpoint"""
-    return {"status": "healthy", "connected": client.is_connected()}
+    """Liveness: answers as soon as the process is up, whatever the Telegram state"""
+    return {"status": "healthy", **await _status()}
+
+@app.get("/ready")
+async def ready():
+    """Readiness: 200 once the Telegram client is connected and authorized, 503 before"""
+    status = await _status()
+    if status["telegram"] != "ready":
+        return JSONResponse(status_code=503, content={"status": "not_ready", **status})
+    return {"status": "ready", **status}
+
+@app.get("/metrics", include_in_schema=False)
+async def prometheus_metrics():
+    """Prometheus scrape endpoint"""
+    body, content_type = metrics.render_metrics()
+    return Response(content=body, media_type=content_type)
+
+def require_admin(token: Optional[str]):
+    """Reject the request unless it carries the configured admin token"""
+    if not ADMIN_TOKEN:
+        raise HTTPException(status_code=403, detail="Admin endpoints are disabled. Set ADMIN_TOKEN to enable them.")
+    if not token or not hmac.compare_digest(token, ADMIN_TOKEN):
+        raise HTTPException(status_code=401, detail="Invalid admin token")
+
+def admin_only(x_admin_token: Optional[str] = Header(default=None)):
+    """require_admin as a route dependency"""
+    require_admin(x_admin_token)
+
+_profile_lock = asyncio.Lock()
+
+@app.get("/admin/profile", include_in_schema=False)
+async def admin_profile(
+    seconds: float = Query(default=10, gt=0, le=PROFILE_MAX_SECONDS, description="How long to sample"),
+    interval_ms: float = Query(default=5, ge=1, le=1000, description="Sampling interval"),
+    format: str = Query(default="json", pattern="^(json|collapsed)$", description="json or collapsed (flamegraph input)"),
+    x_admin_token: Optional[str] = Header(default=None),
+):
+    """
+    Sample stacks of all threads for `seconds` while measuring event-loop lag.
+    Returns collapsed stacks (for flamegraph.pl / speedscope), an asyncio task
+    dump and the loop lag. Only one profile can run at a time.
+    """
+    require_admin(x_admin_token)
+    if _profile_lock.locked():
+        raise HTTPException(status_code=409, detail="A profile is already running")
+    async with _profile_lock:
+        result = await diagnostics.profile(seconds, interval=interval_ms / 1000)
+    if format == "collapsed":
+        return PlainTextResponse(
+            result["collapsed"],
+            headers={"Content-Disposition": f'attachment; filename="profile-{int(datetime.now().timestamp())}.collapsed"'},
+        )
+    return result
+
+@app.get("/admin/tasks", include_in_schema=False)
+async def admin_tasks(x_admin_token: Optional[str] = Header(default=None)):
+    """Dump all asyncio tasks and a short loop-lag measurement"""
+    require_admin(x_admin_token)
+    return {"tasks": diagnostics.dump_tasks(), "loop_lag": await diagnostics.measure_loop_lag(1.0)}
+
+def unix_time(value: Optional[datetime]) -> Optional[float]:
+    """Query datetime as a Unix timestamp (naive values are UTC)"""
+    if value is None:
+        return None
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return value.timestamp()
 
 @app.get("/channels", response_model=List[ChannelModel])
-async def list_channels():
+async def list_channels(
+    q: Optional[str] = Query(default=None, description="Only channels whose title or username contains this (case-insensitive)"),
+    unread: bool = Query(default=False, description="Only channels with unread messages"),
+    active_since: Optional[datetime] = Query(default=None, description="Only channels with a message at or after this time (ISO 8601, UTC if no offset)"),
+    min_participants: Optional[int] = Query(default=None, ge=0, description="Only channels with at least this many members"),
+    sort: Optional[str] = Query(default=None, pattern="^-?(activity|title|unread|participants)$", description="activity, title, unread or participants; prefix with - for descending (default: Telegram's dialog order)"),
+    exact_counts: bool = Query(default=False, description="Exact member counts via GetFullChannel (cached for CHANNEL_INFO_TTL)"),
+):
+    """
+    List all channels/dialogs the user has access to, with the last message,
+    unread count and last activity of each
+    """
+    content = await fetch_channels(
+        q=q,
+        unread=unread,
+        active_since=unix_time(active_since),
+        min_participants=min_participants,
+        sort=sort,
+        exact_counts=exact_counts,
+    )
+    return JSONResponse(content=content)
+
+participant_counts = TTLCache(ttl=CHANNEL_INFO_TTL, max_entries=10000)
+
+async def fetch_participant_counts(channels: List[Channel]) -> Dict[int, int]:
     """
-    List all channels/dialogs the user has access to
+    Exact member counts by channel id. Channels missing from the cache are
+    asked for with GetFullChannel, FULL_CHANNEL_BATCH requests per container
+    and one container at a time, so a long dialog list doesn't burst into
+    flood waits; failed requests are left out.
     """
+    counts = {}
+    missing = []
+    for channel in channels:
+        count = participant_counts.get(channel.id)
+        if count is None:
+            missing.append(channel)
+        else:
+            counts[channel.id] = count
+    for start in range(0, len(missing), FULL_CHANNEL_BATCH):
+        batch = missing[start:start + FULL_CHANNEL_BATCH]
+        try:
+            with timed("get_full_channel"):
+                reply = await client([GetFullChannelRequest(channel) for channel in batch])
+        except MultiError as e:
+            # Some requests of the container failed (e.g. a channel we were removed from)
+            reply = e.results
+        except FloodWaitError as e:
+            # The remaining channels keep the dialog's count this time
+            logger.warning("GetFullChannel flood wait of %ds; %d channels left without exact counts", e.seconds, len(missing) - start)
+            break
+        except Exception as e:
+            logger.warning("GetFullChannel failed for %d channels: %s", len(batch), e)
+            continue
+        for channel, full in zip(batch, reply):
+            count = getattr(getattr(full, "full_chat", None), "participants_count", None)
+            if count is not None:
+                participant_counts.set(channel.id, count)
+                counts[channel.id] = count
+    return counts
+
+CHANNEL_SORT_KEYS = {
+    # Channels without messages sort as the oldest
+    "activity": lambda c: c.last_activity.timestamp() if c.last_activity else float("-inf"),
+    "title": lambda c: c.title.lower(),
+    "unread": lambda c: c.unread_count,
+    "participants": lambda c: c.participants_count if c.participants_count is not None else -1,
+}
+
+@ipc.owned
+async def fetch_channels(
+    q: Optional[str] = None,
+    unread: bool = False,
+    active_since: Optional[float] = None,
+    min_participants: Optional[int] = None,
+    sort: Optional[str] = None,
+    exact_counts: bool = False,
+) -> List[dict]:
+    """
+    Channel listing pipeline; runs in the Telegram owner. Filters that only
+    need dialog data run before member counts are fetched, so those are
+    only requested for the channels that remain.
+    """
+    await require_telegram()
     try:
         channels = []
-        async for dialog in client.iter_dialogs():
-            entity = dialog.entity
-            if isinstance(entity, Channel):
-                channel_info = ChannelModel(
+        entities = {}
+        with timed("iter_dialogs"):
+            async for dialog in client.iter_dialogs():
+                entity = dialog.entity
+                if not isinstance(entity, Channel):
+                    continue
+                if q and q.lower() not in f"{entity.title}\n{entity.username or ''}".lower():
+                    continue
+                if unread and not dialog.unread_count:
+                    continue
+                if active_since is not None and (dialog.date is None or dialog.date.timestamp() < active_since):
+                    continue
+                last_message = None
+                if dialog.message is not None:
+                    last_message = MessagePreviewModel(
+                        id=dialog.message.id,
+                        date=dialog.message.date,
+                        text=message_text(dialog.message)[:CHANNEL_PREVIEW_CHARS],
+                    )
+                channels.append(ChannelModel(
                     id=entity.id,
                     title=entity.title,
                     username=entity.username,
-                    participants_count=entity.participants_count if hasattr(entity, 'participants_count') else None
-                )
-                channels.append(channel_info)
-        return channels
+                    participants_count=getattr(entity, "participants_count", None),
+                    unread_count=dialog.unread_count or 0,
+                    last_activity=dialog.date,
+                    last_message=last_message,
+                ))
+                entities[entity.id] = entity
+
+        if exact_counts and channels:
+            counts = await fetch_participant_counts(list(entities.values()))
+            for channel in channels:
+                channel.participants_count = counts.get(channel.id, channel.participants_count)
+        if min_participants is not None:
+            channels = [c for c in channels if (c.participants_count or 0) >= min_participants]
+        if sort:
+            channels.sort(key=CHANNEL_SORT_KEYS[sort.lstrip("-")], reverse=sort.startswith("-"))
+
+        with timed("serialize"):
+            return [c.model_dump(mode="json") for c in channels]
+    except FloodWaitError as e:
+        raise HTTPException(status_code=429, detail=f"Rate limited. Wait {e.seconds} seconds")
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error listing channels: {str(e)}")
 
-@app.get("/channels/{channel_id}/messages", response_model=List[MessageModel])
-async def get_messages(
-    channel_id: int,
-    limit: int = Query(default=50, ge=1, le=1000, description="Number of messages to retrieve"),
-    offset_id: Optional[int] = Query(default=None, description="Offset message ID for pagination"),
-    min_id: Optional[int] = Query(default=None, description="Minimum message ID to retrieve"),
-    max_id: Optional[int] = Query(default=None, description="Maximum message ID to retrieve"),
-    translate: bool = Query(default=True, description="Automatically translate Russian messages to English")
-):
+def message_text(message) -> str:
+    """Message text, or a [Media: ...] placeholder for media-only messages"""
+    text = message.message or ""
+    if message.media and not text:
+        text = f"[Media: {type(message.media).__name__}]"
+    return text
+
+def message_values(
+    message, text: Optional[str], cluster_id: Optional[str] = None, fields: Optional[Sequence[str]] = None
+) -> dict:
     """
-    Get messages from a specific channel
-    
-    - **channel_id**: The ID of the channel (use /channels endpoint to find IDs)
-    - **limit**: Number of messages to retrieve (1-1000)
-    - **offset_id**: Message ID to start from (for pagination)
-    - **min_id**: Minimum message ID to retrieve
-    - **max_id**: Maximum message ID to retrieve
+    Plain MessageModel values of a Telethon message with the given (possibly
+    translated) text, dates as Unix timestamps. With `fields`, only those are
+    computed and returned. These are what the owner caches and sends over
+    IPC; the HTTP workers build and serialize the models (serialize_messages).
+    """
+    def wanted(name: str) -> bool:
+        return fields is None or name in fields
+
+    # Extract sender information
+    sender_id = None
+    sender_username = None
+    if (wanted("sender_id") or wanted("sender_username")) and message.sender:
+        if isinstance(message.sender, User):
+            sender_id = message.sender.id
+            sender_username = message.sender.username
+        elif isinstance(message.sender, Channel):
+            sender_id = message.sender.id
+            sender_username = message.sender.username
+
+    # Extract reactions
+    reactions = None
+    if wanted("reactions"):
+        with timed("extract_reactions"):
+            reactions = extract_reactions(message)
+
+    values = dict(
+        id=message.id,
+        date=message.date.timestamp(),
+        text=text,
+        sender_id=sender_id,
+        sender_username=sender_username,
+        views=message.views,
+        forwards=message.forwards,
+        reactions=reactions,
+        cluster_id=cluster_id,
+        edit_date=message.edit_date.timestamp() if message.edit_date else None,
+        version=message_version(message),
+    )
+    if fields is None:
+        return values
+    return {name: values[name] for name in fields}
+
+def build_message_model(message, text: Optional[str], cluster_id: Optional[str] = None) -> MessageModel:
+    """Convert a Telethon message into a MessageModel with the given (possibly translated) text"""
+    return MessageModel(**message_values(message, text, cluster_id))
+
+MESSAGE_FIELDS = tuple(MessageModel.model_fields)
+
+@functools.lru_cache(maxsize=64)
+def message_model(fields: Tuple[str, ...]) -> Type[BaseModel]:
+    """MessageModel with only `fields`, to validate and dump rows of a fields= request"""
+    return create_model(
+        "MessageModel", **{name: (MessageModel.model_fields[name].annotation, MessageModel.model_fields[name]) for name in fields}
+    )
+
+def serialize_messages(rows: List[dict], fields: Optional[List[str]]) -> List[dict]:
+    """Build and dump the models for the rows of fetch_messages; runs in the HTTP worker"""
+    model = MessageModel if fields is None else message_model(tuple(fields))
+    with timed("build"):
+        messages = [model(**row) for row in rows]
+    with timed("serialize"):
+        return [message.model_dump(mode="json") for message in messages]
+
+def parse_fields(fields: Optional[str]) -> Optional[List[str]]:
+    """Validated `fields=` list, or None for all fields; id is always kept (cache invalidation matches pages by id)"""
+    if fields is None:
+        return None
+    names = {name.strip() for name in fields.split(",") if name.strip()}
+    unknown = names - set(MESSAGE_FIELDS)
+    if unknown:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Unknown fields: {', '.join(sorted(unknown))}. Available: {', '.join(MESSAGE_FIELDS)}",
+        )
+    return [name for name in MESSAGE_FIELDS if name in names or name == "id"]
+
+def conditional_json(request: Request, content) -> Response:
+    """
+    JSON response with an ETag; answers 304 when the client already has it,
+    so unchanged polls cost no body (browsers revalidate automatically).
+    """
+    response = JSONResponse(content=content, headers={"Cache-Control": "no-cache"})
+    etag = '"' + hashlib.sha1(response.body).hexdigest() + '"'
+    if request.headers.get("if-none-match") == etag:
+        return Response(status_code=304, headers={"ETag": etag, "Cache-Control": "no-cache"})
+    response.headers["ETag"] = etag
+    return response
+
+dedup_index = DedupIndex(threshold=DEDUP_THRESHOLD, max_messages=DEDUP_MAX_MESSAGES)
+message_store = MessageStore(MESSAGE_STORE_SIZE)
+date_index = DateIndex(DATE_INDEX_SIZE)
+# Channel id -> username, to find pages cached under /channels/by-username
+channel_usernames: Dict[int, str] = {}
+change_log = ChangeLog(CHANGELOG_SIZE)
+alert_engine = AlertEngine(ALERT_LOG_SIZE)
+# (channel id, message) of new posts and edited texts, checked by run_alerts
+alert_queue: asyncio.Queue = asyncio.Queue(ALERT_QUEUE_SIZE)
+
+def queue_for_alerts(channel_id: int, message):
+    if not len(alert_engine):
+        return
+    try:
+        alert_queue.put_nowait((channel_id, message))
+    except asyncio.QueueFull:
+        metrics.alert_dropped()
+
+def track_messages(channel_id: int, messages, event_kind: Optional[str] = None):
+    """
+    Record the current state of messages and append what changed to the
+    change log: edits and counter updates against the last seen state, and
+    new posts (from an update, or newer than anything seen in the channel).
+    `event_kind` is the kind to log for messages never seen before. New
+    posts and edited texts are queued for the alert rules.
+    """
+    latest = message_store.latest_id(channel_id)
+    for message in sorted(messages, key=lambda m: m.id):
+        date_index.add(channel_id, message.id, message.date)
+        previous = message_store.observe(channel_id, message)
+        kind = diff(previous, message_store.get(channel_id, message.id))
+        if previous is None:
+            kind = event_kind or (NEW if latest is not None and message.id > latest else None)
+        if kind is None:
+            continue
+        if kind == NEW or (kind == EDITED and (previous is None or previous.text != (message.message or ""))):
+            queue_for_alerts(channel_id, message)
+        model = build_message_model(message, message_text(message)).model_dump(mode="json")
+        if kind == COUNTERS:
+            change_log.append(kind, channel_id, message.id, **{field: model[field] for field in ("views", "forwards", "reactions")})
+        else:
+            change_log.append(kind, channel_id, message.id, message=model)
+
+async def cluster_messages(channel_id: int, raw_messages) -> List[Optional[str]]:
+    """Duplicate cluster id per message (MinHash runs in a worker thread)"""
+    items = [
+        DedupItem(channel_id, message.id, message.date.timestamp(), message.message or "")
+        for message in raw_messages
+    ]
+    with timed("dedup"):
+        return await asyncio.to_thread(dedup_index.assign, items)
+
+message_cache = TTLCache(
+    ttl=MESSAGE_CACHE_TTL,
+    on_hit=metrics.response_cache_hit,
+    on_miss=metrics.response_cache_miss,
+)
+
+def cache_peer(peer):
+    """message_cache key for a peer: usernames are case-insensitive and may start with @"""
+    return peer.lstrip("@").lower() if isinstance(peer, str) else peer
+
+def channel_peers(channel_id: int, username: Optional[str] = None) -> set:
+    """Every message_cache peer a channel's pages may be cached under"""
+    usernames = (username, channel_usernames.get(channel_id))
+    return {channel_id} | {cache_peer(name) for name in usernames if name}
+
+@ipc.owned
+async def fetch_messages(
+    peer,
+    limit: int,
+    offset_id: Optional[int],
+    min_id: Optional[int],
+    max_id: Optional[int],
+    translate: bool,
+    dedupe: bool = False,
+    since: Optional[float] = None,
+    until: Optional[float] = None,
+    fields: Optional[List[str]] = None,
+) -> List[dict]:
+    """
+    Shared pipeline for the message endpoints; runs in the Telegram owner
+    and returns message_values rows (see serialize_messages). Pages are
+    served from message_cache while fresh. `since`/`until` are Unix
+    timestamps.
+    """
+    await require_telegram()
+    key = (cache_peer(peer), limit, offset_id, min_id, max_id, translate, dedupe, since, until, tuple(fields) if fields else None)
+    return await message_cache.get_or_create(
+        key, lambda: _fetch_messages(peer, limit, offset_id, min_id, max_id, translate, dedupe, since, until, fields)
+    )
+
+async def _fetch_messages(
+    peer,
+    limit: int,
+    offset_id: Optional[int],
+    min_id: Optional[int],
+    max_id: Optional[int],
+    translate: bool,
+    dedupe: bool = False,
+    since: Optional[float] = None,
+    until: Optional[float] = None,
+    fields: Optional[List[str]] = None,
+) -> List[dict]:
+    """
+    get_entity -> iter_messages -> dedup -> translate -> message values.
+    With `fields`, stages whose output isn't requested are skipped: texts
+    and translation without "text", sender and reaction parsing without
+    their fields. Messages are only clustered with `dedupe` or an explicit
+    "cluster_id" field.
+    With `dedupe`, copies of a post seen earlier (in any channel) are left
+    out before translation, so a cluster is translated once.
+    A date window is one ranged fetch: `until` is Telegram's offset_date and
+    `since` becomes a min_id through the local id/date index.
     """
     try:
         # Get the channel entity
-        entity = await client.get_entity(channel_id)
-        
+        with timed("get_entity"):
+            entity = await client.get_entity(peer)
+
         # Build kwargs for iter_messages, only including non-None values
         iter_kwargs = {"limit": limit}
         if offset_id is not None:
@@ -273,45 +1132,54 @@ async def get_messages(
             iter_kwargs["min_id"] = min_id
         if max_id is not None:
             iter_kwargs["max_id"] = max_id
-        
-        messages = []
-        async for message in client.iter_messages(entity, **iter_kwargs):
-            # Extract sender information
-            sender_id = None
-            sender_username = None
-            if message.sender:
-                if isinstance(message.sender, User):
-                    sender_id = message.sender.id
-                    sender_username = message.sender.username
-                elif isinstance(message.sender, Channel):
-                    sender_id = message.sender.id
-                    sender_username = message.sender.username
-            
-            # Get message text
-            text = message.message or ""
-            if message.media and not text:
-                text = f"[Media: {type(message.media).__name__}]"
-            
-            # Translate Russian to English if translate is enabled
+        if until is not None:
+            iter_kwargs["offset_date"] = datetime.fromtimestamp(until, timezone.utc)
+        since_date = datetime.fromtimestamp(since, timezone.utc) if since is not None else None
+        if since_date is not None:
+            with timed("date_index"):
+                before = date_index.last_id_before(entity.id, since_date)
+            if before is not None and (min_id is None or before > min_id):
+                iter_kwargs["min_id"] = before
+
+        with timed("iter_messages"):
+            raw_messages = []
+            async for message in client.iter_messages(entity, **iter_kwargs):
+                if since_date is not None and message.date < since_date:
+                    # The index didn't reach back to `since` yet; it does now
+                    date_index.add(entity.id, message.id, message.date)
+                    break
+                raw_messages.append(message)
+
+        if entity.username:
+            channel_usernames[entity.id] = entity.username
+        track_messages(entity.id, raw_messages)
+        if dedupe or (fields is not None and "cluster_id" in fields):
+            cluster_ids = await cluster_messages(entity.id, raw_messages)
+        else:
+            cluster_ids = [None] * len(raw_messages)
+        if dedupe:
+            kept = [
+                (message, cluster_id)
+                for message, cluster_id in zip(raw_messages, cluster_ids)
+                if dedup_index.is_first(cluster_id, entity.id, message.id)
+            ]
+            raw_messages = [message for message, _ in kept]
+            cluster_ids = [cluster_id for _, cluster_id in kept]
+
+        if fields is None or "text" in fields:
+            texts = [message_text(message) for message in raw_messages]
+            # Auto-translate (AUTO_TRANSLATE_SOURCES -> AUTO_TRANSLATE_TARGET) if enabled
             if translate:
-                text = translate_russian_to_english(text)
-            
-            # Extract reactions
-            reactions = extract_reactions(message)
-            
-            message_model = MessageModel(
-                id=message.id,
-                date=message.date,
-                text=text,
-                sender_id=sender_id,
-                sender_username=sender_username,
-                views=message.views,
-                forwards=message.forwards,
-                reactions=reactions
-            )
-            messages.append(message_model)
-        
-        return messages
+                with timed("translate_all"):
+                    texts = await translate_texts(texts)
+        else:
+            texts = [None] * len(raw_messages)
+
+        with timed("values"):
+            return [
+                message_values(message, text, cluster_id, fields)
+                for message, text, cluster_id in zip(raw_messages, texts, cluster_ids)
+            ]
     except ValueError as e:
         raise HTTPException(status_code=404, detail=f"Channel not found: {str(e)}")
     except FloodWaitError as e:
@@ -319,14 +1187,52 @@ async def get_messages(
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error retrieving messages: {str(e)}")
 
+@app.get("/channels/{channel_id}/messages", response_model=List[MessageModel])
+async def get_messages(
+    request: Request,
+    channel_id: int,
+    limit: int = Query(default=50, ge=1, le=1000, description="Number of messages to retrieve"),
+    offset_id: Optional[int] = Query(default=None, description="Offset message ID for pagination"),
+    min_id: Optional[int] = Query(default=None, description="Minimum message ID to retrieve"),
+    max_id: Optional[int] = Query(default=None, description="Maximum message ID to retrieve"),
+    translate: bool = Query(default=True, description="Automatically translate messages in AUTO_TRANSLATE_SOURCES languages to AUTO_TRANSLATE_TARGET"),
+    dedupe: bool = Query(default=False, description="Leave out copies of posts already seen earlier in any channel"),
+    since: Optional[datetime] = Query(default=None, description="Only messages posted at or after this time (ISO 8601, UTC if no offset)"),
+    until: Optional[datetime] = Query(default=None, description="Only messages posted before this time (ISO 8601, UTC if no offset)"),
+    fields: Optional[str] = Query(default=None, description="Comma-separated message fields to return (id is always included), e.g. id,date,views")
+):
+    """
+    Get messages from a specific channel
+    
+    - **channel_id**: The ID of the channel (use /channels endpoint to find IDs)
+    - **limit**: Number of messages to retrieve (1-1000)
+    - **offset_id**: Message ID to start from (for pagination)
+    - **min_id**: Minimum message ID to retrieve
+    - **max_id**: Maximum message ID to retrieve
+    - **dedupe**: Skip duplicates and near-duplicates of earlier posts (may return fewer than `limit`)
+    - **since** / **until**: Date window, newest first (combine with `limit`/`offset_id` to page through it)
+    - **fields**: Only compute and return these fields; e.g. without `text` nothing is translated
+    """
+    fields = parse_fields(fields)
+    rows = await fetch_messages(
+        peer=channel_id, limit=limit, offset_id=offset_id, min_id=min_id, max_id=max_id, translate=translate, dedupe=dedupe,
+        since=unix_time(since), until=unix_time(until), fields=fields,
+    )
+    return conditional_json(request, serialize_messages(rows, fields))
+
 @app.get("/channels/by-username/{username}/messages", response_model=List[MessageModel])
 async def get_messages_by_username(
+    request: Request,
     username: str,
     limit: int = Query(default=50, ge=1, le=1000, description="Number of messages to retrieve"),
     offset_id: Optional[int] = Query(default=None, description="Offset message ID for pagination"),
     min_id: Optional[int] = Query(default=None, description="Minimum message ID to retrieve"),
     max_id: Optional[int] = Query(default=None, description="Maximum message ID to retrieve"),
-    translate: bool = Query(default=True, description="Automatically translate Russian messages to English")
+    translate: bool = Query(default=True, description="Automatically translate messages in AUTO_TRANSLATE_SOURCES languages to AUTO_TRANSLATE_TARGET"),
+    dedupe: bool = Query(default=False, description="Leave out copies of posts already seen earlier in any channel"),
+    since: Optional[datetime] = Query(default=None, description="Only messages posted at or after this time (ISO 8601, UTC if no offset)"),
+    until: Optional[datetime] = Query(default=None, description="Only messages posted before this time (ISO 8601, UTC if no offset)"),
+    fields: Optional[str] = Query(default=None, description="Comma-separated message fields to return (id is always included), e.g. id,date,views")
 ):
     """
     Get messages from a channel by username (e.g., 'channelname' without @)
@@ -336,66 +1242,328 @@ async def get_messages_by_username(
     - **offset_id**: Message ID to start from (for pagination)
     - **min_id**: Minimum message ID to retrieve
     - **max_id**: Maximum message ID to retrieve
+    - **dedupe**: Skip duplicates and near-duplicates of earlier posts (may return fewer than `limit`)
+    - **since** / **until**: Date window, newest first (combine with `limit`/`offset_id` to page through it)
+    - **fields**: Only compute and return these fields; e.g. without `text` nothing is translated
     """
+    fields = parse_fields(fields)
+    rows = await fetch_messages(
+        peer=username, limit=limit, offset_id=offset_id, min_id=min_id, max_id=max_id, translate=translate, dedupe=dedupe,
+        since=unix_time(since), until=unix_time(until), fields=fields,
+    )
+    return conditional_json(request, serialize_messages(rows, fields))
+
+@ipc.owned
+async def read_changes(after_seq: int, limit: int, channel_id: Optional[int]) -> dict:
+    """Range of the change log; runs in the Telegram owner"""
+    return change_log.read(after_seq, limit, channel_id)
+
+@app.get("/changes")
+async def get_changes(
+    after_seq: int = Query(default=0, ge=0, description="Return changes after this sequence number (your checkpoint)"),
+    limit: int = Query(default=100, ge=1, le=1000, description="Maximum number of changes"),
+    channel_id: Optional[int] = Query(default=None, description="Only changes of this channel"),
+):
+    """
+    Change feed: new, edited and deleted messages and counter updates
+    (views, forwards, reactions) in sequence order. Pass the returned
+    `last_seq` as `after_seq` to continue; resync if `epoch` changed or
+    `truncated` is true.
+    """
+    return JSONResponse(content=await read_changes(after_seq=after_seq, limit=limit, channel_id=channel_id))
+
+live_hub = MessageHub()
+
+def invalidate_message_pages(channel_id: int, message_ids) -> int:
+    """Drop the cached pages of a channel that contain any of `message_ids`"""
+    peers = channel_peers(channel_id)
+    ids = set(message_ids)
+    return message_cache.invalidate_values(
+        lambda key, page: key[0] in peers and any(message["id"] in ids for message in page)
+    )
+
+def forget_translations(text: str):
+    """Drop the cached auto-translations and detected language of a text that was edited away or deleted"""
+    for target in _translation_targets:
+        _translation_cache.pop((target, text), None)
+    detected_languages.pop(text)
+
+async def publish_live(channel_id: int, message):
+    """Push a new or edited message to live subscribers (built and translated once per mode)"""
+    for translate in live_hub.modes(channel_id):
+        text = message_text(message)
+        if translate:
+            text = (await translate_texts([text]))[0]
+        live_hub.publish(channel_id, translate, build_message_model(message, text).model_dump(mode="json"))
+
+async def on_new_message(event):
+    """
+    New post in a channel: drop cached latest pages of that channel and push
+    the message to live subscribers.
+    """
+    message = event.message
+    if not isinstance(message.peer_id, PeerChannel):
+        return
+    channel_id = message.peer_id.channel_id
+    peers = channel_peers(channel_id, getattr(message.chat, "username", None))
+    track_messages(channel_id, [message], event_kind=NEW)
+    # key = (peer, limit, offset_id, min_id, max_id, translate, dedupe, since, until, fields);
+    # older pages and date windows that ended before the post are unaffected
+    posted = message.date.timestamp()
+    message_cache.invalidate(
+        lambda key: key[0] in peers and key[2] is None and key[4] is None
+        and (key[8] is None or key[8] > posted)
+    )
+    await publish_live(channel_id, message)
+
+async def on_message_edited(event):
+    """
+    Edited post (new text, or changed views/reactions): record the new
+    version, drop the translations of the old text and only the cached pages
+    that contain the message, and push it to live subscribers.
+    """
+    message = event.message
+    if not isinstance(message.peer_id, PeerChannel):
+        return
+    channel_id = message.peer_id.channel_id
+    previous = message_store.get(channel_id, message.id)
+    track_messages(channel_id, [message], event_kind=EDITED if message.edit_date else COUNTERS)
+    if previous is not None and previous.text != (message.message or ""):
+        forget_translations(previous.text)
+        # The post may have joined or left a duplicate cluster
+        message_cache.invalidate(lambda key: key[6])
+    invalidate_message_pages(channel_id, [message.id])
+    await publish_live(channel_id, message)
+
+async def on_message_deleted(event):
+    """
+    Deleted posts: forget them, drop the cached pages that contained them and
+    tell live subscribers which ids are gone.
+    """
+    # Only channel deletions say which chat they belong to
+    channel_id = getattr(event.original_update, "channel_id", None)
+    if channel_id is None:
+        return
+    for message_id in event.deleted_ids:
+        change_log.append(DELETED, channel_id, message_id)
+        previous = message_store.remove(channel_id, message_id)
+        date_index.remove(channel_id, message_id)
+        if previous is not None:
+            forget_translations(previous.text)
+        dedup_index.remove(channel_id, message_id)
+    invalidate_message_pages(channel_id, event.deleted_ids)
+    # A deleted first copy makes the next copy of its cluster visible with dedupe=true
+    message_cache.invalidate(lambda key: key[6])
+    for translate in live_hub.modes(channel_id):
+        live_hub.publish(channel_id, translate, {"deleted_ids": list(event.deleted_ids)})
+
+@ipc.owned_stream
+async def subscribe_messages(channel_id: int, translate: bool):
+    """
+    New and edited messages of a channel as they arrive, plus {"deleted_ids": [...]}
+    for deletions (None = keep-alive); runs in the Telegram owner
+    """
+    await require_telegram()
+    async for message in live_hub.subscribe(channel_id, translate, LIVE_HEARTBEAT_SECONDS):
+        yield message
+
+@app.get("/channels/{channel_id}/stream")
+async def stream_messages(
+    channel_id: int,
+    translate: bool = Query(default=True, description="Automatically translate messages in AUTO_TRANSLATE_SOURCES languages to AUTO_TRANSLATE_TARGET")
+):
+    """
+    Server-Sent Events stream of new and edited messages in a channel
+    (`event: message`, data = a MessageModel) and deletions (`event: delete`,
+    data = {"deleted_ids": [...]}). Nothing is sent until a message arrives apart from
+    a keep-alive comment every LIVE_HEARTBEAT_SECONDS. After (re)connecting,
+    fetch /messages?min_id=<newest seen> once to catch up.
+    """
+    stream = subscribe_messages(channel_id=channel_id, translate=translate)
+    # Subscribe before answering, so errors (e.g. 503 while connecting) are proper HTTP errors
+    await stream.__anext__()
+
+    async def events():
+        try:
+            yield "retry: 5000\n: connected\n\n"
+            async for message in stream:
+                if message is None:
+                    yield ": keep-alive\n\n"
+                    continue
+                if "deleted_ids" in message:
+                    yield f"event: delete\ndata: {json.dumps(message)}\n\n"
+                    continue
+                data = json.dumps(message, ensure_ascii=False)
+                yield f"id: {message['id']}\nevent: message\ndata: {data}\n\n"
+        finally:
+            await stream.aclose()
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+async def check_alerts(batch: List[tuple]):
+    """Evaluate (channel id, message) pairs once, against the original and translated text"""
+    texts = [message.message or "" for _, message in batch]
+    translations = await translate_texts(texts) if ALERT_TRANSLATE else [None] * len(texts)
+    items = [
+        AlertItem(channel_id, message.id, message.date.timestamp(), text, translation)
+        for (channel_id, message), text, translation in zip(batch, texts, translations)
+    ]
+    with timed("alerts"):
+        matches = await asyncio.to_thread(alert_engine.evaluate, items)
+    metrics.alerts_evaluated(len(items), alert_engine.publish(matches))
+
+async def run_alerts():
+    """Check queued messages against the alert rules, up to 100 at a time"""
+    while True:
+        batch = [await alert_queue.get()]
+        while len(batch) < 100 and not alert_queue.empty():
+            batch.append(alert_queue.get_nowait())
+        try:
+            await check_alerts(batch)
+        except Exception:
+            logger.exception("Checking %d messages against the alert rules failed", len(batch))
+
+async def rescan_alerts(rule_ids) -> int:
+    """
+    Check the messages in message_store (with their cached translations)
+    against `rule_ids`; returns the number of matches
+    """
+    items = [
+        AlertItem(channel_id, message_id, record.date.timestamp(), record.text,
+                  _cached_translation(record.text, AUTO_TRANSLATE_TARGET, AUTO_TRANSLATE_SOURCES))
+        for (channel_id, message_id), record in message_store.items()
+    ]
+    with timed("alerts_rescan"):
+        matches = await asyncio.to_thread(alert_engine.evaluate, items, set(rule_ids))
+    return alert_engine.publish(matches, rescan=True)
+
+@ipc.owned
+async def list_alert_rules() -> List[dict]:
+    return [rule.to_dict() for rule in alert_engine.rules()]
+
+@ipc.owned
+async def add_alert_rule(rule: dict, rescan: bool, admin_token: Optional[str]) -> dict:
+    """Add a rule (only the new terms are compiled) and save the rule set; runs in the owner"""
+    # Checked here too: the owner socket is an entry point of its own
+    require_admin(admin_token)
     try:
-        # Get the channel entity by username
-        entity = await client.get_entity(username)
-        
-        # Build kwargs for iter_messages, only including non-None values
-        iter_kwargs = {"limit": limit}
-        if offset_id is not None:
-            iter_kwargs["offset_id"] = offset_id
-        if min_id is not None:
-            iter_kwargs["min_id"] = min_id
-        if max_id is not None:
-            iter_kwargs["max_id"] = max_id
-        
-        messages = []
-        async for message in client.iter_messages(entity, **iter_kwargs):
-            # Extract sender information
-            sender_id = None
-            sender_username = None
-            if message.sender:
-                if isinstance(message.sender, User):
-                    sender_id = message.sender.id
-                    sender_username = message.sender.username
-                elif isinstance(message.sender, Channel):
-                    sender_id = message.sender.id
-                    sender_username = message.sender.username
-            
-            # Get message text
-            text = message.message or ""
-            if message.media and not text:
-                text = f"[Media: {type(message.media).__name__}]"
-            
-            # Translate Russian to English if translate is enabled
-            if translate:
-                text = translate_russian_to_english(text)
-            
-            # Extract reactions
-            reactions = extract_reactions(message)
-            
-            message_model = MessageModel(
-                id=message.id,
-                date=message.date,
-                text=text,
-                sender_id=sender_id,
-                sender_username=sender_username,
-                views=message.views,
-                forwards=message.forwards,
-                reactions=reactions
-            )
-            messages.append(message_model)
-        
-        return messages
+        new_rule = Rule.create(**rule)
     except ValueError as e:
-        raise HTTPException(status_code=404, detail=f"Channel not found: {str(e)}")
-    except FloodWaitError as e:
-        raise HTTPException(status_code=429, detail=f"Rate limited. Wait {e.seconds} seconds")
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Error retrieving messages: {str(e)}")
+        raise HTTPException(status_code=400, detail=str(e))
+    if len(alert_engine) >= ALERT_MAX_RULES:
+        raise HTTPException(status_code=409, detail=f"Too many alert rules (ALERT_MAX_RULES={ALERT_MAX_RULES})")
+    await asyncio.to_thread(alert_engine.add, new_rule)
+    await asyncio.to_thread(alert_engine.save, ALERT_RULES_FILE)
+    result = new_rule.to_dict()
+    if rescan:
+        result["rescan_matches"] = await rescan_alerts([new_rule.id])
+    return result
+
+@ipc.owned
+async def delete_alert_rule(rule_id: str, admin_token: Optional[str]) -> dict:
+    require_admin(admin_token)
+    rule = await asyncio.to_thread(alert_engine.remove, rule_id)
+    if rule is None:
+        raise HTTPException(status_code=404, detail=f"Alert rule not found: {rule_id}")
+    await asyncio.to_thread(alert_engine.save, ALERT_RULES_FILE)
+    return rule.to_dict()
+
+@ipc.owned
+async def read_alerts(after_seq: int, limit: int, rule_id: Optional[str]) -> dict:
+    log = alert_engine.log
+    matches = log.read(after_seq, limit, rule_id)
+    return {
+        "epoch": log.epoch,
+        "matches": matches,
+        "last_seq": matches[-1]["seq"] if len(matches) == limit else max(after_seq, log.head_seq),
+        "head_seq": log.head_seq,
+    }
+
+@ipc.owned_stream
+async def subscribe_alerts(after_seq: Optional[int], rule_id: Optional[str]):
+    """Matches after `after_seq` (default: from now on) as they are logged (None = keep-alive)"""
+    log = alert_engine.log
+    # A checkpoint ahead of the log comes from before a restart: replay everything
+    seq = log.head_seq if after_seq is None else (after_seq if after_seq <= log.head_seq else 0)
+    yield None
+    while True:
+        if not await log.wait(seq, LIVE_HEARTBEAT_SECONDS):
+            yield None
+            continue
+        matches = log.read(seq, 1000, rule_id)
+        seq = matches[-1]["seq"] if len(matches) == 1000 else log.head_seq
+        for match in matches:
+            yield match
+
+@app.get("/alerts/rules")
+async def get_alert_rules():
+    """All alert rules"""
+    return JSONResponse(content=await list_alert_rules())
+
+@app.post("/alerts/rules", status_code=201, dependencies=[Depends(admin_only)])
+async def create_alert_rule(
+    rule: AlertRuleModel,
+    rescan: bool = Query(default=False, description="Also check the messages the API remembers (MESSAGE_STORE_SIZE) against the new rule"),
+    x_admin_token: Optional[str] = Header(default=None),
+):
+    """
+    Add an alert rule. From now on, new posts and edited texts are checked
+    against its terms and patterns (original and translated text); past
+    messages only with `rescan=true`.
+    """
+    return JSONResponse(status_code=201, content=await add_alert_rule(rule=rule.model_dump(), rescan=rescan, admin_token=x_admin_token))
+
+@app.delete("/alerts/rules/{rule_id}", dependencies=[Depends(admin_only)])
+async def remove_alert_rule(rule_id: str, x_admin_token: Optional[str] = Header(default=None)):
+    """Delete an alert rule"""
+    return JSONResponse(content=await delete_alert_rule(rule_id=rule_id, admin_token=x_admin_token))
+
+@app.get("/alerts/matches")
+async def get_alert_matches(
+    after_seq: int = Query(default=0, ge=0, description="Return matches after this sequence number (your checkpoint)"),
+    limit: int = Query(default=100, ge=1, le=1000, description="Maximum number of matches"),
+    rule_id: Optional[str] = Query(default=None, description="Only matches of this rule"),
+):
+    """Recent alert matches in order; pass the returned `last_seq` as `after_seq` to continue"""
+    return JSONResponse(content=await read_alerts(after_seq=after_seq, limit=limit, rule_id=rule_id))
+
+@app.get("/alerts/stream")
+async def stream_alerts(
+    rule_id: Optional[str] = Query(default=None, description="Only matches of this rule"),
+    after_seq: Optional[int] = Query(default=None, ge=0, description="Replay matches after this sequence number first"),
+    last_event_id: Optional[str] = Header(default=None),
+):
+    """
+    Server-Sent Events stream of alert matches (`event: match`, `id` = the
+    match's sequence number). Reconnecting browsers resume from
+    Last-Event-ID automatically.
+    """
+    if after_seq is None and last_event_id and last_event_id.isdigit():
+        after_seq = int(last_event_id)
+    stream = subscribe_alerts(after_seq=after_seq, rule_id=rule_id)
+    await stream.__anext__()
+
+    async def events():
+        try:
+            yield "retry: 5000\n: connected\n\n"
+            async for match in stream:
+                if match is None:
+                    yield ": keep-alive\n\n"
+                    continue
+                yield f"id: {match['seq']}\nevent: match\ndata: {json.dumps(match, ensure_ascii=False)}\n\n"
+        finally:
+            await stream.aclose()
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
 
 if __name__ == "__main__":
     import uvicorn
-    uvicorn.run(app, host="0.0.0.0", port=8000)
-
+    uvicorn.run(app, host="0.0.0.0", port=int(os.getenv("PORT", "8000")))
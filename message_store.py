@@ -0,0 +1,153 @@
+"""
+Last known state of the messages the API has seen.
+
+Fetched pages and Telegram's updates are recorded here, so an edit or
+deletion can be matched against what was served before: the old text (whose
+translations are dropped), the version the clients have, and the counters
+(views, forwards, reactions) whose changes go to the change log.
+
+DateIndex keeps the (id, date) of every message seen per channel, so date
+ranges can be turned into message id ranges.
+"""
+from array import array
+from bisect import bisect_left
+from collections import OrderedDict
+from datetime import datetime
+from typing import Dict, List, NamedTuple, Optional, Tuple
+
+
+def message_version(message) -> int:
+    """0 for an unedited message, else the Unix time of its last edit"""
+    edit_date = getattr(message, "edit_date", None)
+    return int(edit_date.timestamp()) if edit_date else 0
+
+
+def reaction_counts(message) -> Tuple[Tuple[str, int], ...]:
+    """(reaction, count) pairs of a Telethon message, for change detection"""
+    results = getattr(getattr(message, "reactions", None), "results", None) or ()
+    return tuple(
+        (str(getattr(r.reaction, "emoticon", None) or getattr(r.reaction, "document_id", "")), r.count)
+        for r in results
+    )
+
+
+class MessageRecord(NamedTuple):
+    text: str
+    date: datetime
+    version: int
+    views: Optional[int] = None
+    forwards: Optional[int] = None
+    reactions: Tuple[Tuple[str, int], ...] = ()
+
+    @classmethod
+    def of(cls, message) -> "MessageRecord":
+        return cls(
+            message.message or "",
+            message.date,
+            message_version(message),
+            message.views,
+            message.forwards,
+            reaction_counts(message),
+        )
+
+    def counters(self) -> tuple:
+        return self.views, self.forwards, self.reactions
+
+
+def diff(previous: Optional[MessageRecord], current: MessageRecord) -> Optional[str]:
+    """"edited", "counters" or None, comparing two states of one message"""
+    if previous is None:
+        return None
+    if previous.text != current.text or previous.version != current.version:
+        return "edited"
+    if previous.counters() != current.counters():
+        return "counters"
+    return None
+
+
+class MessageStore:
+    """Bounded LRU of MessageRecords keyed by (channel id, message id)"""
+
+    def __init__(self, max_messages: int = 200000):
+        self.max_messages = max_messages
+        self._records: "OrderedDict[Tuple[int, int], MessageRecord]" = OrderedDict()
+        # Highest message id seen per channel, to tell new posts from old ones seen for the first time
+        self._latest: Dict[int, int] = {}
+
+    def __len__(self) -> int:
+        return len(self._records)
+
+    def get(self, channel_id: int, message_id: int) -> Optional[MessageRecord]:
+        return self._records.get((channel_id, message_id))
+
+    def latest_id(self, channel_id: int) -> Optional[int]:
+        return self._latest.get(channel_id)
+
+    def observe(self, channel_id: int, message) -> Optional[MessageRecord]:
+        """Record the current state of a Telethon message; returns the previous one"""
+        key = (channel_id, message.id)
+        previous = self._records.get(key)
+        self._records[key] = MessageRecord.of(message)
+        self._records.move_to_end(key)
+        if message.id > self._latest.get(channel_id, 0):
+            self._latest[channel_id] = message.id
+        while len(self._records) > self.max_messages:
+            self._records.popitem(last=False)
+        return previous
+
+    def remove(self, channel_id: int, message_id: int) -> Optional[MessageRecord]:
+        return self._records.pop((channel_id, message_id), None)
+
+    def items(self) -> List[Tuple[Tuple[int, int], MessageRecord]]:
+        """((channel id, message id), record) of every remembered message, oldest first"""
+        return list(self._records.items())
+
+
+class DateIndex:
+    """
+    Per-channel message ids and dates in id order (compact arrays), for
+    binary search by date. Channel posts are dated in id order, so the dates
+    are sorted too. Keeps the newest `max_per_channel` ids of each channel.
+    """
+
+    def __init__(self, max_per_channel: int = 100000):
+        self.max_per_channel = max_per_channel
+        self._ids: Dict[int, array] = {}
+        self._dates: Dict[int, array] = {}  # Unix timestamps, parallel to _ids
+
+    def __len__(self) -> int:
+        return sum(len(ids) for ids in self._ids.values())
+
+    def add(self, channel_id: int, message_id: int, date: datetime):
+        ids = self._ids.setdefault(channel_id, array("q"))
+        dates = self._dates.setdefault(channel_id, array("d"))
+        # Pages arrive newest first and updates append, so this is mostly an append
+        index = bisect_left(ids, message_id)
+        if index < len(ids) and ids[index] == message_id:
+            return
+        ids.insert(index, message_id)
+        dates.insert(index, date.timestamp())
+        if len(ids) > self.max_per_channel:
+            excess = len(ids) - self.max_per_channel
+            del ids[:excess]
+            del dates[:excess]
+
+    def remove(self, channel_id: int, message_id: int):
+        ids = self._ids.get(channel_id)
+        if not ids:
+            return
+        index = bisect_left(ids, message_id)
+        if index < len(ids) and ids[index] == message_id:
+            del ids[index]
+            del self._dates[channel_id][index]
+
+    def last_id_before(self, channel_id: int, date: datetime) -> Optional[int]:
+        """
+        Newest known message id dated before `date`: every message up to it
+        is older, so it is an exclusive `min_id` for messages since `date`
+        """
+        dates = self._dates.get(channel_id)
+        if not dates:
+            return None
+        index = bisect_left(dates, date.timestamp())
+        return self._ids[channel_id][index - 1] if index else None
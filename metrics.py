@@ -0,0 +1,229 @@
+"""
+Prometheus metrics and per-stage latency instrumentation for the API.
+
+Stages are timed with the `timed()` context manager. Inside an HTTP request
+the durations are summed per stage and observed once when the response is
+sent (see `timing_middleware`), which also fills the optional
+`Server-Timing` header. Outside a request they are observed immediately.
+"""
+import os
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Dict, Optional
+
+from prometheus_client import (
+    CONTENT_TYPE_LATEST,
+    Counter,
+    Gauge,
+    Histogram,
+    generate_latest,
+    start_http_server,
+)
+
+# Set SERVER_TIMING=1 to add a Server-Timing header to every response
+SERVER_TIMING_ENABLED = os.getenv("SERVER_TIMING", "0").lower() in ("1", "true", "yes")
+
+STAGE_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+STAGE_SECONDS = Histogram(
+    "telegram_api_stage_seconds",
+    "Time spent per pipeline stage within a request",
+    ["stage"],
+    buckets=STAGE_BUCKETS,
+)
+REQUEST_SECONDS = Histogram(
+    "telegram_api_request_seconds",
+    "End-to-end HTTP request latency",
+    ["method", "route", "status"],
+    buckets=STAGE_BUCKETS,
+)
+TRANSLATION_CACHE = Counter(
+    "telegram_api_translation_cache_total",
+    "Translation cache lookups",
+    ["result"],
+)
+TRANSLATION_MEMORY = Counter(
+    "telegram_api_translation_memory_total",
+    "Sentence lookups in the translation memory",
+    ["result"],
+)
+RESPONSE_CACHE = Counter(
+    "telegram_api_response_cache_total",
+    "Message page cache lookups (coalesced in-flight fetches count as hits)",
+    ["result"],
+)
+FLOOD_WAIT_SECONDS = Counter(
+    "telegram_api_flood_wait_seconds_total",
+    "Seconds of FloodWait imposed by Telegram",
+)
+TELEGRAM_RPC = Counter(
+    "telegram_api_rpc_total",
+    "Telethon RPC calls per request type",
+    ["method"],
+)
+LOOP_LAG_SECONDS = Histogram(
+    "telegram_api_event_loop_lag_seconds",
+    "How late the event loop wakes up from the watchdog heartbeat",
+    buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0),
+)
+
+LIVE_SUBSCRIBERS = Gauge(
+    "telegram_api_live_subscribers",
+    "Open live message subscriptions (SSE streams)",
+)
+LIVE_MESSAGES = Counter(
+    "telegram_api_live_messages_total",
+    "Messages pushed to live subscribers",
+)
+
+SESSION_FLUSH_ROWS = Counter(
+    "telegram_api_session_flushed_rows_total",
+    "Telethon session rows (entities, update state, files) written to disk",
+)
+SESSION_FLUSH_SECONDS = Histogram(
+    "telegram_api_session_flush_seconds",
+    "Duration of one batched session write",
+    buckets=STAGE_BUCKETS,
+)
+
+ALERT_MESSAGES = Counter(
+    "telegram_api_alert_messages_total",
+    "Ingested messages checked against the alert rules (dropped = alert queue full)",
+    ["result"],
+)
+ALERT_MATCHES = Counter(
+    "telegram_api_alert_matches_total",
+    "Alert rule matches",
+)
+
+_stage_totals: ContextVar[Optional[Dict[str, float]]] = ContextVar("stage_totals", default=None)
+
+
+def record_stage(stage: str, seconds: float):
+    """Add `seconds` to `stage` for the current request (or observe it directly)."""
+    totals = _stage_totals.get()
+    if totals is None:
+        STAGE_SECONDS.labels(stage).observe(seconds)
+    else:
+        totals[stage] = totals.get(stage, 0.0) + seconds
+
+
+@contextmanager
+def timed(stage: str):
+    """Time the enclosed block as one pipeline stage"""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        record_stage(stage, time.perf_counter() - start)
+
+
+@contextmanager
+def collect_stages():
+    """Collect stage totals of the enclosed block into a fresh dict"""
+    totals: Dict[str, float] = {}
+    token = _stage_totals.set(totals)
+    try:
+        yield totals
+    finally:
+        _stage_totals.reset(token)
+
+
+def translation_cache_hit():
+    TRANSLATION_CACHE.labels("hit").inc()
+
+
+def translation_cache_miss():
+    TRANSLATION_CACHE.labels("miss").inc()
+
+
+def translation_memory_lookup(hits: int, misses: int):
+    TRANSLATION_MEMORY.labels("hit").inc(hits)
+    TRANSLATION_MEMORY.labels("miss").inc(misses)
+
+
+def response_cache_hit():
+    RESPONSE_CACHE.labels("hit").inc()
+
+
+def response_cache_miss():
+    RESPONSE_CACHE.labels("miss").inc()
+
+
+def count_rpc(request):
+    """Count a Telethon request (or list of requests) by constructor name"""
+    requests = request if isinstance(request, (list, tuple)) else (request,)
+    for r in requests:
+        TELEGRAM_RPC.labels(type(r).__name__).inc()
+
+
+def count_flood_wait(seconds: int):
+    FLOOD_WAIT_SECONDS.inc(seconds or 0)
+
+
+def observe_loop_lag(seconds: float):
+    LOOP_LAG_SECONDS.observe(seconds)
+
+
+def live_subscribed():
+    LIVE_SUBSCRIBERS.inc()
+
+
+def live_unsubscribed():
+    LIVE_SUBSCRIBERS.dec()
+
+
+def live_message_pushed(subscribers: int):
+    LIVE_MESSAGES.inc(subscribers)
+
+
+def session_flushed(rows: int, seconds: float):
+    SESSION_FLUSH_ROWS.inc(rows)
+    SESSION_FLUSH_SECONDS.observe(seconds)
+
+
+def alerts_evaluated(messages: int, matches: int):
+    ALERT_MESSAGES.labels("evaluated").inc(messages)
+    ALERT_MATCHES.inc(matches)
+
+
+def alert_dropped():
+    ALERT_MESSAGES.labels("dropped").inc()
+
+def _server_timing_header(totals: Dict[str, float], total: float) -> str:
+    parts = [f"{stage.replace(' ', '_')};dur={seconds * 1000:.1f}" for stage, seconds in totals.items()]
+    parts.append(f"total;dur={total * 1000:.1f}")
+    return ", ".join(parts)
+
+
+async def timing_middleware(request, call_next):
+    """HTTP middleware: collect stage totals per request and export them"""
+    totals: Dict[str, float] = {}
+    token = _stage_totals.set(totals)
+    start = time.perf_counter()
+    status = 500
+    try:
+        response = await call_next(request)
+        status = response.status_code
+    finally:
+        _stage_totals.reset(token)
+        elapsed = time.perf_counter() - start
+        route = request.scope.get("route")
+        route_path = getattr(route, "path", "unmatched")
+        REQUEST_SECONDS.labels(request.method, route_path, str(status)).observe(elapsed)
+        for stage, seconds in totals.items():
+            STAGE_SECONDS.labels(stage).observe(seconds)
+    if SERVER_TIMING_ENABLED:
+        response.headers["Server-Timing"] = _server_timing_header(totals, elapsed)
+    return response
+
+
+def render_metrics():
+    """Return (body, content_type) in the Prometheus text exposition format"""
+    return generate_latest(), CONTENT_TYPE_LATEST
+
+
+def serve_metrics(port: int, address: str = "0.0.0.0"):
+    """Serve /metrics from a background thread (processes without the HTTP app, e.g. owner.py)"""
+    start_http_server(port, addr=address)
@@ -0,0 +1,66 @@
+"""
+Telegram owner process for multi-worker deployments.
+
+Owns the Telethon session, the translation engines and the shared caches, and
+serves the pipeline functions of main.py to the HTTP workers over
+TELEGRAM_OWNER_SOCKET (see ipc.py):
+
+    TELEGRAM_OWNER_SOCKET=/tmp/telegram_owner.sock python owner.py
+    TELEGRAM_OWNER_SOCKET=/tmp/telegram_owner.sock uvicorn main:app --workers 4 --port 8000
+
+Workers must share TELEGRAM_OWNER_SECRET with the owner (required for tcp://).
+
+The Telegram RPCs, flood waits, caches and translations are counted here, so
+the owner serves its own Prometheus metrics on OWNER_METRICS_PORT (default
+9101, 0 disables); the workers' /metrics only cover their HTTP side.
+"""
+import asyncio
+import logging
+import os
+import signal
+
+import ipc
+import metrics
+
+# Must happen before main is imported, so main creates the real client
+ipc.set_owner()
+
+import main  # noqa: E402
+
+OWNER_METRICS_PORT = int(os.getenv("OWNER_METRICS_PORT", "9101"))
+
+
+async def serve():
+    if not ipc.OWNER_SOCKET:
+        raise SystemExit("TELEGRAM_OWNER_SOCKET must be set (a Unix socket path or tcp://host:port)")
+
+    await main.startup_event()
+    server = await ipc.start_server(ipc.OWNER_SOCKET)
+    print(f"Telegram owner listening on {ipc.OWNER_SOCKET}")
+    if OWNER_METRICS_PORT:
+        metrics.serve_metrics(OWNER_METRICS_PORT)
+        print(f"Owner metrics on http://0.0.0.0:{OWNER_METRICS_PORT}/metrics")
+
+    stop = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        try:
+            loop.add_signal_handler(sig, stop.set)
+        except NotImplementedError:
+            # Windows: Ctrl+C raises KeyboardInterrupt instead
+            pass
+
+    try:
+        async with server:
+            await stop.wait()
+    finally:
+        server.close()
+        await main.shutdown_event()
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    try:
+        asyncio.run(serve())
+    except KeyboardInterrupt:
+        pass
@@ -0,0 +1,104 @@
+"""
+Splitting long texts into translatable segments.
+
+Segments end on paragraph or sentence boundaries and are at most `max_chars`
+long (a sentence longer than that is cut at the last space that fits). Every
+segment keeps the whitespace that followed it as its separator, so
+
+    "".join(segment + separator for segment, separator in split_segments(text)) == text
+
+and translated segments can be reassembled with the original layout.
+"""
+import re
+from typing import List, Tuple
+
+# Well below the ~5000 character limit of the online translators
+SEGMENT_CHARS = 1000
+
+# Blank line (paragraph), line break, or whitespace after sentence punctuation
+_BOUNDARY = re.compile(r"\n\s*\n|\n|(?<=[.!?…])\s+")
+
+
+def _pieces(sentence: str, separator: str, max_chars: int) -> List[Tuple[str, str]]:
+    """Cut an overlong sentence at spaces into chunks of at most max_chars"""
+    pieces = []
+    rest = sentence
+    while len(rest) > max_chars:
+        cut = rest.rfind(" ", 0, max_chars)
+        if cut <= 0:
+            cut = max_chars
+        spaces = len(rest[cut:]) - len(rest[cut:].lstrip(" "))
+        pieces.append((rest[:cut], rest[cut:cut + spaces]))
+        rest = rest[cut + spaces:]
+    pieces.append((rest, separator))
+    return pieces
+
+
+def _units(text: str) -> List[Tuple[str, str, bool]]:
+    """(sentence, separator, ends paragraph) for every boundary in `text`"""
+    units = []
+    position = 0
+    for match in _BOUNDARY.finditer(text):
+        separator = match.group()
+        units.append((text[position:match.start()], separator, "\n" in separator))
+        position = match.end()
+    units.append((text[position:], "", True))
+    return units
+
+
+def split_sentences(text: str, max_chars: int = SEGMENT_CHARS) -> List[Tuple[str, str]]:
+    """Split `text` into (sentence, separator) pairs, one per sentence or line"""
+    return [
+        piece
+        for sentence, separator, _ in _units(text)
+        for piece in _pieces(sentence, separator, max_chars)
+        if piece != ("", "")
+    ]
+
+
+def split_segments(text: str, max_chars: int = SEGMENT_CHARS) -> List[Tuple[str, str]]:
+    """
+    Split `text` into (segment, separator) pairs. Consecutive sentences are
+    packed into one segment up to `max_chars`; paragraphs always start a new
+    segment.
+    """
+    units = _units(text)
+
+    segments: List[Tuple[str, str]] = []
+    buffer, pending = "", ""
+
+    def flush():
+        nonlocal buffer, pending
+        if buffer or pending:
+            segments.append((buffer, pending))
+        buffer, pending = "", ""
+
+    for sentence, separator, paragraph_end in units:
+        for chunk, chunk_separator in _pieces(sentence, separator, max_chars):
+            if buffer and len(buffer) + len(pending) + len(chunk) > max_chars:
+                flush()
+            if buffer:
+                buffer += pending
+            elif pending:
+                # Whitespace before the first sentence stays a segment of its own
+                flush()
+            buffer += chunk
+            pending = chunk_separator
+        if paragraph_end:
+            flush()
+    return segments
+
+
+def batch_segments(segments: List[Tuple[str, str]], max_chars: int) -> List[Tuple[str, str]]:
+    """Join consecutive segments into larger (text, separator) batches of about max_chars"""
+    batches: List[Tuple[str, str]] = []
+    text, separator = None, ""
+    for segment, segment_separator in segments:
+        if text is not None and len(text) + len(separator) + len(segment) > max_chars:
+            batches.append((text, separator))
+            text, separator = None, ""
+        text = segment if text is None else text + separator + segment
+        separator = segment_separator
+    if text is not None:
+        batches.append((text, separator))
+    return batches
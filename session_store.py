@@ -0,0 +1,317 @@
+"""
+Telethon session storage kept in memory and written to disk in batches.
+
+Telethon's default SQLiteSession inserts the users and chats of every
+response (each `iter_messages` / `iter_dialogs` page) into the `.session`
+file synchronously, on the event loop. `WriteBehindSession` keeps the
+entity table in dictionaries instead and marks what changed; `flush()`
+writes all pending rows in one transaction from a worker thread, either
+periodically (`run_flusher`) or when the client disconnects.
+
+The on-disk format is Telethon's own, so the `.session` file written by
+setup_telegram.py is imported on startup and stays usable by plain
+Telethon. A copy can be written elsewhere with
+
+    python session_store.py export telegram_session backup.session
+"""
+import argparse
+import asyncio
+import datetime
+import logging
+import os
+import sqlite3
+import threading
+import time
+from typing import Dict, Optional, Tuple
+
+from telethon import utils
+from telethon.crypto import AuthKey
+from telethon.sessions import MemorySession, SQLiteSession
+from telethon.sessions.memory import _SentFileType
+from telethon.tl import types
+
+import metrics
+
+logger = logging.getLogger(__name__)
+
+EXTENSION = ".session"
+
+# (id, hash, username, phone, name, date): a row of Telethon's `entities` table
+EntityRow = Tuple[int, int, Optional[str], Optional[str], Optional[str], int]
+
+
+def session_path(session_id: str) -> str:
+    """File name Telethon uses for a session id"""
+    return session_id if session_id.endswith(EXTENSION) else session_id + EXTENSION
+
+
+class WriteBehindSession(MemorySession):
+    """
+    MemorySession with indexed entity lookups whose changes are persisted to
+    a Telethon `.session` file by `flush()` instead of on every response.
+    """
+
+    def __init__(self, session_id: Optional[str] = None):
+        super().__init__()
+        self.filename = session_path(session_id) if session_id else None
+        self.save_entities = True
+        self._by_id: Dict[int, EntityRow] = {}
+        self._by_username: Dict[str, int] = {}
+        self._by_phone: Dict[str, int] = {}
+        self._by_name: Dict[str, int] = {}
+        # Changes not yet written to disk
+        self._dirty_entities: Dict[int, EntityRow] = {}
+        self._dirty_files: Dict[tuple, tuple] = {}
+        self._dirty_states: Dict[int, types.updates.State] = {}
+        self._session_dirty = False
+        # Serializes writers: the periodic flusher thread and close()
+        self._write_lock = threading.Lock()
+        if self.filename and os.path.exists(self.filename):
+            self.load(self.filename)
+
+    # Import / export
+
+    def load(self, path: str):
+        """Import auth key, DC, entities, sent files and update state from a `.session` file"""
+        # SQLiteSession upgrades older schema versions in place
+        SQLiteSession(path).close()
+        conn = sqlite3.connect(path)
+        try:
+            row = conn.execute("select dc_id, server_address, port, auth_key, takeout_id from sessions").fetchone()
+            if row:
+                self._dc_id, self._server_address, self._port, key, self._takeout_id = row
+                self._auth_key = AuthKey(data=key) if key else None
+            for entity in conn.execute("select id, hash, username, phone, name, date from entities"):
+                self._index(tuple(entity))
+            for md5_digest, file_size, kind, file_id, file_hash in conn.execute("select * from sent_files"):
+                self._files[(md5_digest, file_size, _SentFileType(kind))] = (file_id, file_hash)
+            for entity_id, pts, qts, date, seq in conn.execute("select id, pts, qts, date, seq from update_state"):
+                date = datetime.datetime.fromtimestamp(date, tz=datetime.timezone.utc)
+                self._update_states[entity_id] = types.updates.State(pts, qts, date, seq, unread_count=0)
+        finally:
+            conn.close()
+        logger.info("Loaded %d entities from %s", len(self._by_id), path)
+
+    def export(self, path: str):
+        """Write the complete session to a new `.session` file that plain Telethon can open"""
+        path = session_path(path)
+        if os.path.exists(path):
+            os.remove(path)
+        SQLiteSession(path).close()
+        with self._write_lock:
+            self._write(
+                path,
+                session=True,
+                entities=list(self._by_id.values()),
+                files=list(self._files.items()),
+                states=list(self._update_states.items()),
+            )
+
+    # Writing
+
+    @property
+    def pending(self) -> int:
+        """Number of changed rows not yet on disk"""
+        return len(self._dirty_entities) + len(self._dirty_files) + len(self._dirty_states) + self._session_dirty
+
+    def _take_dirty(self) -> dict:
+        batch = {
+            "session": self._session_dirty,
+            "entities": list(self._dirty_entities.values()),
+            "files": list(self._dirty_files.items()),
+            "states": list(self._dirty_states.items()),
+        }
+        self._session_dirty = False
+        self._dirty_entities, self._dirty_files, self._dirty_states = {}, {}, {}
+        return batch
+
+    def _restore_dirty(self, batch: dict):
+        """Put a batch that failed to write back, without overwriting newer changes"""
+        self._session_dirty = self._session_dirty or batch["session"]
+        for row in batch["entities"]:
+            self._dirty_entities.setdefault(row[0], row)
+        for key, value in batch["files"]:
+            self._dirty_files.setdefault(key, value)
+        for entity_id, state in batch["states"]:
+            self._dirty_states.setdefault(entity_id, state)
+
+    def _write(self, path: str, session: bool, entities, files, states) -> int:
+        """Write one batch in a single transaction; returns the number of rows"""
+        conn = sqlite3.connect(path)
+        try:
+            with conn:
+                if session:
+                    conn.execute("delete from sessions")
+                    conn.execute(
+                        "insert or replace into sessions values (?,?,?,?,?)",
+                        (self._dc_id, self._server_address, self._port,
+                         self._auth_key.key if self._auth_key else b"", self._takeout_id),
+                    )
+                conn.executemany("insert or replace into entities values (?,?,?,?,?,?)", entities)
+                conn.executemany(
+                    "insert or replace into sent_files values (?,?,?,?,?)",
+                    [(md5, size, kind.value, file_id, file_hash) for (md5, size, kind), (file_id, file_hash) in files],
+                )
+                conn.executemany(
+                    "insert or replace into update_state values (?,?,?,?,?)",
+                    [(entity_id, s.pts, s.qts, s.date.timestamp(), s.seq) for entity_id, s in states],
+                )
+        finally:
+            conn.close()
+        return session + len(entities) + len(files) + len(states)
+
+    def _flush_batch(self, batch: dict):
+        start = time.perf_counter()
+        with self._write_lock:
+            if not os.path.exists(self.filename):
+                # First run without setup_telegram.py: create Telethon's schema
+                SQLiteSession(self.filename).close()
+            rows = self._write(self.filename, **batch)
+        metrics.session_flushed(rows, time.perf_counter() - start)
+
+    def flush(self):
+        """Write pending changes now, on the calling thread"""
+        if not self.filename or not self.pending:
+            return
+        batch = self._take_dirty()
+        try:
+            self._flush_batch(batch)
+        except Exception:
+            self._restore_dirty(batch)
+            raise
+
+    async def flush_async(self):
+        """Write pending changes from a worker thread, keeping the event loop free"""
+        if not self.filename or not self.pending:
+            return
+        batch = self._take_dirty()
+        try:
+            await asyncio.to_thread(self._flush_batch, batch)
+        except Exception:
+            self._restore_dirty(batch)
+            raise
+
+    async def run_flusher(self, interval: float):
+        """Flush every `interval` seconds until cancelled"""
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                await self.flush_async()
+            except Exception:
+                logger.exception("Could not write session %s", self.filename)
+
+    # Session interface
+
+    def set_dc(self, dc_id, server_address, port):
+        super().set_dc(dc_id, server_address, port)
+        self._session_dirty = True
+
+    @MemorySession.auth_key.setter
+    def auth_key(self, value):
+        self._auth_key = value
+        self._session_dirty = True
+
+    @MemorySession.takeout_id.setter
+    def takeout_id(self, value):
+        self._takeout_id = value
+        self._session_dirty = True
+
+    def set_update_state(self, entity_id, state):
+        super().set_update_state(entity_id, state)
+        self._dirty_states[entity_id] = state
+
+    def save(self):
+        # Telethon saves after login and DC switches: those are rare and must
+        # survive a crash, so they are written right away. Entities wait.
+        if self._session_dirty:
+            self.flush()
+
+    def close(self):
+        self.flush()
+
+    def delete(self):
+        if self.filename and os.path.exists(self.filename):
+            os.remove(self.filename)
+        self._dirty_entities, self._dirty_files, self._dirty_states = {}, {}, {}
+        self._session_dirty = False
+
+    def _index(self, row: EntityRow):
+        entity_id, _, username, phone, name, _ = row
+        previous = self._by_id.get(entity_id)
+        if previous is not None:
+            # Drop index entries the entity no longer matches
+            for index, key in ((self._by_username, previous[2]), (self._by_phone, previous[3]), (self._by_name, previous[4])):
+                if key is not None and index.get(key) == entity_id:
+                    del index[key]
+        self._by_id[entity_id] = row
+        # The most recently seen entity wins a username/phone/name, as in SQLiteSession
+        if username is not None:
+            self._by_username[username] = entity_id
+        if phone is not None:
+            self._by_phone[phone] = entity_id
+        if name is not None:
+            self._by_name[name] = entity_id
+
+    def process_entities(self, tlo):
+        if not self.save_entities:
+            return
+        now = int(time.time())
+        for row in self._entities_to_rows(tlo):
+            previous = self._by_id.get(row[0])
+            if previous is not None and previous[:5] == row:
+                # Unchanged entity: nothing to write
+                continue
+            row = row + (now,)
+            self._index(row)
+            self._dirty_entities[row[0]] = row
+
+    def _rows_for(self, entity_id: Optional[int]):
+        row = self._by_id.get(entity_id) if entity_id is not None else None
+        return (row[0], row[1]) if row else None
+
+    def get_entity_rows_by_phone(self, phone):
+        return self._rows_for(self._by_phone.get(phone))
+
+    def get_entity_rows_by_username(self, username):
+        return self._rows_for(self._by_username.get(username))
+
+    def get_entity_rows_by_name(self, name):
+        return self._rows_for(self._by_name.get(name))
+
+    def get_entity_rows_by_id(self, id, exact=True):
+        if exact:
+            return self._rows_for(id)
+        for marked_id in (
+            utils.get_peer_id(types.PeerUser(id)),
+            utils.get_peer_id(types.PeerChat(id)),
+            utils.get_peer_id(types.PeerChannel(id)),
+        ):
+            rows = self._rows_for(marked_id)
+            if rows:
+                return rows
+        return None
+
+    def cache_file(self, md5_digest, file_size, instance):
+        super().cache_file(md5_digest, file_size, instance)
+        key = (md5_digest, file_size, _SentFileType.from_type(type(instance)))
+        self._dirty_files[key] = self._files[key]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Copy a Telethon session through WriteBehindSession")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    export = subparsers.add_parser("export", help="Write a copy of a session file")
+    export.add_argument("source", help="Session name or .session file (e.g. telegram_session)")
+    export.add_argument("destination", help="New .session file")
+    args = parser.parse_args(argv)
+
+    if not os.path.exists(session_path(args.source)):
+        parser.error(f"{session_path(args.source)} does not exist")
+    session = WriteBehindSession()
+    session.load(session_path(args.source))
+    session.export(args.destination)
+    print(f"Exported {len(session._by_id)} entities to {session_path(args.destination)}")
+
+
+if __name__ == "__main__":
+    main()
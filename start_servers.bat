@@ -4,15 +4,21 @@ echo Starting Telegram Channel API Servers
 echo ============================================================
 echo.
 
+REM Prefer --onedir bundles (faster startup), fall back to --onefile executables
+set SERVER_EXE=dist\TelegramAPI_Server\TelegramAPI_Server.exe
+if not exist "%SERVER_EXE%" set SERVER_EXE=dist\TelegramAPI_Server.exe
+set FRONTEND_EXE=dist\TelegramAPI_Frontend\TelegramAPI_Frontend.exe
+if not exist "%FRONTEND_EXE%" set FRONTEND_EXE=dist\TelegramAPI_Frontend.exe
+
 REM Check if executables exist
-if not exist "dist\TelegramAPI_Server.exe" (
+if not exist "%SERVER_EXE%" (
     echo ERROR: TelegramAPI_Server.exe not found in dist folder
     echo Please build the executables first by running build.bat
     pause
     exit /b 1
 )
 
-if not exist "dist\TelegramAPI_Frontend.exe" (
+if not exist "%FRONTEND_EXE%" (
     echo ERROR: TelegramAPI_Frontend.exe not found in dist folder
     echo Please build the executables first by running build.bat
     pause
@@ -29,12 +35,12 @@ if not exist ".env" (
 )
 
 echo Starting API Server on port 8000...
-start "Telegram API Server" dist\TelegramAPI_Server.exe
+start "Telegram API Server" "%SERVER_EXE%"
 
 timeout /t 3 /nobreak >nul
 
 echo Starting Frontend Server on port 8001...
-start "Telegram Frontend Server" dist\TelegramAPI_Frontend.exe
+start "Telegram Frontend Server" "%FRONTEND_EXE%"
 
 timeout /t 2 /nobreak >nul
 
@@ -0,0 +1,993 @@
+// Injected by frontend.py; empty when the UI is served by the API itself (same origin)
+const API_BASE_URL = window.API_BASE_URL ?? 'http://127.0.0.1:8000';
+const languages = [
+    { id: 'ru', name: 'Russian → English', source: 'ru', target: 'en' },
+    { id: 'uk', name: 'Ukrainian → English', source: 'uk', target: 'en' }
+];
+let channels = [];
+let currentChannelId = null;
+let currentMode = 'viewer';
+let selectedLanguage = languages[0].id;
+let autoRefreshInterval = null;
+let autoRefreshEnabled = true;
+// Live updates: one EventSource for the selected channel while the tab is
+// visible. Interval polling (answered with 304 when nothing changed) is only
+// used when the stream can't be opened, and live is retried periodically.
+const LIVE_RETRY_MS = 60000;
+let liveSource = null;
+let liveFailedAt = window.EventSource ? null : Infinity;
+let translatorMode = 'online'; // online | offline
+let translateAbort = null;     // AbortController of the streaming translation
+
+// Messages of the selected channel, kept across refreshes so only new or
+// changed bubbles are touched. Only bubbles near the viewport are rendered.
+const PAGE_SIZE = 50;
+const MAX_GAP_PAGES = 10;
+const ESTIMATED_BUBBLE_HEIGHT = 90;
+const BUBBLE_GAP = 12;
+const OVERSCAN_PX = 800;
+const LOAD_OLDER_THRESHOLD_PX = 400;
+let messageStore = new Map();      // id -> message
+let messageIds = [];               // ascending ids
+let messageSignatures = new Map(); // id -> signature of rendered content
+let bubbleHeights = new Map();     // id -> measured bubble height
+let renderedBubbles = new Map();   // id -> bubble element in the DOM
+let renderedRange = [0, 0];
+let freshIds = new Set();          // ids to animate when first rendered
+let hasOlderMessages = true;
+let loadingOlder = false;
+let renderScheduled = false;
+let messagesGeneration = 0;        // bumped on channel switch to drop stale responses
+let visibleRange = [0, 0];         // indexes of the bubbles inside the viewport
+
+// Translate-on-view: pages are fetched untranslated and shown immediately.
+// Translations are requested in batches, visible messages first and then
+// TRANSLATE_PREFETCH neighbours on each side, and patched in as they arrive.
+const TRANSLATE_BATCH_SIZE = 20;
+const TRANSLATE_MAX_IN_FLIGHT = 2;
+const TRANSLATE_PREFETCH = 15;
+const TRANSLATE_RETRY_MS = 5000;
+// Any text with letters is sent; the API detects the language and returns
+// text that isn't in one of its auto-translate languages unchanged
+const HAS_LETTERS = /\p{L}/u;
+let translationsInFlight = 0;
+let pendingTranslations = new Set(); // ids in an unanswered batch
+let translationRetryAt = 0;
+
+// Per-channel message cache in IndexedDB: channel switches render from it
+// immediately and then only ask the API for messages newer than the cache
+const CACHE_DB_NAME = 'telegram-viewer';
+const CACHE_DB_VERSION = 2;        // 2: original text plus `translation`
+const CACHE_RENDER_LIMIT = 200;    // cached messages rendered on channel switch
+const CACHE_MAX_PER_CHANNEL = 2000;
+let cacheDbPromise = null;
+
+// Format date to Telegram-like format
+function formatDate(dateString) {
+    const date = new Date(dateString);
+    const now = new Date();
+    const diff = now - date;
+    const minutes = Math.floor(diff / 60000);
+    const hours = Math.floor(diff / 3600000);
+    const days = Math.floor(diff / 86400000);
+
+    if (minutes < 1) return 'just now';
+    if (minutes < 60) return `${minutes}m ago`;
+    if (hours < 24) return `${hours}h ago`;
+    if (days < 7) return `${days}d ago`;
+
+    return date.toLocaleDateString('en-US', { 
+        month: 'short', 
+        day: 'numeric',
+        year: date.getFullYear() !== now.getFullYear() ? 'numeric' : undefined
+    });
+}
+
+// Load channels
+async function loadChannels() {
+    if (currentMode !== 'viewer') {
+        return;
+    }
+    try {
+        const response = await fetch(`${API_BASE_URL}/channels`);
+        if (!response.ok) throw new Error('Failed to fetch channels');
+
+        channels = await response.json();
+
+        // Update dropdown
+        const select = document.getElementById('channelSelect');
+        select.innerHTML = '<option value="">Select a channel...</option>';
+        channels.forEach(channel => {
+            const option = document.createElement('option');
+            option.value = channel.id;
+            option.textContent = channel.title + (channel.username ? ` (@${channel.username})` : '');
+            select.appendChild(option);
+        });
+
+        // Update sidebar
+        const sidebar = document.getElementById('sidebar');
+        sidebar.innerHTML = '';
+        channels.forEach(channel => {
+            const item = document.createElement('div');
+            item.className = 'channel-item';
+            item.onclick = () => selectChannel(channel.id);
+            item.innerHTML = `
+                <h3>${channel.title}</h3>
+                <p>${channel.username ? '@' + channel.username : 'ID: ' + channel.id}</p>
+            `;
+            sidebar.appendChild(item);
+        });
+
+        if (channels.length === 0) {
+            sidebar.innerHTML = '<div class="empty-state"><p>No channels found</p></div>';
+        }
+    } catch (error) {
+        console.error('Error loading channels:', error);
+        document.getElementById('sidebar').innerHTML = 
+            `<div class="error">Error loading channels: ${error.message}</div>`;
+    }
+}
+
+// Render language options in sidebar for translator mode
+function renderLanguagesSidebar() {
+    const sidebar = document.getElementById('sidebar');
+    sidebar.innerHTML = '';
+
+    languages.forEach(lang => {
+        const item = document.createElement('div');
+        item.className = 'channel-item' + (lang.id === selectedLanguage ? ' active' : '');
+        item.onclick = () => {
+            selectedLanguage = lang.id;
+            renderLanguagesSidebar();
+        };
+        item.innerHTML = `
+            <h3>${lang.name}</h3>
+            <p>Source: ${lang.source.toUpperCase()} → Target: ${lang.target.toUpperCase()}</p>
+        `;
+        sidebar.appendChild(item);
+    });
+
+    if (languages.length === 0) {
+        sidebar.innerHTML = '<div class="empty-state"><p>No languages configured</p></div>';
+    }
+}
+
+// Select channel
+function selectChannel(channelId) {
+    if (channelId !== currentChannelId) {
+        resetMessages();
+    }
+    currentChannelId = channelId;
+
+    // Update dropdown
+    document.getElementById('channelSelect').value = channelId;
+
+    // Update sidebar active state
+    document.querySelectorAll('.channel-item').forEach(item => {
+        item.classList.remove('active');
+    });
+    event?.target?.closest('.channel-item')?.classList.add('active');
+
+    // Render cached messages first, then fetch only what is newer
+    if (messageIds.length === 0) {
+        showCachedMessages(channelId).then(() => loadMessages(channelId, true));
+    } else {
+        loadMessages(channelId);
+    }
+    startAutoRefresh();
+}
+
+function openMessageCache() {
+    if (!cacheDbPromise) {
+        cacheDbPromise = new Promise((resolve) => {
+            if (!window.indexedDB) {
+                resolve(null);
+                return;
+            }
+            const request = indexedDB.open(CACHE_DB_NAME, CACHE_DB_VERSION);
+            request.onupgradeneeded = (e) => {
+                const db = request.result;
+                if (e.oldVersion < 1) {
+                    db.createObjectStore('messages', { keyPath: ['channel_id', 'id'] });
+                } else {
+                    // Version 1 stored already-translated text
+                    request.transaction.objectStore('messages').clear();
+                }
+            };
+            request.onsuccess = () => resolve(request.result);
+            // Private browsing or blocked storage: run without the cache
+            request.onerror = () => resolve(null);
+            request.onblocked = () => resolve(null);
+        });
+    }
+    return cacheDbPromise;
+}
+
+function channelKeyRange(channelId) {
+    return IDBKeyRange.bound([channelId, -Infinity], [channelId, Infinity]);
+}
+
+// Newest `limit` cached messages of a channel, newest first
+async function readCachedMessages(channelId, limit) {
+    const db = await openMessageCache();
+    if (!db) return [];
+    return new Promise((resolve) => {
+        const messages = [];
+        const request = db.transaction('messages', 'readonly')
+            .objectStore('messages')
+            .openCursor(channelKeyRange(channelId), 'prev');
+        request.onsuccess = () => {
+            const cursor = request.result;
+            if (!cursor || messages.length >= limit) {
+                resolve(messages);
+                return;
+            }
+            messages.push(cursor.value.message);
+            cursor.continue();
+        };
+        request.onerror = () => resolve(messages);
+    });
+}
+
+async function writeCachedMessages(channelId, messages) {
+    const db = await openMessageCache();
+    if (!db || messages.length === 0) return;
+    const store = db.transaction('messages', 'readwrite').objectStore('messages');
+    messages.forEach(message => store.put({ channel_id: channelId, id: message.id, message }));
+    pruneCachedMessages(channelId);
+}
+
+// Keep only the newest CACHE_MAX_PER_CHANNEL messages of a channel
+async function pruneCachedMessages(channelId) {
+    const db = await openMessageCache();
+    if (!db) return;
+    const store = db.transaction('messages', 'readwrite').objectStore('messages');
+    let seen = 0;
+    const request = store.openCursor(channelKeyRange(channelId), 'prev');
+    request.onsuccess = () => {
+        const cursor = request.result;
+        if (!cursor) return;
+        if (++seen > CACHE_MAX_PER_CHANNEL) cursor.delete();
+        cursor.continue();
+    };
+}
+
+async function deleteCachedMessages(channelId, ids) {
+    const db = await openMessageCache();
+    if (!db) return;
+    const store = db.transaction('messages', 'readwrite').objectStore('messages');
+    ids.forEach(id => store.delete([channelId, id]));
+}
+
+async function clearCachedMessages(channelId) {
+    const db = await openMessageCache();
+    if (!db) return;
+    db.transaction('messages', 'readwrite').objectStore('messages').delete(channelKeyRange(channelId));
+}
+
+async function showCachedMessages(channelId) {
+    const generation = messagesGeneration;
+    const cached = await readCachedMessages(channelId, CACHE_RENDER_LIMIT);
+    if (generation !== messagesGeneration || cached.length === 0) return;
+    mergeMessages(cached, { animate: false, persist: false });
+    renderMessages(true);
+}
+
+function resetMessages() {
+    messagesGeneration++;
+    messageStore = new Map();
+    messageIds = [];
+    messageSignatures = new Map();
+    bubbleHeights = new Map();
+    renderedBubbles = new Map();
+    renderedRange = [0, 0];
+    freshIds = new Set();
+    hasOlderMessages = true;
+    loadingOlder = false;
+    visibleRange = [0, 0];
+    pendingTranslations = new Set();
+    document.getElementById('messagesWindow').replaceChildren();
+    document.getElementById('topSpacer').style.height = '0px';
+    document.getElementById('bottomSpacer').style.height = '0px';
+    document.getElementById('olderStatus').textContent = '';
+    document.getElementById('messagesList').scrollTop = 0;
+}
+
+function setMessagesStatus(html) {
+    document.getElementById('viewerEmptyState').style.display = 'none';
+    document.getElementById('messagesStatus').innerHTML = html;
+}
+
+async function fetchMessagePage(channelId, params) {
+    // Untranslated: translations are fetched separately for what is on screen
+    const query = new URLSearchParams({ limit: PAGE_SIZE, translate: 'false', ...params });
+    const response = await fetch(`${API_BASE_URL}/channels/${channelId}/messages?${query}`);
+    if (!response.ok) {
+        throw new Error(`Failed to fetch messages: ${response.statusText}`);
+    }
+    return response.json();
+}
+
+function messageSignature(message) {
+    return JSON.stringify([message.text, message.version, message.sender_username, message.views, message.forwards, message.reactions]);
+}
+
+// Merge messages into the store; returns how many were new. Fetched
+// messages are written to the IndexedDB cache (persist).
+function mergeMessages(messages, { animate = false, persist = true } = {}) {
+    let added = 0;
+    const updated = [];
+    messages.forEach(message => {
+        const signature = messageSignature(message);
+        const previous = messageStore.get(message.id);
+        const known = previous !== undefined;
+        if (known && messageSignatures.get(message.id) === signature) {
+            return;
+        }
+        // Views or reactions changed but the text didn't: keep its translation
+        if (known && previous.text === message.text && message.translation === undefined) {
+            message.translation = previous.translation;
+        }
+        messageStore.set(message.id, message);
+        messageSignatures.set(message.id, signature);
+        updated.push(message);
+        if (!known) {
+            added++;
+            if (animate) freshIds.add(message.id);
+            return;
+        }
+        // Changed (views, reactions, edited text): patch the bubble in place
+        bubbleHeights.delete(message.id);
+        const bubble = renderedBubbles.get(message.id);
+        if (bubble) fillBubble(bubble, message);
+    });
+    if (added) {
+        messageIds = Array.from(messageStore.keys()).sort((a, b) => a - b);
+    }
+    if (persist && currentChannelId) {
+        writeCachedMessages(currentChannelId, updated);
+    }
+    return added;
+}
+
+// Drop deleted messages from the store and the IndexedDB cache; returns how many were known
+function removeMessages(ids) {
+    const removed = ids.filter(id => messageStore.delete(id));
+    removed.forEach(id => {
+        messageSignatures.delete(id);
+        bubbleHeights.delete(id);
+    });
+    if (removed.length) {
+        messageIds = messageIds.filter(id => messageStore.has(id));
+    }
+    if (currentChannelId) {
+        deleteCachedMessages(currentChannelId, ids);
+    }
+    return removed.length;
+}
+
+function fillBubble(bubble, message) {
+    const header = document.createElement('div');
+    header.className = 'message-header';
+
+    const sender = document.createElement('span');
+    sender.className = 'message-sender';
+    sender.textContent = message.sender_username || `User ${message.sender_id || 'Unknown'}`;
+
+    const time = document.createElement('span');
+    time.className = 'message-time';
+    time.textContent = formatDate(message.date);
+
+    header.appendChild(sender);
+    header.appendChild(time);
+
+    const text = document.createElement('div');
+    text.className = 'message-text';
+    text.textContent = message.translation || message.text || '[Empty message]';
+    if (message.translation && message.translation !== message.text) {
+        text.title = message.text; // original on hover
+    } else if (needsTranslation(message)) {
+        text.classList.add('translating');
+    }
+
+    const children = [header, text];
+
+    // Add reactions if available
+    if (message.reactions && message.reactions.length > 0) {
+        const reactionsContainer = document.createElement('div');
+        reactionsContainer.className = 'message-reactions';
+
+        message.reactions.forEach(reaction => {
+            const reactionBtn = document.createElement('div');
+            reactionBtn.className = 'reaction-button';
+            const emoji = document.createElement('span');
+            emoji.className = 'reaction-emoji';
+            emoji.textContent = reaction.emoji;
+            const count = document.createElement('span');
+            count.className = 'reaction-count';
+            count.textContent = reaction.count;
+            reactionBtn.append(emoji, count);
+            reactionsContainer.appendChild(reactionBtn);
+        });
+
+        children.push(reactionsContainer);
+    }
+
+    // Add stats if available
+    if (message.views !== null || message.forwards !== null) {
+        const stats = document.createElement('div');
+        stats.className = 'message-stats';
+        if (message.views !== null) {
+            stats.textContent += `👁️ ${message.views}`;
+        }
+        if (message.forwards !== null) {
+            stats.textContent += `📤 ${message.forwards}`;
+        }
+        children.push(stats);
+    }
+
+    bubble.replaceChildren(...children);
+}
+
+function createBubble(message) {
+    const bubble = document.createElement('div');
+    bubble.className = 'message-bubble received';
+    bubble.dataset.id = message.id;
+    if (freshIds.delete(message.id)) {
+        bubble.classList.add('new');
+    }
+    fillBubble(bubble, message);
+    return bubble;
+}
+
+function bubbleSlot(id) {
+    return (bubbleHeights.get(id) ?? ESTIMATED_BUBBLE_HEIGHT) + BUBBLE_GAP;
+}
+
+// offsets[i] = distance from the top spacer to bubble i
+function bubbleOffsets() {
+    const offsets = new Array(messageIds.length + 1);
+    offsets[0] = 0;
+    for (let i = 0; i < messageIds.length; i++) {
+        offsets[i + 1] = offsets[i] + bubbleSlot(messageIds[i]);
+    }
+    return offsets;
+}
+
+// First index whose bubble ends below y
+function indexAt(offsets, y) {
+    let lo = 0, hi = messageIds.length;
+    while (lo < hi) {
+        const mid = (lo + hi) >> 1;
+        if (offsets[mid + 1] <= y) lo = mid + 1; else hi = mid;
+    }
+    return lo;
+}
+
+function isScrolledToBottom(list) {
+    return list.scrollHeight - list.scrollTop - list.clientHeight < 40;
+}
+
+function scheduleRender() {
+    if (renderScheduled) return;
+    renderScheduled = true;
+    requestAnimationFrame(() => {
+        renderScheduled = false;
+        renderMessages();
+    });
+}
+
+// Render the bubbles around the viewport, keeping the bubble at the top
+// of the viewport in place (or staying pinned to the bottom)
+function renderMessages(stickToBottom) {
+    const list = document.getElementById('messagesList');
+    const windowEl = document.getElementById('messagesWindow');
+    const topSpacer = document.getElementById('topSpacer');
+    const bottomSpacer = document.getElementById('bottomSpacer');
+    if (stickToBottom === undefined) {
+        stickToBottom = isScrolledToBottom(list);
+    }
+
+    if (messageIds.length === 0) {
+        windowEl.replaceChildren();
+        renderedBubbles = new Map();
+        setMessagesStatus('<div class="empty-state"><h2>No messages found</h2><p>This channel has no messages yet</p></div>');
+        return;
+    }
+    setMessagesStatus('');
+
+    // Remember where the first visible bubble is on screen
+    let anchorId = null;
+    let anchorScreenOffset = 0;
+    if (!stickToBottom) {
+        for (let i = renderedRange[0]; i < renderedRange[1]; i++) {
+            const bubble = renderedBubbles.get(messageIds[i]);
+            if (bubble && bubble.offsetTop + bubble.offsetHeight > list.scrollTop) {
+                anchorId = messageIds[i];
+                anchorScreenOffset = bubble.offsetTop - list.scrollTop;
+                break;
+            }
+        }
+    }
+
+    const base = topSpacer.offsetTop;
+    const offsets = bubbleOffsets();
+    const total = offsets[messageIds.length];
+    let viewTop;
+    if (stickToBottom) {
+        viewTop = total - list.clientHeight;
+    } else if (anchorId !== null) {
+        viewTop = offsets[messageIds.indexOf(anchorId)] - anchorScreenOffset;
+    } else {
+        viewTop = list.scrollTop - base;
+    }
+
+    const start = indexAt(offsets, Math.max(0, viewTop - OVERSCAN_PX));
+    const end = Math.min(messageIds.length, indexAt(offsets, viewTop + list.clientHeight + OVERSCAN_PX) + 1);
+
+    const bubbles = [];
+    const nextRendered = new Map();
+    for (let i = start; i < end; i++) {
+        const id = messageIds[i];
+        const bubble = renderedBubbles.get(id) || createBubble(messageStore.get(id));
+        nextRendered.set(id, bubble);
+        bubbles.push(bubble);
+    }
+    windowEl.replaceChildren(...bubbles);
+    renderedBubbles = nextRendered;
+    renderedRange = [start, end];
+    topSpacer.style.height = `${offsets[start]}px`;
+    bottomSpacer.style.height = `${total - offsets[end]}px`;
+    visibleRange = [
+        indexAt(offsets, Math.max(0, viewTop)),
+        Math.min(messageIds.length, indexAt(offsets, viewTop + list.clientHeight) + 1),
+    ];
+
+    // Measure what was rendered so later estimates are exact
+    renderedBubbles.forEach((bubble, id) => bubbleHeights.set(id, bubble.offsetHeight));
+
+    if (stickToBottom) {
+        list.scrollTop = list.scrollHeight;
+    } else if (anchorId !== null && renderedBubbles.has(anchorId)) {
+        list.scrollTop = renderedBubbles.get(anchorId).offsetTop - anchorScreenOffset;
+    }
+    scheduleTranslations();
+}
+
+function needsTranslation(message) {
+    return message.translation === undefined && HAS_LETTERS.test(message.text || '');
+}
+
+// Visible messages newest first, then neighbours by distance from the viewport
+function nextTranslationBatch() {
+    const [first, last] = visibleRange;
+    const order = [];
+    for (let i = last - 1; i >= first; i--) order.push(i);
+    for (let d = 0; d < TRANSLATE_PREFETCH; d++) {
+        order.push(last + d, first - 1 - d);
+    }
+    const batch = [];
+    for (const i of order) {
+        if (i < 0 || i >= messageIds.length) continue;
+        const message = messageStore.get(messageIds[i]);
+        if (needsTranslation(message) && !pendingTranslations.has(message.id)) {
+            batch.push(message);
+            if (batch.length === TRANSLATE_BATCH_SIZE) break;
+        }
+    }
+    return batch;
+}
+
+function scheduleTranslations() {
+    if (!currentChannelId || Date.now() < translationRetryAt) return;
+    while (translationsInFlight < TRANSLATE_MAX_IN_FLIGHT) {
+        const batch = nextTranslationBatch();
+        if (batch.length === 0) return;
+        translateBatch(batch);
+    }
+}
+
+async function translateBatch(messages) {
+    const generation = messagesGeneration;
+    const channelId = currentChannelId;
+    messages.forEach(message => pendingTranslations.add(message.id));
+    translationsInFlight++;
+    try {
+        const response = await fetch(`${API_BASE_URL}/translate/batch`, {
+            method: 'POST',
+            headers: { 'Content-Type': 'application/json' },
+            body: JSON.stringify({ texts: messages.map(message => message.text) })
+        });
+        if (!response.ok) {
+            throw new Error(`Failed to translate messages: ${response.statusText}`);
+        }
+        const { translations } = await response.json();
+        if (generation !== messagesGeneration) return;
+        const patched = [];
+        messages.forEach((message, i) => {
+            // Skip messages replaced by a newer version in the meantime
+            if (messageStore.get(message.id) !== message) return;
+            message.translation = translations[i];
+            patched.push(message);
+            const bubble = renderedBubbles.get(message.id);
+            if (bubble) {
+                fillBubble(bubble, message);
+                bubbleHeights.delete(message.id);
+            }
+        });
+        writeCachedMessages(channelId, patched);
+        scheduleRender();
+    } catch (error) {
+        console.error('Error translating messages:', error);
+        translationRetryAt = Date.now() + TRANSLATE_RETRY_MS;
+        setTimeout(scheduleTranslations, TRANSLATE_RETRY_MS);
+    } finally {
+        translationsInFlight--;
+        if (generation === messagesGeneration) {
+            messages.forEach(message => pendingTranslations.delete(message.id));
+        }
+        scheduleTranslations();
+    }
+}
+
+// Load the latest page for a channel and merge it into what is shown.
+// deltaOnly: just fetch messages newer than what is already loaded
+// (after rendering from the cache) instead of the whole latest page.
+async function loadMessages(channelId, deltaOnly = false) {
+    const generation = messagesGeneration;
+    const initial = messageIds.length === 0;
+    if (initial) {
+        setMessagesStatus('<div class="loading">Loading messages...</div>');
+    }
+
+    try {
+        const newestKnown = initial ? null : messageIds[messageIds.length - 1];
+        const params = deltaOnly && newestKnown !== null ? { min_id: newestKnown } : {};
+        let messages = await fetchMessagePage(channelId, params);
+        if (generation !== messagesGeneration) return;
+
+        // More than a page arrived since the last refresh: fill the gap
+        let pages = 0;
+        let gapClosed = true;
+        while (newestKnown !== null && messages.length > 0) {
+            const oldestFetched = messages[messages.length - 1].id;
+            if (oldestFetched <= newestKnown + 1) break;
+            if (pages >= MAX_GAP_PAGES) {
+                gapClosed = false;
+                break;
+            }
+            const gap = await fetchMessagePage(channelId, { offset_id: oldestFetched, min_id: newestKnown });
+            if (generation !== messagesGeneration) return;
+            if (gap.length === 0) break;
+            messages = messages.concat(gap);
+            pages++;
+        }
+
+        if (!gapClosed) {
+            // Too far behind: drop the stale history rather than show a hole
+            await clearCachedMessages(channelId);
+            resetMessages();
+            loadMessages(channelId);
+            return;
+        }
+
+        mergeMessages(messages, { animate: !initial });
+        // Relative times ("5m ago") age even when nothing else changed
+        renderedBubbles.forEach((bubble, id) => {
+            bubble.querySelector('.message-time').textContent = formatDate(messageStore.get(id).date);
+        });
+        if (initial && messages.length < PAGE_SIZE) {
+            hasOlderMessages = false;
+        }
+        renderMessages(initial ? true : undefined);
+    } catch (error) {
+        console.error('Error loading messages:', error);
+        if (initial) {
+            setMessagesStatus(`<div class="error">Error loading messages: ${error.message}</div>`);
+        }
+    }
+}
+
+// Infinite scroll backwards: fetch the page before the oldest loaded message
+async function loadOlderMessages() {
+    if (loadingOlder || !hasOlderMessages || !currentChannelId || messageIds.length === 0) {
+        return;
+    }
+    const generation = messagesGeneration;
+    const olderStatus = document.getElementById('olderStatus');
+    loadingOlder = true;
+    olderStatus.textContent = 'Loading older messages...';
+    try {
+        const messages = await fetchMessagePage(currentChannelId, { offset_id: messageIds[0] });
+        if (generation !== messagesGeneration) return;
+        if (messages.length < PAGE_SIZE) {
+            hasOlderMessages = false;
+        }
+        mergeMessages(messages);
+        renderMessages(false);
+        olderStatus.textContent = hasOlderMessages ? '' : 'Beginning of channel';
+    } catch (error) {
+        console.error('Error loading older messages:', error);
+        olderStatus.textContent = `Error loading older messages: ${error.message}`;
+    } finally {
+        if (generation === messagesGeneration) loadingOlder = false;
+    }
+}
+
+// Refresh messages
+function refreshMessages() {
+    if (currentChannelId) {
+        loadMessages(currentChannelId);
+    } else {
+        loadChannels();
+    }
+}
+
+// Toggle modes between viewer and translator
+function setMode(mode) {
+    currentMode = mode;
+    const channelSelect = document.getElementById('channelSelect');
+    const refreshControls = document.querySelector('.refresh-controls');
+    const messagesList = document.getElementById('messagesList');
+    const translatorContainer = document.getElementById('translatorContainer');
+    const viewerEmptyState = document.getElementById('viewerEmptyState');
+
+    if (mode === 'viewer') {
+        channelSelect.style.display = 'block';
+        refreshControls.style.display = 'flex';
+        messagesList.style.display = 'flex';
+        translatorContainer.style.display = 'none';
+        viewerEmptyState.style.display = currentChannelId ? 'none' : 'block';
+        startAutoRefresh();
+        loadChannels();
+    } else {
+        // Translator mode
+        stopAutoRefresh();
+        channelSelect.style.display = 'none';
+        refreshControls.style.display = 'none';
+        messagesList.style.display = 'none';
+        viewerEmptyState.style.display = 'none';
+        translatorContainer.style.display = 'flex';
+        renderLanguagesSidebar();
+        const modeSelect = document.getElementById('translatorModeSelect');
+        if (modeSelect) {
+            modeSelect.value = translatorMode;
+        }
+        handleTranslateInput();
+    }
+}
+
+// Translate text using API. The result is streamed segment by segment
+// (NDJSON from /translate/stream) and shown as it arrives.
+async function translateText() {
+    const input = document.getElementById('translateInput');
+    const output = document.getElementById('translateOutput');
+    const status = document.getElementById('translateStatus');
+    const errorEl = document.getElementById('translateError');
+    const lang = languages.find(l => l.id === selectedLanguage) || languages[0];
+
+    const text = input.value.trim();
+    if (!text) {
+        status.textContent = 'Enter text to translate.';
+        return;
+    }
+
+    // A new translation replaces one still streaming
+    if (translateAbort) translateAbort.abort();
+    const abort = new AbortController();
+    translateAbort = abort;
+
+    status.textContent = 'Translating...';
+    errorEl.textContent = '';
+    output.value = '';
+
+    try {
+        const response = await fetch(`${API_BASE_URL}/translate/stream`, {
+            method: 'POST',
+            headers: { 'Content-Type': 'application/json' },
+            body: JSON.stringify({
+                text,
+                source_lang: lang.source,
+                target_lang: lang.target,
+                mode: translatorMode
+            }),
+            signal: abort.signal
+        });
+
+        if (!response.ok) {
+            const body = await response.json().catch(() => ({}));
+            throw new Error(body.detail || `Failed: ${response.statusText}`);
+        }
+
+        const reader = response.body.getReader();
+        const decoder = new TextDecoder();
+        let buffered = '';
+        let total = 0;
+        let received = 0;
+        let failed = 0;
+        let done = false;
+        while (!done) {
+            const chunk = await reader.read();
+            if (chunk.done) break;
+            buffered += decoder.decode(chunk.value, { stream: true });
+            const lines = buffered.split('\n');
+            buffered = lines.pop();
+            lines.filter(line => line.trim()).forEach(line => {
+                const item = JSON.parse(line);
+                if (item.segments !== undefined) {
+                    total = item.segments;
+                } else if (item.done) {
+                    done = true;
+                } else {
+                    // Segments arrive in order; append keeps the original layout
+                    output.value += item.translated_text + item.separator;
+                    received++;
+                    if (item.error) failed++;
+                }
+            });
+            if (!done) status.textContent = `Translating... ${received} / ${total} segments`;
+        }
+
+        if (!done) {
+            throw new Error('Translation stream ended early');
+        }
+        status.textContent = `Translated ${lang.source.toUpperCase()} → ${lang.target.toUpperCase()}`;
+        if (failed) {
+            errorEl.textContent = `${failed} segment(s) could not be translated and were left as is.`;
+        }
+    } catch (error) {
+        if (error.name === 'AbortError') return;
+        console.error('Translation error:', error);
+        status.textContent = `Error: ${error.message}`;
+    } finally {
+        if (translateAbort === abort) translateAbort = null;
+    }
+}
+
+function handleTranslateInput() {
+    const input = document.getElementById('translateInput');
+    const charCount = document.getElementById('translateCharCount');
+    charCount.textContent = `${input.value.length} characters`;
+}
+
+// Toggle auto-refresh
+function toggleAutoRefresh() {
+    autoRefreshEnabled = !autoRefreshEnabled;
+    const btn = document.getElementById('autoRefreshBtn');
+
+    if (autoRefreshEnabled) {
+        startAutoRefresh();
+        btn.textContent = '⏸️ Pause Live Updates';
+        btn.classList.remove('stop');
+    } else {
+        stopAutoRefresh();
+        btn.textContent = '▶️ Resume Live Updates';
+        btn.classList.add('stop');
+    }
+}
+
+// Start live updates for the selected channel (or polling as a fallback)
+function startAutoRefresh() {
+    stopAutoRefresh(); // Close any existing stream / interval
+    if (!autoRefreshEnabled || currentMode !== 'viewer' || !currentChannelId || document.hidden) {
+        return;
+    }
+    if (liveFailedAt === null || Date.now() - liveFailedAt > LIVE_RETRY_MS) {
+        openLiveStream(currentChannelId);
+        return;
+    }
+
+    const intervalInput = document.getElementById('refreshInterval');
+    const intervalSeconds = parseInt(intervalInput.value) || 30;
+    const intervalMs = intervalSeconds * 1000;
+
+    autoRefreshInterval = setInterval(() => {
+        if (Date.now() - liveFailedAt > LIVE_RETRY_MS) {
+            startAutoRefresh();
+        } else if (currentChannelId && autoRefreshEnabled) {
+            loadMessages(currentChannelId, true);
+        }
+    }, intervalMs);
+}
+
+function openLiveStream(channelId) {
+    const source = new EventSource(`${API_BASE_URL}/channels/${channelId}/stream?translate=false`);
+    source.onopen = () => {
+        liveFailedAt = null;
+        // Catch up on anything posted while the stream was (re)connecting
+        if (channelId === currentChannelId && messageIds.length > 0) {
+            loadMessages(channelId, true);
+        }
+    };
+    source.onmessage = (e) => {
+        if (channelId !== currentChannelId) return;
+        if (mergeMessages([JSON.parse(e.data)], { animate: true })) {
+            renderMessages();
+        }
+    };
+    source.addEventListener('delete', (e) => {
+        if (channelId !== currentChannelId) return;
+        if (removeMessages(JSON.parse(e.data).deleted_ids)) {
+            renderMessages();
+        }
+    });
+    source.onerror = () => {
+        // EventSource retries by itself unless the server refused the stream
+        if (source.readyState === EventSource.CLOSED && source === liveSource) {
+            liveFailedAt = Date.now();
+            startAutoRefresh();
+        }
+    };
+    liveSource = source;
+}
+
+// Stop live updates / polling
+function stopAutoRefresh() {
+    if (autoRefreshInterval) {
+        clearInterval(autoRefreshInterval);
+        autoRefreshInterval = null;
+    }
+    if (liveSource) {
+        liveSource.close();
+        liveSource = null;
+    }
+}
+
+// Update refresh interval when input changes
+function updateRefreshInterval() {
+    if (autoRefreshEnabled) {
+        startAutoRefresh();
+    }
+}
+
+// Virtualized list: re-render the window on scroll, load older pages near the top
+document.getElementById('messagesList').addEventListener('scroll', (e) => {
+    if (currentMode !== 'viewer' || messageIds.length === 0) return;
+    scheduleRender();
+    if (e.target.scrollTop < LOAD_OLDER_THRESHOLD_PX) {
+        loadOlderMessages();
+    }
+});
+
+// Channel select change handler
+document.getElementById('channelSelect').addEventListener('change', (e) => {
+    if (e.target.value) {
+        selectChannel(parseInt(e.target.value));
+    }
+});
+
+// Mode select handler
+document.getElementById('modeSelect').addEventListener('change', (e) => {
+    const mode = e.target.value === 'translator' ? 'translator' : 'viewer';
+    setMode(mode);
+});
+
+// Translator mode selector
+document.getElementById('translatorModeSelect').addEventListener('change', (e) => {
+    translatorMode = e.target.value === 'offline' ? 'offline' : 'online';
+    handleTranslateInput();
+});
+
+// Refresh interval input change handler
+document.getElementById('refreshInterval').addEventListener('change', updateRefreshInterval);
+document.getElementById('refreshInterval').addEventListener('input', updateRefreshInterval);
+
+// Hidden tabs hold no stream and don't poll; catch up when shown again
+document.addEventListener('visibilitychange', () => {
+    if (document.hidden) {
+        stopAutoRefresh();
+        return;
+    }
+    startAutoRefresh();
+    if (!liveSource && autoRefreshEnabled && currentMode === 'viewer' && currentChannelId) {
+        loadMessages(currentChannelId, true);
+    }
+});
+
+// Initialize on load
+window.addEventListener('load', () => {
+    setMode('viewer');
+    // Start auto-refresh with default interval in viewer mode
+    startAutoRefresh();
+    handleTranslateInput();
+});
@@ -0,0 +1,104 @@
+"""
+Shared fixtures. The API tests drive main.py in-process (httpx ASGI
+transport) against FakeTelegramClient, with the google engine pointed at
+fake_translate_server running on a local port, so they need no network or
+credentials.
+"""
+import asyncio
+import os
+import socket
+import sys
+import threading
+import time
+
+import httpx
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+# Synthetic channel ids start here (see FakeTelegramClient)
+FAKE_CHANNEL_ID = 1_000_000_000
+FAKE_CHANNEL_USERNAME = "synthetic_0"
+ADMIN_TOKEN = "test-admin-token"
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+@pytest.fixture(scope="session")
+def translate_server():
+    """Base URL of fake_translate_server, answering without delay"""
+    import uvicorn
+    from fake_translate_server import create_app
+
+    port = free_port()
+    server = uvicorn.Server(uvicorn.Config(create_app(latency=0), host="127.0.0.1", port=port, log_level="warning"))
+    thread = threading.Thread(target=server.run, daemon=True)
+    thread.start()
+    deadline = time.monotonic() + 10
+    while not server.started:
+        if time.monotonic() > deadline:
+            raise RuntimeError("fake_translate_server did not start")
+        time.sleep(0.01)
+    yield f"http://127.0.0.1:{port}"
+    server.should_exit = True
+    thread.join(5)
+
+
+class Api:
+    """Synchronous requests to the in-process app, run on its event loop"""
+
+    def __init__(self, main, loop: asyncio.AbstractEventLoop, http: httpx.AsyncClient, translate_url: str):
+        self.main = main
+        self.loop = loop
+        self.http = http
+        self.translate_url = translate_url
+
+    def request(self, method: str, url: str, **kwargs) -> httpx.Response:
+        return self.loop.run_until_complete(self.http.request(method, url, **kwargs))
+
+    def get(self, url: str, **kwargs) -> httpx.Response:
+        return self.request("GET", url, **kwargs)
+
+    def post(self, url: str, **kwargs) -> httpx.Response:
+        return self.request("POST", url, **kwargs)
+
+    def delete(self, url: str, **kwargs) -> httpx.Response:
+        return self.request("DELETE", url, **kwargs)
+
+    def translate_stats(self) -> dict:
+        return httpx.get(f"{self.translate_url}/stats").json()
+
+    def clear_caches(self):
+        """Forget cached pages and translations, so the next request runs the whole pipeline"""
+        self.main.message_cache.clear()
+        self.main._translation_cache.clear()
+        self.main.detected_languages.clear()
+        self.main.translation_memory._segments.clear()
+
+
+@pytest.fixture(scope="session")
+def api(translate_server, tmp_path_factory):
+    os.environ.update({
+        "TELEGRAM_BACKEND": "fake",
+        "TRANSLATOR_BACKEND": "google",
+        "TRANSLATION_ENGINES": "google",
+        "GOOGLE_TRANSLATE_URL": translate_server,
+        "FAKE_TELEGRAM_LATENCY_MS": "0",
+        "FAKE_TELEGRAM_MESSAGES": "500",
+        "ADMIN_TOKEN": ADMIN_TOKEN,
+        "ALERT_RULES_FILE": str(tmp_path_factory.mktemp("alerts") / "alert_rules.json"),
+    })
+    import main
+
+    loop = asyncio.new_event_loop()
+    loop.run_until_complete(main.startup_event())
+    http = httpx.AsyncClient(transport=httpx.ASGITransport(app=main.app), base_url="http://test")
+    yield Api(main, loop, http, translate_server)
+    loop.run_until_complete(http.aclose())
+    loop.run_until_complete(main.shutdown_event())
+    loop.close()
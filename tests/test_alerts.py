@@ -0,0 +1,35 @@
+from alerts import AlertEngine, AlertItem, Automaton, Rule
+
+
+def test_automaton_finds_overlapping_terms():
+    automaton = Automaton(["he", "she", "his", "hers"])
+    assert sorted(automaton.find("ushers")) == [(4, "he"), (4, "she"), (6, "hers")]
+    assert list(automaton.find("nothing here")) == [(10, "he")]
+    assert list(Automaton([]).find("anything")) == []
+
+
+def test_automaton_failure_links():
+    automaton = Automaton(["abcd", "bc", "c"])
+    assert sorted(automaton.find("xabcx")) == [(4, "bc"), (4, "c")]
+    assert sorted(automaton.find("abcd")) == [(3, "bc"), (3, "c"), (4, "abcd")]
+
+
+def test_engine_matches_terms_and_patterns():
+    engine = AlertEngine()
+    energy = Rule.create(name="energy", terms=["fuel prices", "Газ"], patterns=[r"pipe\w*"])
+    local = Rule.create(name="local", terms=["fuel"], channels=[2])
+    engine.add(energy)
+    engine.add(local)
+
+    matches = engine.evaluate([
+        AlertItem(1, 10, 0.0, "Fuel prices rose again"),
+        AlertItem(1, 11, 0.0, "Цены на газ", translation="Gas prices"),
+        AlertItem(1, 12, 0.0, "New pipelines were built"),
+        AlertItem(2, 13, 0.0, "Refueling stations"),  # not a whole word
+        AlertItem(2, 14, 0.0, "fuel"),
+    ])
+    found = {(match["message_id"], match["rule_name"]) for match in matches}
+    assert found == {(10, "energy"), (11, "energy"), (12, "energy"), (14, "local")}
+
+    assert engine.remove(energy.id) == energy
+    assert engine.evaluate([AlertItem(1, 10, 0.0, "Fuel prices rose again")]) == []
@@ -0,0 +1,106 @@
+import asyncio
+
+from conftest import ADMIN_TOKEN, FAKE_CHANNEL_ID, FAKE_CHANNEL_USERNAME
+
+MESSAGES = f"/channels/{FAKE_CHANNEL_ID}/messages"
+TEXT = "Сегодня в городе прошла большая встреча жителей."
+
+
+def test_channels_list_the_stand_in(api):
+    channels = api.get("/channels").json()
+    assert channels[0]["id"] == FAKE_CHANNEL_ID
+    assert channels[0]["username"] == FAKE_CHANNEL_USERNAME
+    assert len({channel["id"] for channel in channels}) == len(channels)
+
+
+def test_channels_filters_and_sort(api):
+    channels = api.get("/channels?sort=-unread").json()
+    assert [c["unread_count"] for c in channels] == sorted((c["unread_count"] for c in channels), reverse=True)
+    assert all(c["last_message"]["id"] and c["last_activity"] for c in channels)
+    assert all(c["unread_count"] for c in api.get("/channels?unread=true").json())
+    assert [c["username"] for c in api.get(f"/channels?q={FAKE_CHANNEL_USERNAME.upper()}").json()] == [FAKE_CHANNEL_USERNAME]
+    exact = api.get("/channels?exact_counts=true&min_participants=1").json()
+    assert exact and all(c["participants_count"] >= 1 for c in exact)
+
+
+def test_messages_page_newest_first(api):
+    first = api.get(f"{MESSAGES}?limit=20&translate=false").json()
+    ids = [message["id"] for message in first]
+    assert len(ids) == 20 and ids == sorted(ids, reverse=True)
+    second = api.get(f"{MESSAGES}?limit=20&translate=false&offset_id={ids[-1]}").json()
+    assert second[0]["id"] < ids[-1]
+
+
+def test_messages_by_username_match_by_id(api):
+    by_id = api.get(f"{MESSAGES}?limit=10&translate=false").json()
+    by_username = api.get(f"/channels/by-username/{FAKE_CHANNEL_USERNAME}/messages?limit=10&translate=false").json()
+    assert [message["id"] for message in by_username] == [message["id"] for message in by_id]
+
+
+def test_new_post_refreshes_pages_cached_by_username(api):
+    url = f"/channels/by-username/@{FAKE_CHANNEL_USERNAME.upper()}/messages?limit=5&translate=false"
+    newest = api.get(url).json()[0]["id"]
+
+    async def post():
+        api.main.client.post_message(FAKE_CHANNEL_ID, "Новый пост")
+        await asyncio.sleep(0.01)
+
+    api.loop.run_until_complete(post())
+    assert api.get(url).json()[0]["id"] == newest + 1
+
+
+def test_unknown_channel_is_404(api):
+    assert api.get("/channels/by-username/no_such_channel/messages").status_code == 404
+
+
+def test_messages_fields_and_unknown_field(api):
+    messages = api.get(f"{MESSAGES}?limit=5&fields=views,date").json()
+    assert len(messages) == 5 and set(messages[0]) == {"id", "date", "views"}
+    assert messages[0]["date"].endswith("Z")
+    assert api.get(f"{MESSAGES}?fields=nope").status_code == 400
+
+
+def test_messages_date_window(api):
+    messages = api.get(f"{MESSAGES}?limit=20").json()
+    since, until = messages[-1]["date"], messages[0]["date"]
+    window = api.get(f"{MESSAGES}?limit=100&since={since}&until={until}").json()
+    assert window and all(since <= message["date"] < until for message in window)
+
+
+def test_messages_page_translation_is_one_request_per_language(api):
+    api.clear_caches()
+    before = api.translate_stats()["requests"]
+    messages = api.get(f"{MESSAGES}?limit=50&translate=true").json()
+    # One packed request per detected language (Russian and Ukrainian)
+    assert api.translate_stats()["requests"] - before <= 2
+    assert any(message["text"].startswith("[ru->en]") for message in messages)
+
+
+def test_custom_sources_do_not_reuse_auto_translations(api):
+    default = api.post("/translate/batch", json={"texts": [TEXT]}).json()["translations"]
+    ukrainian_only = api.post("/translate/batch", json={"texts": [TEXT], "source_langs": ["uk"]}).json()["translations"]
+    assert default == [f"[ru->en] {TEXT}"]
+    assert ukrainian_only == [TEXT]
+
+
+def test_cached_translation_keeps_its_source_language(api):
+    api.post("/translate/batch", json={"texts": [TEXT]})
+    # Detected languages are evicted separately from the translations
+    api.main.detected_languages.clear()
+    assert api.main._cached_translation(TEXT, "en", {"ru"}) == f"[ru->en] {TEXT}"
+    assert api.main._cached_translation(TEXT, "en", {"uk"}) is None
+
+
+def test_alert_rules_need_the_admin_token(api):
+    rule = {"name": "meeting", "terms": ["встреча"]}
+    assert api.post("/alerts/rules", json=rule).status_code == 401
+
+    headers = {"X-Admin-Token": ADMIN_TOKEN}
+    created = api.post("/alerts/rules", json=rule, headers=headers)
+    assert created.status_code == 201
+    rule_id = created.json()["id"]
+    assert rule_id in [rule["id"] for rule in api.get("/alerts/rules").json()]
+
+    assert api.post("/alerts/rules", json={"terms": ["x" * 1000]}, headers=headers).status_code == 422
+    assert api.delete(f"/alerts/rules/{rule_id}").status_code == 401
+    assert api.delete(f"/alerts/rules/{rule_id}", headers=headers).status_code == 200
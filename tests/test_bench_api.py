@@ -0,0 +1,70 @@
+"""
+pytest-benchmark cases for the API endpoints (see conftest.py for the
+setup). "cached" cases measure answers from the response and translation
+caches; "pipeline" cases clear them before every round.
+
+    python -m pytest tests/test_bench_api.py --benchmark-only
+"""
+import pytest
+
+from conftest import FAKE_CHANNEL_ID, FAKE_CHANNEL_USERNAME
+
+pytest.importorskip("pytest_benchmark")
+
+TEXT = "Сегодня в городе прошла большая встреча жителей. Власти сообщили о новых ограничениях."
+MESSAGES = f"/channels/{FAKE_CHANNEL_ID}/messages?limit=50"
+ROUNDS = 30
+
+
+def ok(response):
+    assert response.status_code == 200, response.text
+    return response.json()
+
+
+def test_channels(benchmark, api):
+    channels = ok(benchmark(api.get, "/channels"))
+    assert channels and all(channel["last_message"] for channel in channels)
+
+
+def test_channels_exact_counts(benchmark, api):
+    channels = ok(benchmark(api.get, "/channels?exact_counts=true&sort=-participants"))
+    counts = [channel["participants_count"] for channel in channels]
+    assert counts == sorted(counts, reverse=True)
+
+def test_messages_cached(benchmark, api):
+    messages = ok(benchmark(api.get, f"{MESSAGES}&translate=false"))
+    assert len(messages) == 50
+
+
+def test_messages_pipeline(benchmark, api):
+    messages = ok(benchmark.pedantic(api.get, args=(f"{MESSAGES}&translate=false",), setup=api.clear_caches, rounds=ROUNDS))
+    assert len(messages) == 50
+
+
+def test_messages_translated_pipeline(benchmark, api):
+    messages = ok(benchmark.pedantic(api.get, args=(f"{MESSAGES}&translate=true",), setup=api.clear_caches, rounds=ROUNDS))
+    assert any(message["text"].startswith("[ru->en]") for message in messages)
+
+
+def test_messages_fields(benchmark, api):
+    messages = ok(benchmark.pedantic(
+        api.get, args=(f"{MESSAGES}&fields=id,date,views",), setup=api.clear_caches, rounds=ROUNDS,
+    ))
+    assert set(messages[0]) == {"id", "date", "views"}
+
+def test_messages_by_username(benchmark, api):
+    messages = ok(benchmark(api.get, f"/channels/by-username/{FAKE_CHANNEL_USERNAME}/messages?limit=50&translate=false"))
+    assert len(messages) == 50
+
+
+def test_translate_batch_cached(benchmark, api):
+    translations = ok(benchmark(api.post, "/translate/batch", json={"texts": [TEXT] * 20}))["translations"]
+    assert translations == [translations[0]] * 20
+
+
+def test_translate_batch_pipeline(benchmark, api):
+    texts = [f"{TEXT} Выпуск {i}." for i in range(20)]
+    translations = ok(benchmark.pedantic(
+        api.post, args=("/translate/batch",), kwargs={"json": {"texts": texts}}, setup=api.clear_caches, rounds=ROUNDS,
+    ))["translations"]
+    assert all(translation.startswith("[ru->en]") for translation in translations)
@@ -0,0 +1,91 @@
+import asyncio
+import time
+
+from cache import TTLCache
+
+
+def test_get_set_expiry(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(time, "monotonic", lambda: now[0])
+    cache = TTLCache(ttl=10, max_entries=2)
+    cache.set("a", 1)
+    assert cache.get("a") == 1
+    now[0] += 11
+    assert cache.get("a") is None
+
+
+def test_lru_eviction_and_pop():
+    cache = TTLCache(ttl=60, max_entries=2)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.get("a")
+    cache.set("c", 3)
+    assert cache.get("b") is None and cache.get("a") == 1 and cache.get("c") == 3
+    cache.pop("a")
+    cache.pop("missing")
+    assert cache.get("a") is None
+    assert cache.invalidate(lambda key: key == "c") == 1
+
+
+def test_concurrent_misses_are_coalesced():
+    hits, misses = [], []
+    cache = TTLCache(ttl=60, on_hit=lambda: hits.append(1), on_miss=lambda: misses.append(1))
+    calls = 0
+
+    async def factory():
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.01)
+        return calls
+
+    async def run():
+        return await asyncio.gather(*(cache.get_or_create("key", factory) for _ in range(10)))
+
+    assert asyncio.run(run()) == [1] * 10
+    assert calls == 1
+    assert len(misses) == 1 and len(hits) == 9
+
+
+def test_invalidation_during_fetch_is_not_lost():
+    cache = TTLCache(ttl=60)
+
+    async def factory():
+        await asyncio.sleep(0.01)
+        return "stale"
+
+    async def run(invalidate):
+        task = asyncio.create_task(cache.get_or_create(("chan", 1), factory))
+        await asyncio.sleep(0)
+        invalidate()
+        return await task
+
+    assert asyncio.run(run(lambda: cache.invalidate(lambda key: key[0] == "chan"))) == "stale"
+    assert cache.get(("chan", 1)) is None
+    asyncio.run(run(lambda: cache.invalidate_values(lambda key, value: True)))
+    assert cache.get(("chan", 1)) is None
+    asyncio.run(run(lambda: cache.invalidate(lambda key: key[0] == "other")))
+    assert cache.get(("chan", 1)) == "stale"
+
+
+def test_failed_fetch_reaches_every_waiter_and_is_not_cached():
+    cache = TTLCache(ttl=60)
+
+    async def factory():
+        await asyncio.sleep(0.01)
+        raise ValueError("boom")
+
+    async def run():
+        return await asyncio.gather(*(cache.get_or_create("key", factory) for _ in range(3)), return_exceptions=True)
+
+    assert all(isinstance(result, ValueError) for result in asyncio.run(run()))
+    assert cache.get("key") is None
+
+
+def test_disabled_cache_always_fetches():
+    cache = TTLCache(ttl=0)
+
+    async def factory():
+        return "value"
+
+    assert asyncio.run(cache.get_or_create("key", factory)) == "value"
+    assert cache.get("key") is None
@@ -0,0 +1,48 @@
+from changelog import COUNTERS, EDITED, NEW, ChangeLog
+
+
+def test_read_pages_in_order():
+    log = ChangeLog()
+    for message_id in range(1, 6):
+        log.append(NEW, 1, message_id)
+
+    page = log.read(after_seq=0, limit=2)
+    assert [entry["seq"] for entry in page["changes"]] == [1, 2]
+    assert page["last_seq"] == 2
+    page = log.read(after_seq=page["last_seq"], limit=10)
+    assert [entry["message_id"] for entry in page["changes"]] == [3, 4, 5]
+    # Not a full page: everything up to head was read
+    assert page["last_seq"] == page["head_seq"] == 5
+    assert not page["truncated"]
+
+
+def test_read_by_channel():
+    log = ChangeLog()
+    log.append(NEW, 1, 10)
+    log.append(NEW, 2, 20)
+    log.append(EDITED, 1, 10, message={"id": 10})
+    log.append(COUNTERS, 2, 20, views=5)
+
+    page = log.read(after_seq=0, limit=10, channel_id=2)
+    assert [(entry["seq"], entry["kind"]) for entry in page["changes"]] == [(2, NEW), (4, COUNTERS)]
+    assert page["changes"][1]["views"] == 5
+    assert log.read(after_seq=2, limit=10, channel_id=1)["changes"][0]["message"] == {"id": 10}
+    assert log.read(after_seq=0, limit=10, channel_id=3)["changes"] == []
+
+
+def test_trim_keeps_newest_and_reports_truncation():
+    log = ChangeLog(max_entries=10)
+    for message_id in range(1, 31):
+        log.append(NEW, message_id % 2, message_id)
+
+    assert log.head_seq == 30
+    assert 10 <= log.head_seq - log.oldest_seq + 1 <= 11
+    page = log.read(after_seq=0, limit=100)
+    assert page["truncated"]
+    assert page["changes"][0]["seq"] == log.oldest_seq
+    assert page["changes"][-1]["seq"] == 30
+    # Per-channel lists are trimmed along with the log
+    for channel_id in (0, 1):
+        changes = log.read(after_seq=0, limit=100, channel_id=channel_id)["changes"]
+        assert all(entry["seq"] >= log.oldest_seq and entry["channel_id"] == channel_id for entry in changes)
+    assert not log.read(after_seq=log.oldest_seq - 1, limit=1)["truncated"]
@@ -0,0 +1,55 @@
+from dedup import DedupIndex, DedupItem
+
+POST = (
+    "Сегодня в центре города прошла большая встреча жителей, на которой власти "
+    "рассказали о новых ограничениях движения и планах ремонта дорог до конца года"
+)
+
+
+def item(channel_id, message_id, text, date=None):
+    return DedupItem(channel_id, message_id, float(date if date is not None else message_id), text)
+
+
+def test_copies_and_near_copies_share_a_cluster():
+    index = DedupIndex()
+    exact, near, other = index.assign([
+        item(1, 1, POST),
+        item(2, 1, POST.upper() + " https://t.me/source"),
+        item(3, 1, "Погода: завтра солнечно, без осадков, ветер слабый, температура днём до двадцати градусов"),
+    ])
+    first, = index.assign([item(1, 2, POST + " Подробности позже.")])
+    assert exact == near == first
+    assert other != exact
+    assert index.assign([item(4, 1, "   ")]) == [None]
+
+
+def test_first_copy_and_remove():
+    index = DedupIndex()
+    cluster_id, _ = index.assign([item(2, 5, POST, date=200), item(1, 7, POST, date=100)])
+    assert index.is_first(cluster_id, 1, 7)
+    assert not index.is_first(cluster_id, 2, 5)
+
+    index.remove(1, 7)
+    assert index.is_first(cluster_id, 2, 5)
+    index.remove(2, 5)
+    assert index.stats() == {"messages": 0, "clusters": 0, "duplicate_clusters": 0}
+    # Nothing of the removed cluster is left in the indexes
+    assert not index._exact and not index._bands
+
+
+def test_edited_message_is_reassigned():
+    index = DedupIndex()
+    original, = index.assign([item(1, 1, POST)])
+    edited, = index.assign([item(1, 1, "Совсем другой текст про футбол, матч закончился вничью после дополнительного времени")])
+    assert edited != original
+    assert len(index) == 1
+
+
+def test_eviction_keeps_max_messages():
+    index = DedupIndex(max_messages=3)
+    for message_id in range(10):
+        index.assign([item(1, message_id, f"{POST} выпуск номер {message_id} " * 2)])
+    assert len(index) == 3
+    assert index.stats()["messages"] == 3
+    # The oldest messages were forgotten
+    assert (1, 0) not in index._messages and (1, 9) in index._messages
@@ -0,0 +1,55 @@
+import asyncio
+import json
+import os
+import stat
+
+import pytest
+
+import ipc
+
+
+@ipc.owned
+async def ipc_echo(value: str) -> str:
+    return value
+
+
+async def call_echo(address: str):
+    server = await ipc.start_server(address)
+    client = ipc.OwnerClient(address)
+    try:
+        return await client.call("ipc_echo", {"value": "hi"})
+    finally:
+        await client.close()
+        server.close()
+
+
+async def handshake(address: str, secret: str) -> bytes:
+    server = await ipc.start_server(address)
+    try:
+        reader, writer = await asyncio.open_unix_connection(address)
+        writer.write(json.dumps({"auth": secret}).encode() + b"\n")
+        writer.write(json.dumps({"id": 1, "method": "ipc_echo", "params": {"value": "hi"}}).encode() + b"\n")
+        reply = await reader.read()
+        writer.close()
+        return reply
+    finally:
+        server.close()
+
+
+def test_unix_socket_is_private(tmp_path, monkeypatch):
+    monkeypatch.setattr(ipc, "OWNER_SECRET", "s3cret")
+    path = str(tmp_path / "owner.sock")
+    assert asyncio.run(call_echo(path)) == "hi"
+    assert stat.S_IMODE(os.stat(path).st_mode) == 0o600
+
+
+def test_wrong_secret_is_rejected(tmp_path, monkeypatch):
+    monkeypatch.setattr(ipc, "OWNER_SECRET", "s3cret")
+    # The owner closes the connection without answering the call
+    assert asyncio.run(handshake(str(tmp_path / "owner.sock"), "guess")) == b""
+
+
+def test_tcp_needs_a_secret(monkeypatch):
+    monkeypatch.setattr(ipc, "OWNER_SECRET", "")
+    with pytest.raises(RuntimeError):
+        asyncio.run(ipc.start_server("tcp://127.0.0.1:0"))
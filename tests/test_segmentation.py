@@ -0,0 +1,46 @@
+from segmentation import batch_segments, split_segments, split_sentences
+
+TEXT = (
+    "  Первое предложение. Второе?  Третье!\n"
+    "Строка без точки\n\n\n"
+    "Новый абзац… и продолжение. " + "слово " * 300 + "\n"
+    "Конец"
+)
+
+
+def join(pairs):
+    return "".join(text + separator for text, separator in pairs)
+
+
+def test_split_sentences_round_trip():
+    for text in (TEXT, "", "   ", "one", "one.\n", "\n\nleading blank lines. End."):
+        assert join(split_sentences(text)) == text
+
+
+def test_split_sentences_never_contains_newlines():
+    assert all("\n" not in sentence for sentence, _ in split_sentences(TEXT))
+
+
+def test_split_sentences_boundaries():
+    assert split_sentences("One. Two? Three!\nFour") == [
+        ("One.", " "), ("Two?", " "), ("Three!", "\n"), ("Four", ""),
+    ]
+
+
+def test_split_segments_round_trip_and_limit():
+    for max_chars in (20, 100, 1000):
+        segments = split_segments(TEXT, max_chars)
+        assert join(segments) == TEXT
+        assert all(len(segment) <= max_chars for segment, _ in segments)
+
+
+def test_split_segments_starts_paragraphs():
+    segments = split_segments("First. Second.\n\nThird.")
+    assert segments == [("First. Second.", "\n\n"), ("Third.", "")]
+
+
+def test_batch_segments_round_trip():
+    segments = split_segments(TEXT, 50)
+    batches = batch_segments(segments, 400)
+    assert join(batches) == TEXT
+    assert len(batches) < len(segments)
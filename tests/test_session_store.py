@@ -0,0 +1,59 @@
+import sqlite3
+
+from telethon.sessions import SQLiteSession
+from telethon.tl import types
+
+from session_store import WriteBehindSession
+
+
+def user(user_id, username):
+    return types.User(id=user_id, access_hash=user_id * 10, username=username, first_name=username.title())
+
+
+def entity_rows(path):
+    conn = sqlite3.connect(path)
+    try:
+        return {row[0]: row[1:3] for row in conn.execute("select id, hash, username from entities")}
+    finally:
+        conn.close()
+
+
+def test_flush_writes_only_pending_rows(tmp_path):
+    session = WriteBehindSession(str(tmp_path / "api"))
+    session.set_dc(2, "149.154.167.51", 443)
+    session.process_entities([user(1, "alice"), user(2, "bob")])
+    assert session.pending == 3
+    assert session.get_entity_rows_by_username("alice") == (1, 10)
+
+    session.flush()
+    assert session.pending == 0
+    assert entity_rows(tmp_path / "api.session") == {1: (10, "alice"), 2: (20, "bob")}
+
+    # Unchanged entities don't become pending again; changed ones do
+    session.process_entities([user(1, "alice"), user(2, "robert")])
+    assert session.pending == 1
+    assert session.get_entity_rows_by_username("bob") is None
+    session.close()
+    assert entity_rows(tmp_path / "api.session")[2] == (20, "robert")
+
+
+def test_import_and_export_round_trip(tmp_path):
+    path = str(tmp_path / "setup")
+    original = SQLiteSession(path)
+    original.set_dc(4, "149.154.167.91", 443)
+    original.process_entities([user(7, "carol")])
+    original.save()
+    original.close()
+
+    session = WriteBehindSession(path)
+    assert session.dc_id == 4
+    assert session.get_entity_rows_by_username("carol") == (7, 70)
+    assert session.pending == 0
+
+    session.export(str(tmp_path / "backup"))
+    exported = SQLiteSession(str(tmp_path / "backup"))
+    try:
+        assert exported.dc_id == 4
+        assert exported.get_entity_rows_by_username("carol") == (7, 70)
+    finally:
+        exported.close()
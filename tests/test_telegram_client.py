@@ -0,0 +1,41 @@
+import asyncio
+import time
+
+import pytest
+from prometheus_client import REGISTRY
+from telethon.errors import FloodWaitError
+from telethon.sessions import MemorySession
+from telethon.tl.functions.help import GetConfigRequest
+
+
+class FakeSender:
+    def __init__(self):
+        self.sent = 0
+
+    def send(self, request, ordered=False):
+        self.sent += 1
+        future = asyncio.get_running_loop().create_future()
+        future.set_result(True)
+        return future
+
+
+def rpc_count() -> float:
+    return REGISTRY.get_sample_value("telegram_api_rpc_total", {"method": "GetConfigRequest"}) or 0
+
+
+def test_only_sent_requests_are_counted(api):
+    sender = FakeSender()
+
+    async def run():
+        client = api.main.InstrumentedTelegramClient(MemorySession(), 1, "hash", flood_sleep_threshold=5)
+        before = rpc_count()
+        assert await client._call(sender, GetConfigRequest()) is True
+        assert sender.sent == 1 and rpc_count() == before + 1
+
+        # Telethon refuses requests that are known to be flood-waited without sending them
+        client._flood_waited_requests[GetConfigRequest.CONSTRUCTOR_ID] = time.time() + 60
+        with pytest.raises(FloodWaitError):
+            await client._call(sender, GetConfigRequest())
+        assert sender.sent == 1 and rpc_count() == before + 1
+
+    asyncio.run(run())
@@ -0,0 +1,171 @@
+import asyncio
+
+import httpx
+import pytest
+
+from translation import (
+    EngineUnavailable,
+    GoogleEngine,
+    LocalEngine,
+    TranslationEngine,
+    TranslationRouter,
+    build_router,
+    parse_routes,
+    split_packed,
+)
+from translation_memory import TranslationMemory
+
+
+class FailingEngine(TranslationEngine):
+    name = "failing"
+    expected_seconds_per_kchar = 0.01
+
+    def translate_text(self, text: str, source: str, target: str) -> str:
+        raise RuntimeError("down")
+
+
+class OfflineEngine(LocalEngine):
+    name = "offline"
+    offline = True
+    expected_seconds_per_kchar = 0.01
+
+
+def test_router_falls_back_to_the_next_engine():
+    local = LocalEngine(latency=0)
+    router = TranslationRouter([local, FailingEngine()])
+    # Both are free; the faster one is tried first and fails
+    assert [engine.name for engine in router.candidates("ru", "en")] == ["failing", "local"]
+    assert asyncio.run(router.translate("привет", "ru", "en")) == "[ru->en] привет"
+
+
+def test_routes_and_modes():
+    router = TranslationRouter([LocalEngine(latency=0), OfflineEngine(latency=0)], routes=parse_routes("ru-en=local"))
+    assert router.route("ru", "en").name == "local"
+    assert router.route("uk", "en").name == "offline"
+    assert router.route("ru", "en", mode="offline").name == "offline"
+    with pytest.raises(EngineUnavailable):
+        TranslationRouter([OfflineEngine(latency=0)]).route("ru", "en", mode="online")
+
+
+def test_build_router_rejects_unknown_engines():
+    assert parse_routes(" ru-en = argos ,uk-en=google") == {"ru-en": "argos", "uk-en": "google"}
+    with pytest.raises(ValueError):
+        build_router(["nope"])
+    with pytest.raises(ValueError):
+        TranslationRouter([], policy="random")
+
+
+def test_batch_keeps_order_and_blank_texts():
+    engine = LocalEngine(latency=0, batch_chars=0)
+    texts = ["один", "", "  ", "два"]
+    assert asyncio.run(engine.translate_batch(texts, "ru", "en")) == ["[ru->en] один", "", "  ", "[ru->en] два"]
+    assert engine.requests == 2
+    assert engine.stats.seconds_per_kchar >= 0
+
+
+@pytest.fixture
+def engine(translate_server):
+    return GoogleEngine(base_url=translate_server, retries=0)
+
+
+def stats(translate_server) -> dict:
+    return httpx.get(f"{translate_server}/stats").json()
+
+
+def requests_made(before: dict, after: dict) -> int:
+    return after["requests"] - before["requests"]
+
+
+def test_batch_is_packed_into_one_request(engine, translate_server):
+    texts = [f"Привет мир {i}\nвторая строка" for i in range(30)] + ["   "]
+    before = stats(translate_server)
+    translations = asyncio.run(engine.translate_batch(texts, "ru", "en"))
+    assert requests_made(before, stats(translate_server)) == 1
+    assert translations[0] == "[ru->en] Привет мир 0\n[ru->en] вторая строка"
+    assert translations[-1] == "   "
+
+
+def test_batch_chars_splits_requests(translate_server):
+    engine = GoogleEngine(base_url=translate_server, batch_chars=100, retries=0)
+    texts = ["Короткий текст номер один для проверки."] * 6
+    before = stats(translate_server)
+    translations = asyncio.run(engine.translate_batch(texts, "ru", "en"))
+    assert requests_made(before, stats(translate_server)) == 3
+    assert translations == ["[ru->en] Короткий текст номер один для проверки."] * 6
+
+
+def test_retry_after_is_capped_at_the_timeout():
+    engine = GoogleEngine(timeout=3.0, backoff=0.5)
+    assert engine._delay(0, "1") == 1.0
+    assert engine._delay(0, "3600") == 3.0
+    assert 0 <= engine._delay(2, None) <= 2.0
+
+
+def test_http2_without_h2_falls_back(monkeypatch):
+    monkeypatch.setattr("importlib.util.find_spec", lambda name: None)
+    engine = GoogleEngine(http2=True)
+    engine.load()
+    assert engine.http2 is False
+
+
+def test_unsplittable_reply_falls_back_to_single_texts():
+    engine = LocalEngine(latency=0)
+    # A text containing the delimiter line can't be split back
+    texts = ["первый\n@@@\nвторой", "третий"]
+    translations = asyncio.run(engine.translate_batch(texts, "ru", "en"))
+    assert translations == ["[ru->en] первый\n@@@\n[ru->en] второй", "[ru->en] третий"]
+    assert engine.requests == 3
+    assert split_packed("a\n@@@\nb", 3) is None
+
+
+def test_iter_without_batching_sends_each_text():
+    engine = LocalEngine(latency=0)
+
+    async def collect():
+        return [result async for result in engine.translate_iter(["один", "", "два"], "ru", "en", batch=False)]
+
+    assert asyncio.run(collect()) == ["[ru->en] один", "", "[ru->en] два"]
+    assert engine.requests == 2
+
+
+def test_memory_sends_missing_sentences_per_text(engine, translate_server):
+    memory = TranslationMemory()
+    texts = ["Один. Два! Три?", "Четыре. Пять.\n\nШесть.", "Один. Семь."]
+
+    def translate(inputs):
+        return engine.translate_batch(inputs, "ru", "en")
+
+    before = stats(translate_server)
+    translations = asyncio.run(memory.translate_batch(texts, "ru", "en", translate))
+    assert requests_made(before, stats(translate_server)) == 1
+    assert translations == [
+        "[ru->en] Один. [ru->en] Два! [ru->en] Три?",
+        "[ru->en] Четыре. [ru->en] Пять.\n\n[ru->en] Шесть.",
+        "[ru->en] Один. [ru->en] Семь.",
+    ]
+    assert len(memory) == 7
+
+    # Known sentences are not sent again
+    inputs = []
+
+    async def record(batch):
+        inputs.extend(batch)
+        return await translate(batch)
+
+    asyncio.run(memory.translate_batch(["Два! Восемь."], "ru", "en", record))
+    assert inputs == ["Восемь."]
+
+
+def test_memory_retries_inputs_whose_lines_dont_match():
+    memory = TranslationMemory()
+    calls = []
+
+    async def translate(inputs):
+        calls.append(list(inputs))
+        # The first call merges the lines of a multi-sentence input
+        if len(calls) == 1:
+            return [text.replace("\n", " ") for text in inputs]
+        return [f"<{text}>" for text in inputs]
+
+    assert asyncio.run(memory.translate_batch(["A. B."], "ru", "en", translate)) == ["<A.> <B.>"]
+    assert calls == [["A.\nB."], ["A.", "B."]]
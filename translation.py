@@ -0,0 +1,556 @@
+"""
+Translation engines behind one interface, and routing between them.
+
+Every engine implements `TranslationEngine`: either blocking `translate_text`
+(run in worker threads) or `translate_text_async`, at most `concurrency` at a
+time, and gets the async batch methods built on it, `translate_batch` and
+`translate_iter`. Engines with `batch_chars` pack several texts into one
+request, one per line-delimited block, and split the reply back. Engines:
+
+- `GoogleEngine`  online, Google Translate over a shared keep-alive
+                  httpx connection pool (async, no worker threads)
+- `ArgosEngine`   offline, Argos Translate with locally installed packs
+- `LocalEngine`   local stand-in with configurable latency (benchmarks,
+                  offline development; TRANSLATOR_BACKEND=fake)
+
+`TranslationRouter` picks an engine per request from the ones that support
+the language pair: explicit per-pair routes first, then by cost or by
+observed latency, falling back to the next engine when one fails.
+
+Heavy imports (httpx, argostranslate with torch/ctranslate2) are
+deferred until an engine is first used or `load()`ed.
+"""
+import asyncio
+import importlib.util
+import logging
+import os
+import random
+import re
+import sys
+import threading
+import time
+from abc import ABC
+from typing import AsyncIterator, Dict, List, Optional, Sequence, Union
+
+logger = logging.getLogger(__name__)
+
+# Separates the texts packed into one request. Translators keep a line of
+# symbols as it is, so the reply splits back into one translation per text.
+BATCH_DELIMITER = "\n@@@\n"
+_BATCH_SPLIT = re.compile(r"\s*@@@\s*")
+
+
+def pack_texts(texts: Sequence[str]) -> str:
+    return BATCH_DELIMITER.join(texts)
+
+
+def split_packed(reply: str, count: int) -> Optional[List[str]]:
+    """The translations of `count` packed texts, or None if the delimiters didn't survive"""
+    parts = _BATCH_SPLIT.split(reply)
+    return parts if len(parts) == count else None
+
+
+class TranslationError(Exception):
+    """A translation could not be produced"""
+
+
+class EngineUnavailable(TranslationError):
+    """The engine's library or models are not installed"""
+
+
+class UnsupportedLanguagePair(TranslationError):
+    """The engine cannot translate between the requested languages"""
+
+
+class LatencyStats:
+    """Exponentially weighted moving average of seconds per 1000 characters"""
+
+    def __init__(self, initial: float, alpha: float = 0.2):
+        self.alpha = alpha
+        self.seconds_per_kchar = initial
+        self.samples = 0
+        self._lock = threading.Lock()
+
+    def observe(self, seconds: float, chars: int):
+        value = seconds / max(chars, 1) * 1000
+        with self._lock:
+            if self.samples == 0:
+                self.seconds_per_kchar = value
+            else:
+                self.seconds_per_kchar += self.alpha * (value - self.seconds_per_kchar)
+            self.samples += 1
+
+
+class TranslationEngine(ABC):
+    """A translation backend"""
+
+    name = "engine"
+    offline = False
+    # Relative cost used for routing, e.g. USD per million characters
+    cost_per_million_chars = 0.0
+    # Blocking translations run in parallel per batch
+    concurrency = 1
+    # Latency assumed before anything was measured (seconds per 1000 chars)
+    expected_seconds_per_kchar = 1.0
+    # Texts packed into one request, up to this many characters (0: one request per text)
+    batch_chars = 0
+
+    def __init__(self):
+        self.stats = LatencyStats(self.expected_seconds_per_kchar)
+
+    def load(self):
+        """Import the engine's dependencies (blocking; called lazily otherwise)"""
+
+    def unsupported_reason(self, source: str, target: str) -> Optional[TranslationError]:
+        """None if the engine can translate source -> target, else why not"""
+        return None
+
+    def supports(self, source: str, target: str) -> bool:
+        return self.unsupported_reason(source, target) is None
+
+    def translate_text(self, text: str, source: str, target: str) -> str:
+        """Translate one text, blocking the calling thread"""
+        raise NotImplementedError
+
+    async def translate_text_async(self, text: str, source: str, target: str) -> str:
+        """Translate one text; by default `translate_text` in a worker thread"""
+        return await asyncio.to_thread(self.translate_text, text, source, target)
+
+    async def aclose(self):
+        """Release connections or other resources held by the engine"""
+
+    async def translate_many_async(self, texts: Sequence[str], source: str, target: str) -> List[str]:
+        """
+        Translate several texts in one request: packed with BATCH_DELIMITER
+        and split back. If the reply doesn't split into one part per text,
+        the texts are translated one by one instead.
+        """
+        if len(texts) == 1:
+            return [await self.translate_text_async(texts[0], source, target)]
+        reply = await self.translate_text_async(pack_texts(texts), source, target)
+        parts = split_packed(reply, len(texts))
+        if parts is not None:
+            return parts
+        logger.warning("%s: packed reply didn't split into %d texts; translating them one by one", self.name, len(texts))
+        return [await self.translate_text_async(text, source, target) for text in texts]
+
+    async def _timed_translate(self, texts: Sequence[str], source: str, target: str) -> List[str]:
+        start = time.perf_counter()
+        results = await self.translate_many_async(texts, source, target)
+        self.stats.observe(time.perf_counter() - start, sum(len(text) for text in texts))
+        return results
+
+    def _chunks(self, texts: Sequence[str], batch: bool) -> List[List[int]]:
+        """Indices of the non-blank texts, packed in order into requests of at most batch_chars"""
+        chunks: List[List[int]] = []
+        size = 0
+        for index, text in enumerate(texts):
+            if not text.strip():
+                continue
+            added = len(BATCH_DELIMITER) + len(text)
+            if batch and chunks and size + added <= self.batch_chars:
+                chunks[-1].append(index)
+                size += added
+            else:
+                chunks.append([index])
+                size = len(text)
+        return chunks
+
+    async def translate_iter(
+        self, texts: Sequence[str], source: str, target: str, batch: bool = True
+    ) -> AsyncIterator[Union[str, Exception]]:
+        """
+        Translate `texts` concurrently and yield the results in order as soon
+        as each is ready. A text that failed yields its exception instead.
+        Whitespace-only texts are passed through. With `batch` (and
+        `batch_chars`), neighbouring texts share requests.
+        """
+        semaphore = asyncio.Semaphore(self.concurrency)
+
+        async def translate_chunk(chunk: List[str]) -> List[str]:
+            async with semaphore:
+                return await self._timed_translate(chunk, source, target)
+
+        chunks = self._chunks(texts, batch)
+        tasks = [asyncio.ensure_future(translate_chunk([texts[index] for index in chunk])) for chunk in chunks]
+        # text index -> (task translating it, position in that task's result)
+        placed = {index: (task, position) for task, chunk in zip(tasks, chunks) for position, index in enumerate(chunk)}
+        try:
+            for index, text in enumerate(texts):
+                if index not in placed:
+                    yield text
+                    continue
+                task, position = placed[index]
+                try:
+                    yield (await task)[position]
+                except Exception as e:
+                    yield e
+        finally:
+            for task in tasks:
+                task.cancel()
+
+    async def translate_batch(self, texts: Sequence[str], source: str, target: str) -> List[str]:
+        """Translate `texts`; raises the first failure"""
+        results = []
+        async for result in self.translate_iter(texts, source, target):
+            if isinstance(result, Exception):
+                raise result
+            results.append(result)
+        return results
+
+    async def translate(self, text: str, source: str, target: str) -> str:
+        return (await self.translate_batch([text], source, target))[0]
+
+
+class GoogleEngine(TranslationEngine):
+    """
+    Google Translate over one shared httpx connection pool.
+
+    Connections (and their TLS sessions) are kept alive between requests, and
+    with `http2` concurrent translations are multiplexed over a single
+    connection. Timeouts, 429s and 5xx responses are retried with jittered
+    exponential backoff. `base_url` can point at a local stand-in server
+    (see fake_translate_server.py).
+    """
+
+    name = "google"
+    cost_per_million_chars = 20.0
+    expected_seconds_per_kchar = 0.5
+
+    def __init__(
+        self,
+        concurrency: int = 8,
+        batch_chars: int = 4500,
+        base_url: str = "https://translate.googleapis.com",
+        pool_size: Optional[int] = None,
+        timeout: float = 10.0,
+        connect_timeout: float = 5.0,
+        retries: int = 2,
+        backoff: float = 0.25,
+        http2: bool = False,
+    ):
+        super().__init__()
+        self.concurrency = concurrency
+        # The service accepts about 5000 characters per request
+        self.batch_chars = batch_chars
+        self.base_url = base_url.rstrip("/")
+        self.pool_size = pool_size or concurrency
+        self.timeout = timeout
+        self.connect_timeout = connect_timeout
+        self.retries = retries
+        self.backoff = backoff
+        self.http2 = http2
+        self._httpx = None
+        self._client = None
+        self._client_loop = None
+
+    @classmethod
+    def from_env(cls, concurrency: int = 8) -> "GoogleEngine":
+        return cls(
+            concurrency=concurrency,
+            batch_chars=int(os.getenv("TRANSLATE_BATCH_CHARS", "4500")),
+            base_url=os.getenv("GOOGLE_TRANSLATE_URL", "https://translate.googleapis.com"),
+            pool_size=int(os.getenv("TRANSLATE_POOL_SIZE", "0")) or None,
+            timeout=float(os.getenv("TRANSLATE_TIMEOUT", "10")),
+            connect_timeout=float(os.getenv("TRANSLATE_CONNECT_TIMEOUT", "5")),
+            retries=int(os.getenv("TRANSLATE_RETRIES", "2")),
+            backoff=float(os.getenv("TRANSLATE_RETRY_BACKOFF", "0.25")),
+            http2=os.getenv("TRANSLATE_HTTP2", "0").lower() in ("1", "true", "yes"),
+        )
+
+    def load(self):
+        if self._httpx is not None:
+            return
+        import httpx
+        if self.http2 and importlib.util.find_spec("h2") is None:
+            logger.warning("TRANSLATE_HTTP2 needs the h2 package (pip install httpx[http2]); using HTTP/1.1")
+            self.http2 = False
+        self._httpx = httpx
+
+    def _http(self):
+        """The shared client; created in (and bound to) the running event loop"""
+        loop = asyncio.get_running_loop()
+        if self._client is None or self._client_loop is not loop:
+            self.load()
+            httpx = self._httpx
+            self._client = httpx.AsyncClient(
+                base_url=self.base_url,
+                http2=self.http2,
+                timeout=httpx.Timeout(self.timeout, connect=self.connect_timeout),
+                limits=httpx.Limits(max_connections=self.pool_size, max_keepalive_connections=self.pool_size),
+            )
+            self._client_loop = loop
+        return self._client
+
+    def _delay(self, attempt: int, retry_after: Optional[str]) -> float:
+        """
+        Full jitter: a random delay up to backoff * 2^attempt, or Retry-After
+        capped at the request timeout so a server can't stall a page for minutes
+        """
+        if retry_after and retry_after.isdigit():
+            return min(float(retry_after), self.timeout)
+        return random.uniform(0, self.backoff * 2 ** attempt)
+
+    async def translate_text_async(self, text: str, source: str, target: str) -> str:
+        client = self._http()
+        httpx = self._httpx
+        error: Exception = TranslationError("No attempt made")
+        for attempt in range(self.retries + 1):
+            retry_after = None
+            try:
+                # The text goes in the form body: URLs are limited to a few KB
+                response = await client.post(
+                    "/translate_a/single",
+                    params={"client": "gtx", "sl": source, "tl": target, "dt": "t"},
+                    data={"q": text},
+                )
+            except httpx.TransportError as e:
+                error = e
+            else:
+                if response.status_code == 429 or response.status_code >= 500:
+                    error = TranslationError(f"Translation service returned HTTP {response.status_code}")
+                    retry_after = response.headers.get("Retry-After")
+                elif response.status_code >= 400:
+                    raise TranslationError(f"Translation service returned HTTP {response.status_code}")
+                else:
+                    return self._parse(response.json())
+            if attempt < self.retries:
+                await asyncio.sleep(self._delay(attempt, retry_after))
+        raise TranslationError(str(error) or type(error).__name__) from error
+
+    @staticmethod
+    def _parse(data) -> str:
+        # [[["translated sentence", "original sentence", ...], ...], ..., "detected source"]
+        try:
+            return "".join(part[0] for part in data[0] if part and part[0])
+        except (IndexError, KeyError, TypeError) as e:
+            raise TranslationError(f"Unexpected response from the translation service: {str(data)[:200]}") from e
+
+    async def aclose(self):
+        if self._client is not None:
+            client, self._client = self._client, None
+            if self._client_loop is asyncio.get_running_loop():
+                await client.aclose()
+
+
+class ArgosEngine(TranslationEngine):
+    """Argos Translate (offline); only installed language pairs are supported"""
+
+    name = "argos"
+    offline = True
+    expected_seconds_per_kchar = 2.0
+
+    def __init__(self):
+        super().__init__()
+        self._module = None
+        self._loaded = False
+        self._load_lock = threading.Lock()
+        self._translations: Dict[tuple, object] = {}
+
+    def load(self):
+        with self._load_lock:
+            if self._loaded:
+                return
+            # Frozen builds keep Argos models next to the executable instead of inside the
+            # bundle, so launches don't unpack them. They are read, not memory-mapped:
+            # CTranslate2 copies model files into its own buffers when loading.
+            if getattr(sys, "frozen", False):
+                models_dir = os.path.join(os.path.dirname(sys.executable), "models")
+                if os.path.isdir(models_dir):
+                    os.environ.setdefault("ARGOS_PACKAGES_DIR", models_dir)
+            try:
+                import argostranslate.translate as argos_translate
+            except ImportError:
+                argos_translate = None
+            self._module = argos_translate
+            self._loaded = True
+
+    def installed_codes(self) -> List[str]:
+        self.load()
+        if self._module is None:
+            return []
+        return [getattr(l, "code", None) for l in self._module.get_installed_languages()]
+
+    def unsupported_reason(self, source: str, target: str) -> Optional[TranslationError]:
+        self.load()
+        if self._module is None:
+            return EngineUnavailable("Argos Translate not installed. Install argostranslate and language packs.")
+        if source == "auto":
+            return UnsupportedLanguagePair("Offline translation requires an explicit source_lang (e.g., 'ru' or 'uk')")
+        try:
+            self._translation(source, target)
+        except UnsupportedLanguagePair as e:
+            return e
+        return None
+
+    def _translation(self, source: str, target: str):
+        key = (source, target)
+        translation = self._translations.get(key)
+        if translation is not None:
+            return translation
+        installed_langs = self._module.get_installed_languages()
+        src_lang = next((l for l in installed_langs if getattr(l, "code", "") == source), None)
+        tgt_lang = next((l for l in installed_langs if getattr(l, "code", "") == target), None)
+        translation = src_lang.get_translation(tgt_lang) if src_lang and tgt_lang else None
+        if translation is None:
+            installed_codes = [getattr(l, "code", None) for l in installed_langs]
+            raise UnsupportedLanguagePair(
+                f"Offline language pair not installed ({source}->{target}). Installed codes: {installed_codes}"
+            )
+        self._translations[key] = translation
+        return translation
+
+    def translate_text(self, text: str, source: str, target: str) -> str:
+        self.load()
+        if self._module is None:
+            raise EngineUnavailable("Argos Translate not installed. Install argostranslate and language packs.")
+        translation = self._translation(source, target)
+        try:
+            return translation.translate(text)
+        except Exception as e:
+            raise TranslationError(str(e)) from e
+
+
+def fake_translation(text: str, source: str, target: str) -> str:
+    """"[src->tgt] line" for every line with letters; delimiter lines are kept like a real translator would"""
+    return "\n".join(
+        f"[{source}->{target}] {line}" if any(char.isalpha() for char in line) else line
+        for line in text.split("\n")
+    )
+
+
+class LocalEngine(TranslationEngine):
+    """
+    Stand-in for an online engine: blocks for `latency` seconds per request
+    like a real HTTP client and returns "[src->tgt] text" per line. Packs
+    texts into requests like GoogleEngine.
+    """
+
+    name = "local"
+    expected_seconds_per_kchar = 0.15
+
+    def __init__(self, latency: float = 0.15, concurrency: int = 8, batch_chars: int = 4500):
+        super().__init__()
+        self.latency = latency
+        self.concurrency = concurrency
+        self.batch_chars = batch_chars
+        self.requests = 0
+
+    @classmethod
+    def from_env(cls, concurrency: int = 8) -> "LocalEngine":
+        return cls(
+            latency=float(os.getenv("FAKE_TRANSLATOR_LATENCY_MS", "150")) / 1000,
+            concurrency=concurrency,
+            batch_chars=int(os.getenv("TRANSLATE_BATCH_CHARS", "4500")),
+        )
+
+    def translate_text(self, text: str, source: str, target: str) -> str:
+        self.requests += 1
+        if self.latency:
+            time.sleep(self.latency)
+        return fake_translation(text, source, target)
+
+
+class TranslationRouter:
+    """
+    Chooses an engine per language pair and mode (online/offline).
+
+    `routes` maps "source-target" to an engine name that is always tried
+    first (e.g. {"ru-en": "argos"}). The other candidates are ordered by
+    `policy`: "cost" (cheapest first, then fastest) or "latency" (fastest
+    measured first, then cheapest).
+    """
+
+    def __init__(self, engines: Sequence[TranslationEngine], routes: Optional[Dict[str, str]] = None, policy: str = "cost"):
+        if policy not in ("cost", "latency"):
+            raise ValueError(f"Unknown routing policy: {policy}")
+        self.engines = {engine.name: engine for engine in engines}
+        self.routes = dict(routes or {})
+        self.policy = policy
+        self._prepared = set()
+
+    def load(self):
+        for engine in self.engines.values():
+            engine.load()
+
+    async def prepare(self, mode: Optional[str] = None):
+        """Load the engines of `mode` in a worker thread, so routing never blocks the event loop"""
+        for engine in self._in_mode(mode):
+            if engine.name not in self._prepared:
+                await asyncio.to_thread(engine.load)
+                self._prepared.add(engine.name)
+
+    def _in_mode(self, mode: Optional[str]) -> List[TranslationEngine]:
+        engines = list(self.engines.values())
+        if mode == "offline":
+            return [engine for engine in engines if engine.offline]
+        if mode == "online":
+            return [engine for engine in engines if not engine.offline]
+        return engines
+
+    def candidates(self, source: str, target: str, mode: Optional[str] = None) -> List[TranslationEngine]:
+        """Engines able to translate source -> target, best first"""
+        engines = [engine for engine in self._in_mode(mode) if engine.supports(source, target)]
+        if self.policy == "cost":
+            engines.sort(key=lambda e: (e.cost_per_million_chars, e.stats.seconds_per_kchar))
+        else:
+            engines.sort(key=lambda e: (e.stats.seconds_per_kchar, e.cost_per_million_chars))
+        preferred = self.routes.get(f"{source}-{target}")
+        engines.sort(key=lambda e: e.name != preferred)
+        return engines
+
+    def route(self, source: str, target: str, mode: Optional[str] = None) -> TranslationEngine:
+        """The best engine for the pair, or the reason none can be used"""
+        candidates = self.candidates(source, target, mode)
+        if candidates:
+            return candidates[0]
+        for engine in self._in_mode(mode):
+            reason = engine.unsupported_reason(source, target)
+            if reason is not None:
+                raise reason
+        raise EngineUnavailable(f"No {mode} translation engine configured" if mode else "No translation engine configured")
+
+    async def translate_batch(self, texts: Sequence[str], source: str, target: str, mode: Optional[str] = None) -> List[str]:
+        """Translate with the best engine, falling back to the next on failure"""
+        await self.prepare(mode)
+        candidates = self.candidates(source, target, mode)
+        if not candidates:
+            self.route(source, target, mode)  # raises the reason
+        error: Optional[Exception] = None
+        for engine in candidates:
+            try:
+                return await engine.translate_batch(texts, source, target)
+            except Exception as e:
+                error = e
+        raise error
+
+    async def translate(self, text: str, source: str, target: str, mode: Optional[str] = None) -> str:
+        return (await self.translate_batch([text], source, target, mode))[0]
+
+    async def aclose(self):
+        for engine in self.engines.values():
+            await engine.aclose()
+
+
+ENGINE_FACTORIES = {
+    "google": lambda concurrency: GoogleEngine.from_env(concurrency=concurrency),
+    "argos": lambda concurrency: ArgosEngine(),
+    "local": lambda concurrency: LocalEngine.from_env(concurrency=concurrency),
+}
+
+
+def parse_routes(value: str) -> Dict[str, str]:
+    """"ru-en=argos,uk-en=google" -> {"ru-en": "argos", "uk-en": "google"}"""
+    routes = {}
+    for item in filter(None, (part.strip() for part in value.split(","))):
+        pair, _, engine = item.partition("=")
+        routes[pair.strip()] = engine.strip()
+    return routes
+
+
+def build_router(names: Sequence[str], concurrency: int = 8, routes: Optional[Dict[str, str]] = None, policy: str = "cost") -> TranslationRouter:
+    """Router over the named engines (see ENGINE_FACTORIES)"""
+    unknown = [name for name in names if name not in ENGINE_FACTORIES]
+    if unknown:
+        raise ValueError(f"Unknown translation engines: {unknown}. Known: {sorted(ENGINE_FACTORIES)}")
+    return TranslationRouter([ENGINE_FACTORIES[name](concurrency) for name in names], routes=routes, policy=policy)
@@ -0,0 +1,137 @@
+"""
+Sentence-level translation memory.
+
+Texts are split into sentences (segmentation.split_sentences) and every
+sentence is cached under a hash of its text and language pair. Only sentences
+the memory has not seen are sent to the engine; the translation is then
+reassembled with the original separators. A forwarded post, or an edit that
+changes one word, costs one sentence of translation instead of the whole
+post.
+
+The missing sentences of a text are sent together, one per line, so the
+engine translates them with their neighbours as context and packs them into
+as few requests as the texts themselves.
+"""
+import hashlib
+from collections import OrderedDict
+from typing import Awaitable, Callable, Dict, List, Optional, Sequence, Tuple
+
+import metrics
+from segmentation import split_sentences
+
+
+def _digest(text: str) -> bytes:
+    return hashlib.blake2b(text.encode("utf-8"), digest_size=16).digest()
+
+
+def _strip(sentence: str) -> Tuple[str, str, str]:
+    """(leading whitespace, sentence, trailing whitespace)"""
+    core = sentence.strip()
+    if not core:
+        return sentence, "", ""
+    start = sentence.index(core)
+    return sentence[:start], core, sentence[start + len(core):]
+
+
+class TranslationMemory:
+    """LRU memory of sentence translations, keyed by (source, target, hash)"""
+
+    def __init__(self, max_segments: int = 50000):
+        self.max_segments = max_segments
+        self._segments: "OrderedDict[Tuple[str, str, bytes], str]" = OrderedDict()
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_segments > 0
+
+    def __len__(self) -> int:
+        return len(self._segments)
+
+    def get(self, source: str, target: str, sentence: str):
+        key = (source, target, _digest(sentence))
+        translation = self._segments.get(key)
+        if translation is not None:
+            self._segments.move_to_end(key)
+        return translation
+
+    def set(self, source: str, target: str, sentence: str, translation: str):
+        key = (source, target, _digest(sentence))
+        self._segments[key] = translation
+        self._segments.move_to_end(key)
+        while len(self._segments) > self.max_segments:
+            self._segments.popitem(last=False)
+
+    async def translate_batch(
+        self,
+        texts: Sequence[str],
+        source: str,
+        target: str,
+        translate: Callable[[List[str]], Awaitable[List[str]]],
+    ) -> List[str]:
+        """
+        Translate `texts` sentence by sentence. `translate` is called once
+        with one input per text that has sentences missing from the memory,
+        those sentences joined by newlines (a sentence is sent only with the
+        first text that has it). Inputs whose translation doesn't split back
+        into as many lines are sent again sentence by sentence. Failures
+        propagate and nothing is stored.
+        """
+        if not self.enabled:
+            return await translate(list(texts))
+
+        split = [[(*_strip(sentence), separator) for sentence, separator in split_sentences(text)] for text in texts]
+        known: Dict[str, str] = {}
+        missing: Dict[str, None] = {}
+        # Missing sentences grouped by the text that has them first
+        groups: List[List[str]] = []
+        for sentences in split:
+            group = []
+            for _, core, _, _ in sentences:
+                if not core or core in known or core in missing:
+                    continue
+                translation = self.get(source, target, core)
+                if translation is None:
+                    missing[core] = None
+                    group.append(core)
+                else:
+                    known[core] = translation
+            if group:
+                groups.append(group)
+        metrics.translation_memory_lookup(hits=len(known), misses=len(missing))
+
+        if not groups:
+            return self._join(split, known)
+
+        # Sentences never contain newlines, so the lines map back one to one
+        translated: List[Tuple[str, Optional[str]]] = []
+        retry: List[str] = []
+        for group, translation in zip(groups, await translate(["\n".join(group) for group in groups])):
+            if translation is None:
+                translated.extend((core, None) for core in group)
+                continue
+            lines = translation.split("\n")
+            if len(lines) == len(group):
+                translated.extend(zip(group, (line.strip() for line in lines)))
+            else:
+                retry.extend(group)
+        if retry:
+            translated.extend(zip(retry, await translate(retry)))
+
+        for core, translation in translated:
+            if translation is None:
+                known[core] = core
+                continue
+            self.set(source, target, core, translation)
+            known[core] = translation
+        return self._join(split, known)
+
+    @staticmethod
+    def _join(split, known: Dict[str, str]) -> List[str]:
+        """Reassemble each text from its sentence translations and separators"""
+        return [
+            "".join(
+                lead + known.get(core, "") + trail + separator
+                for lead, core, trail, separator in sentences
+            )
+            for sentences in split
+        ]